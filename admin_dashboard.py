@@ -1,36 +1,48 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QPushButton, QLabel, QFrame, QScrollArea, QSizePolicy, QMessageBox,
                             QDateEdit, QTableWidget, QTableWidgetItem, QFileDialog, QTabWidget,
-                            QTextEdit, QComboBox)
+                            QPlainTextEdit, QComboBox, QProgressBar)
 from PyQt5.QtCore import Qt, QDate, QTimer
 from PyQt5.QtGui import QFont, QTextCursor
-from database import Database
-from logger import pos_logger
+from database import get_database
+from report_worker import ReportRunner
+import report_export
+import charts
+from logger import LOG_DIR, pos_logger
+from log_tail import LogTail
+import metrics
+from metrics import timed
 import datetime
-import pandas as pd
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import os
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-from reportlab.graphics.charts.piecharts import Pie
-from reportlab.graphics.charts.legends import Legend
-from reportlab.graphics.charts.textlabels import Label
-from reportlab.graphics.charts.axes import XCategoryAxis, YValueAxis
 
 class LogViewer(QWidget):
+    """Follows one log file, appending new lines as they are written
+
+    Only the latest lines are kept (see ``LogTail``); older ones are read
+    from disk when asked for, and stay shown until another log is chosen.
+    Polling stops while the viewer is hidden.
+    """
+    LOG_FILES = {
+        "System Logs": "system.log",
+        "Audit Logs": "audit.log",
+        "Security Logs": "security.log",
+        "Error Logs": "error.log",
+        "Performance Logs": "performance.log",
+        "Slow Queries": "slow_queries.log",
+    }
+    MAX_LINES = 2000   # lines kept per log while following it
+    PAGE_LINES = 500   # older lines read per "Load Older" click
+    POLL_MS = 2000
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setup_ui()
-        self.log_timer = QTimer()
+        self.tails = {}  # log type -> LogTail
+        self.older_position = None  # where the next older page ends, once paging
+        self.log_timer = QTimer(self)
         self.log_timer.timeout.connect(self.update_logs)
-        self.log_timer.start(5000)  # Update every 5 seconds
+        self.setup_ui()
         
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -40,8 +52,8 @@ class LogViewer(QWidget):
         
         # Log type selector
         self.log_type = QComboBox()
-        self.log_type.addItems(["System Logs", "Audit Logs"])
-        self.log_type.currentTextChanged.connect(self.update_logs)
+        self.log_type.addItems(list(self.LOG_FILES))
+        self.log_type.currentTextChanged.connect(self.show_log_type)
         controls.addWidget(QLabel("Log Type:"))
         controls.addWidget(self.log_type)
         
@@ -50,6 +62,11 @@ class LogViewer(QWidget):
         refresh_btn.clicked.connect(self.update_logs)
         controls.addWidget(refresh_btn)
         
+        # Older history button
+        self.older_btn = QPushButton("Load Older")
+        self.older_btn.clicked.connect(self.load_older)
+        controls.addWidget(self.older_btn)
+        
         # Clear button
         clear_btn = QPushButton("Clear")
         clear_btn.clicked.connect(self.clear_logs)
@@ -59,10 +76,11 @@ class LogViewer(QWidget):
         layout.addLayout(controls)
         
         # Log display
-        self.log_display = QTextEdit()
+        self.log_display = QPlainTextEdit()
         self.log_display.setReadOnly(True)
+        self.log_display.setMaximumBlockCount(self.MAX_LINES)
         self.log_display.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #2f3136;
                 color: #dcddde;
                 border: 1px solid #202225;
@@ -72,26 +90,77 @@ class LogViewer(QWidget):
             }
         """)
         layout.addWidget(self.log_display)
-        
-        # Initial load
+
+    def showEvent(self, event):
+        super().showEvent(event)
         self.update_logs()
-        
-    def update_logs(self):
+        self.log_timer.start(self.POLL_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.log_timer.stop()
+
+    def current_tail(self):
         log_type = self.log_type.currentText()
-        log_file = "logs/pos_system.log" if log_type == "System Logs" else "logs/audit.log"
-        
+        tail = self.tails.get(log_type)
+        if tail is None:
+            tail = LogTail(os.path.join(LOG_DIR, self.LOG_FILES[log_type]), self.MAX_LINES)
+            self.tails[log_type] = tail
+        return tail
+
+    def show_log_type(self):
+        self.show_buffer(self.current_tail())
+        self.update_logs()
+
+    def show_buffer(self, tail):
+        """Show the lines buffered for a log, dropping any older pages"""
+        self.log_display.setMaximumBlockCount(self.MAX_LINES)
+        self.log_display.setPlainText("\n".join(text for _, _, text in tail.lines))
+        self.log_display.moveCursor(QTextCursor.End)
+        self.older_position = None
+        self.older_btn.setEnabled(True)
+
+    def update_logs(self):
+        """Append the lines written since the last poll"""
+        tail = self.current_tail()
         try:
-            with open(log_file, 'r') as f:
-                content = f.read()
-                self.log_display.setText(content)
-                # Scroll to bottom
-                self.log_display.moveCursor(QTextCursor.End)
-        except Exception as e:
-            self.log_display.setText(f"Error reading log file: {str(e)}")
+            lines, reset = tail.poll()
+        except OSError as e:
+            self.log_display.setPlainText(f"Error reading log file: {str(e)}")
+            return
+        if reset:
+            self.show_buffer(tail)
+        elif lines:
+            scrollbar = self.log_display.verticalScrollBar()
+            following = scrollbar.value() == scrollbar.maximum()
+            self.log_display.appendPlainText("\n".join(lines))
+            if following:
+                scrollbar.setValue(scrollbar.maximum())
+
+    def load_older(self):
+        """Read the page of lines before the oldest one shown from disk"""
+        tail = self.current_tail()
+        if self.older_position is None:
+            # The shown lines are the buffered ones; keep them from being trimmed
+            # while older pages are shown above them
+            self.older_position = tail.start
+            self.log_display.setMaximumBlockCount(0)
+        try:
+            lines, self.older_position = tail.read_before(self.older_position, self.PAGE_LINES)
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Failed to read older logs: {str(e)}")
+            return
+        if not lines:
+            self.older_btn.setEnabled(False)
+            return
+        cursor = QTextCursor(self.log_display.document())
+        cursor.movePosition(QTextCursor.Start)
+        cursor.insertText("\n".join(lines) + "\n")
+        self.log_display.verticalScrollBar().setValue(0)
             
     def clear_logs(self):
         log_type = self.log_type.currentText()
-        log_file = "logs/pos_system.log" if log_type == "System Logs" else "logs/audit.log"
+        log_file = os.path.join(LOG_DIR, self.LOG_FILES[log_type])
         
         try:
             with open(log_file, 'w') as f:
@@ -101,11 +170,106 @@ class LogViewer(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to clear logs: {str(e)}")
 
+class MetricsView(QWidget):
+    """Latency percentiles, counters and gauges recorded by this process"""
+    POLL_MS = 2000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.update_metrics)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.update_metrics)
+        controls.addWidget(refresh_btn)
+        export_btn = QPushButton("Export OpenMetrics")
+        export_btn.clicked.connect(self.export_metrics)
+        controls.addWidget(export_btn)
+        controls.addStretch()
+        layout.addLayout(controls)
+
+        layout.addWidget(QLabel("Latency (ms), most total time first"))
+        self.latency_table = QTableWidget()
+        self.latency_table.setColumnCount(7)
+        self.latency_table.setHorizontalHeaderLabels(
+            ["Metric", "Labels", "Calls", "p50", "p95", "p99", "Mean"]
+        )
+        self.latency_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.latency_table, 3)
+
+        layout.addWidget(QLabel("Counters and gauges"))
+        self.values_table = QTableWidget()
+        self.values_table.setColumnCount(3)
+        self.values_table.setHorizontalHeaderLabels(["Metric", "Labels", "Value"])
+        self.values_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.values_table, 1)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_metrics()
+        self.metrics_timer.start(self.POLL_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.metrics_timer.stop()
+
+    def update_metrics(self):
+        latencies, values = [], []
+        for metric in metrics.registry.metrics():
+            if isinstance(metric, metrics.Histogram):
+                for key, counts, count, total in metric.samples():
+                    latencies.append((total, metric.name, key, count, [
+                        metric.quantile(q, counts) * 1000 for q in (0.5, 0.95, 0.99)
+                    ]))
+            else:
+                values.extend((metric.name, key, value) for key, value in metric.samples())
+        latencies.sort(key=lambda row: row[0], reverse=True)
+
+        self.latency_table.setRowCount(len(latencies))
+        for row, (total, name, key, count, percentiles) in enumerate(latencies):
+            cells = [name, self.format_labels(key), str(count)]
+            cells += [f"{value:.1f}" for value in percentiles]
+            cells.append(f"{total / count * 1000:.1f}")
+            for column, text in enumerate(cells):
+                self.latency_table.setItem(row, column, QTableWidgetItem(text))
+
+        self.values_table.setRowCount(len(values))
+        for row, (name, key, value) in enumerate(values):
+            text = f"{value:.3f}" if isinstance(value, float) else str(value)
+            for column, cell in enumerate([name, self.format_labels(key), text]):
+                self.values_table.setItem(row, column, QTableWidgetItem(cell))
+
+    @staticmethod
+    def format_labels(key):
+        return ", ".join(f"{name}={value}" for name, value in key)
+
+    def export_metrics(self):
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "Export Metrics", "pos_metrics.prom", "OpenMetrics (*.prom);;All Files (*)"
+        )
+        if not filepath:
+            return
+        try:
+            metrics.registry.write_openmetrics(filepath)
+            pos_logger.log_file_operation("export", filepath, "OpenMetrics")
+            QMessageBox.information(self, "Success", f"Metrics exported to {filepath}")
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to export metrics: {str(e)}")
+
 class AdminDashboard(QMainWindow):
     def __init__(self, user_data):
         super().__init__()
         self.user_data = user_data
-        self.db = Database()
+        self.db = get_database()
+        # Daily reports are computed off the GUI thread, latest date only
+        self.daily_report_runner = ReportRunner(self)
+        self.daily_report_runner.ready.connect(self.show_daily_report)
+        self.daily_report_runner.failed.connect(self.daily_report_failed)
         self.setup_ui()
         self.showMaximized()
         pos_logger.log_audit(
@@ -153,8 +317,10 @@ class AdminDashboard(QMainWindow):
         
         # Add tabs
         self.setup_daily_report_tab()
+        self.setup_period_report_tab()
         self.setup_accounting_report_tab()
         self.setup_logs_tab()
+        self.setup_metrics_tab()
         
         # Set the style
         self.setStyleSheet("""
@@ -282,32 +448,12 @@ class AdminDashboard(QMainWindow):
             action="Logout",
             details="User logged out from admin dashboard"
         )
-        # Create and show login screen
+        # Show the terminal's login screen again; it routes the next login
         from login import LoginScreen
-        self.login_screen = LoginScreen()
-        self.login_screen.login_successful.connect(self.handle_login)
-        self.login_screen.show()
+        self.login_screen = LoginScreen.shared()
         # Close current window
         self.close()
 
-    def handle_login(self, user_data):
-        """Handle successful login"""
-        user_id, user_name, role = user_data
-        if role == 'admin':
-            # Show admin dashboard for admin users
-            self.admin_dashboard = AdminDashboard(user_data)
-            self.admin_dashboard.show()
-            pos_logger.log_info(f"Admin dashboard opened for user: {user_name}")
-        else:
-            # Show restaurant view for staff users
-            from tablemanager import RestaurantView
-            self.restaurant_view = RestaurantView(user_data)
-            self.restaurant_view.show()
-            pos_logger.log_info(f"Restaurant view opened for user: {user_name}")
-        
-        # Close login screen
-        self.login_screen.close()
-
     def setup_daily_report_tab(self):
         """Setup the daily report tab with all its components"""
         daily_tab = QWidget()
@@ -326,9 +472,17 @@ class AdminDashboard(QMainWindow):
         self.date_selector.setCalendarPopup(True)
         self.date_selector.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
         self.date_selector.setMinimumWidth(150)
-        self.date_selector.dateChanged.connect(self.update_daily_report)
+        # update_daily_report reads the date itself; do not pass it the QDate
+        self.date_selector.dateChanged.connect(lambda: self.update_daily_report())
         header_layout.addWidget(self.date_selector)
         
+        # Shown while the report for the selected date is being computed
+        self.daily_loading_label = QLabel("")
+        self.daily_loading_label.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        self.daily_report_runner.busy_changed.connect(
+            lambda busy: self.daily_loading_label.setText("Loading..." if busy else ""))
+        header_layout.addWidget(self.daily_loading_label)
+        
         # Add print report button
         self.print_btn = QPushButton("Print Daily Report")
         self.print_btn.clicked.connect(self.print_daily_report)
@@ -347,6 +501,7 @@ class AdminDashboard(QMainWindow):
         scroll.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         
         reports_widget = QWidget()
+        self.daily_reports_widget = reports_widget
         reports_layout = QVBoxLayout(reports_widget)
         reports_layout.setSpacing(30)
         reports_layout.setContentsMargins(10, 10, 10, 10)
@@ -414,6 +569,8 @@ class AdminDashboard(QMainWindow):
         # Revenue chart
         self.revenue_figure = Figure(figsize=(10, 5), facecolor='#2f3136')
         self.revenue_canvas = FigureCanvas(self.revenue_figure)
+        self.revenue_chart = charts.BarChart(self.revenue_figure, self.revenue_canvas,
+                                             'Revenue by Hour', 'Hour', 'Revenue (€)')
         self.revenue_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         revenue_layout.addWidget(self.revenue_canvas)
         
@@ -459,6 +616,8 @@ class AdminDashboard(QMainWindow):
         # Transaction chart
         self.transaction_figure = Figure(figsize=(10, 5), facecolor='#2f3136')
         self.transaction_canvas = FigureCanvas(self.transaction_figure)
+        self.transaction_chart = charts.LineChart(self.transaction_figure, self.transaction_canvas,
+                                                  'Transactions by Hour', 'Hour', 'Number of Transactions')
         self.transaction_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         transaction_layout.addWidget(self.transaction_canvas)
         
@@ -493,6 +652,7 @@ class AdminDashboard(QMainWindow):
         # Menu chart
         self.menu_figure = Figure(figsize=(10, 5), facecolor='#2f3136')
         self.menu_canvas = FigureCanvas(self.menu_figure)
+        self.menu_chart = charts.PieChart(self.menu_figure, self.menu_canvas, 'Revenue by Category')
         self.menu_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         menu_layout.addWidget(self.menu_canvas)
         
@@ -538,6 +698,8 @@ class AdminDashboard(QMainWindow):
         # Tax chart
         self.tax_figure = Figure(figsize=(10, 5), facecolor='#2f3136')
         self.tax_canvas = FigureCanvas(self.tax_figure)
+        self.tax_chart = charts.BarChart(self.tax_figure, self.tax_canvas,
+                                         'Tax by Category', 'Category', 'Tax Amount (€)')
         self.tax_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         tax_layout.addWidget(self.tax_canvas)
         
@@ -551,6 +713,152 @@ class AdminDashboard(QMainWindow):
         # Initial data load
         self.update_daily_report()
 
+    def setup_period_report_tab(self):
+        """Setup the period report tab: totals over a date range per day, week, month, quarter or year"""
+        period_tab = QWidget()
+        layout = QVBoxLayout(period_tab)
+        
+        # Title and range selection
+        header_layout = QHBoxLayout()
+        title = QLabel("Period Reports")
+        title.setFont(QFont("Arial", 24, QFont.Bold))
+        title.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        header_layout.addWidget(title)
+        
+        today = QDate.currentDate()
+        self.period_start_selector = QDateEdit()
+        self.period_start_selector.setDate(QDate(today.year(), today.month(), 1))
+        self.period_end_selector = QDateEdit()
+        self.period_end_selector.setDate(today)
+        for selector in (self.period_start_selector, self.period_end_selector):
+            selector.setCalendarPopup(True)
+            selector.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+            selector.setMinimumWidth(150)
+        header_layout.addWidget(QLabel("From"))
+        header_layout.addWidget(self.period_start_selector)
+        header_layout.addWidget(QLabel("To"))
+        header_layout.addWidget(self.period_end_selector)
+        
+        self.period_bucket_selector = QComboBox()
+        for label, bucket in (("Per Day", 'day'), ("Per Week", 'week'), ("Per Month", 'month'),
+                              ("Per Quarter", 'quarter'), ("Per Year", 'year')):
+            self.period_bucket_selector.addItem(label, bucket)
+        header_layout.addWidget(self.period_bucket_selector)
+        
+        show_btn = QPushButton("Show Report")
+        show_btn.clicked.connect(self.update_period_report)
+        header_layout.addWidget(show_btn)
+        
+        layout.addLayout(header_layout)
+        
+        # Quick ranges for the accountant
+        presets_layout = QHBoxLayout()
+        for label, preset in (("This Month", 'month'), ("This Quarter", 'quarter'),
+                              ("This Year", 'year'), ("Last Year", 'last_year')):
+            preset_btn = QPushButton(label)
+            preset_btn.clicked.connect(lambda checked, preset=preset: self.select_period_preset(preset))
+            presets_layout.addWidget(preset_btn)
+        presets_layout.addStretch()
+        layout.addLayout(presets_layout)
+        
+        # Range totals
+        stats_layout = QHBoxLayout()
+        stats_layout.setSpacing(30)
+        self.period_stat_labels = {}
+        for key, label in (('revenue', "Total Revenue"), ('transactions', "Transactions"),
+                           ('average_order', "Average Order"), ('tips', "Tips"), ('tax', "Total Tax")):
+            container = QFrame()
+            container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+            container.setStyleSheet("""
+                QFrame {
+                    background-color: #40444b;
+                    border-radius: 10px;
+                    padding: 15px;
+                }
+            """)
+            container_layout = QVBoxLayout(container)
+            name_label = QLabel(label)
+            name_label.setFont(QFont("Arial", 12))
+            value_label = QLabel("0")
+            value_label.setFont(QFont("Arial", 20, QFont.Bold))
+            container_layout.addWidget(name_label)
+            container_layout.addWidget(value_label)
+            self.period_stat_labels[key] = value_label
+            stats_layout.addWidget(container)
+        layout.addLayout(stats_layout)
+        
+        # Revenue per period chart
+        self.period_figure = Figure(figsize=(10, 4), facecolor='#2f3136')
+        self.period_canvas = FigureCanvas(self.period_figure)
+        self.period_chart = charts.BarChart(self.period_figure, self.period_canvas, 'Revenue per Day',
+                                            ylabel='Revenue (€)', tight_layout=True)
+        self.period_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        layout.addWidget(self.period_canvas)
+        
+        # Per-period breakdown
+        self.period_table = QTableWidget()
+        self.period_table.setColumnCount(6)
+        self.period_table.setHorizontalHeaderLabels(
+            ["Period", "Revenue", "Transactions", "Average Order", "Tips", "Tax"]
+        )
+        self.period_table.horizontalHeader().setStretchLastSection(True)
+        self.period_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        layout.addWidget(self.period_table)
+        
+        self.tab_widget.addTab(period_tab, "Period Reports")
+
+    def select_period_preset(self, preset):
+        """Fill the range selectors with a common accounting period and show it"""
+        today = QDate.currentDate()
+        if preset == 'month':
+            start, end, bucket = QDate(today.year(), today.month(), 1), today, 'day'
+        elif preset == 'quarter':
+            first_month = (today.month() - 1) // 3 * 3 + 1
+            start, end, bucket = QDate(today.year(), first_month, 1), today, 'week'
+        elif preset == 'year':
+            start, end, bucket = QDate(today.year(), 1, 1), today, 'month'
+        else:
+            start, end, bucket = QDate(today.year() - 1, 1, 1), QDate(today.year() - 1, 12, 31), 'month'
+        self.period_start_selector.setDate(start)
+        self.period_end_selector.setDate(end)
+        self.period_bucket_selector.setCurrentIndex(self.period_bucket_selector.findData(bucket))
+        self.update_period_report()
+
+    def update_period_report(self):
+        """Update the period report for the selected range and bucket"""
+        start_date = self.period_start_selector.date().toPyDate()
+        end_date = self.period_end_selector.date().toPyDate()
+        bucket = self.period_bucket_selector.currentData()
+        if end_date < start_date:
+            QMessageBox.warning(self, "Invalid Range", "The end date must not be before the start date.")
+            return
+        pos_logger.log_audit(
+            user=f"{self.user_data[1]} (ID: {self.user_data[0]})",
+            action="View Period Report",
+            details=f"Range: {start_date} - {end_date}, per {bucket}"
+        )
+        
+        report = self.db.get_range_report(start_date, end_date, bucket)
+        periods = report['periods']
+        
+        self.period_stat_labels['revenue'].setText(f"€{report['revenue']['total']:.2f}")
+        self.period_stat_labels['transactions'].setText(str(report['transactions']['count']))
+        self.period_stat_labels['average_order'].setText(f"€{report['transactions']['average_order']:.2f}")
+        self.period_stat_labels['tips'].setText(f"€{report['payments']['tips']:.2f}")
+        self.period_stat_labels['tax'].setText(f"€{report['tax']['total']:.2f}")
+        
+        self.period_table.setRowCount(len(periods))
+        for i, (period, data) in enumerate(periods.iterrows()):
+            self.period_table.setItem(i, 0, QTableWidgetItem(str(period)))
+            self.period_table.setItem(i, 1, QTableWidgetItem(f"€{data['revenue']:.2f}"))
+            self.period_table.setItem(i, 2, QTableWidgetItem(str(int(data['transactions']))))
+            self.period_table.setItem(i, 3, QTableWidgetItem(f"€{data['average_order']:.2f}"))
+            self.period_table.setItem(i, 4, QTableWidgetItem(f"€{data['tips']:.2f}"))
+            self.period_table.setItem(i, 5, QTableWidgetItem(f"€{data['tax']:.2f}"))
+        
+        self.period_chart.set_title(f"Revenue per {bucket.capitalize()}")
+        self.period_chart.update(periods['revenue'])
+
     def setup_accounting_report_tab(self):
         """Setup the accounting report tab"""
         accounting_tab = QWidget()
@@ -583,6 +891,40 @@ class AdminDashboard(QMainWindow):
         info_text.setWordWrap(True)
         layout.addWidget(info_text)
         
+        # Period export: one accounting PDF per day, built in worker processes
+        export_layout = QHBoxLayout()
+        export_layout.addWidget(QLabel("Period:"))
+        today = QDate.currentDate()
+        self.export_start_selector = QDateEdit(QDate(today.year(), today.month(), 1))
+        self.export_end_selector = QDateEdit(today)
+        for selector in (self.export_start_selector, self.export_end_selector):
+            selector.setCalendarPopup(True)
+            selector.setMinimumWidth(150)
+        export_layout.addWidget(self.export_start_selector)
+        export_layout.addWidget(QLabel("to"))
+        export_layout.addWidget(self.export_end_selector)
+        self.export_btn = QPushButton("Export Period")
+        self.export_btn.clicked.connect(self.export_accounting_range)
+        export_layout.addWidget(self.export_btn)
+        self.export_cancel_btn = QPushButton("Cancel")
+        self.export_cancel_btn.clicked.connect(self.cancel_accounting_export)
+        self.export_cancel_btn.setEnabled(False)
+        export_layout.addWidget(self.export_cancel_btn)
+        export_layout.addStretch()
+        layout.addLayout(export_layout)
+        
+        self.export_progress = QProgressBar()
+        self.export_progress.setVisible(False)
+        layout.addWidget(self.export_progress)
+        self.export_status = QLabel("")
+        layout.addWidget(self.export_status)
+        layout.addStretch()
+        
+        self.export_job = None
+        self.export_timer = QTimer(self)
+        self.export_timer.setInterval(200)
+        self.export_timer.timeout.connect(self.update_export_progress)
+        
         self.tab_widget.addTab(accounting_tab, "Accounting Reports")
 
     def setup_logs_tab(self):
@@ -590,8 +932,17 @@ class AdminDashboard(QMainWindow):
         logs_tab = LogViewer()
         self.tab_widget.addTab(logs_tab, "System Logs")
 
+    def setup_metrics_tab(self):
+        """Setup the metrics tab"""
+        self.tab_widget.addTab(MetricsView(), "Metrics")
+
+    @timed('pos_ui_handler_seconds', handler='update_daily_report')
     def update_daily_report(self):
-        """Update all report data for the selected date"""
+        """Start computing the report for the selected date in the background
+        
+        Supersedes a report still being computed for an earlier selection;
+        show_daily_report fills in the widgets when the result arrives.
+        """
         selected_date = self.date_selector.date().toPyDate()
         pos_logger.log_audit(
             user=f"{self.user_data[1]} (ID: {self.user_data[0]})",
@@ -599,39 +950,31 @@ class AdminDashboard(QMainWindow):
             details=f"Date: {selected_date}"
         )
         
-        db = Database()
-        summary = db.get_daily_summary(selected_date)
+        self.daily_reports_widget.setEnabled(False)
+        self.daily_report_runner.submit(selected_date, self.db.get_daily_summary, selected_date)
+    
+    def daily_report_failed(self, selected_date, message):
+        self.daily_reports_widget.setEnabled(True)
+        pos_logger.log_error(f"Failed to compute daily report for {selected_date}: {message}")
+        QMessageBox.warning(self, "Error", f"Failed to load the report for {selected_date}!")
+    
+    @timed('pos_ui_handler_seconds', handler='show_daily_report')
+    def show_daily_report(self, selected_date, summary):
+        """Update all report widgets with the summary of a date"""
+        self.daily_reports_widget.setEnabled(True)
         
         # Update Revenue Overview
         self.total_revenue_label.setText(f"€{summary['revenue']['total']:.2f}")
         self.avg_order_label.setText(f"€{summary['transactions']['average_order']:.2f}")
         
         # Plot revenue by hour
-        self.revenue_figure.clear()
-        ax = self.revenue_figure.add_subplot(111)
-        if not summary['revenue']['by_hour'].empty:
-            summary['revenue']['by_hour'].plot(kind='bar', ax=ax, color='#5865f2')
-        ax.set_title('Revenue by Hour')
-        ax.set_xlabel('Hour')
-        ax.set_ylabel('Revenue (€)')
-        ax.set_facecolor('#2f3136')
-        ax.tick_params(colors='#dcddde')
-        self.revenue_canvas.draw()
+        self.revenue_chart.update(summary['revenue']['by_hour'])
         
         # Update Transaction Analysis
         self.transaction_count_label.setText(str(summary['transactions']['count']))
         
         # Plot transaction distribution
-        self.transaction_figure.clear()
-        ax = self.transaction_figure.add_subplot(111)
-        if not summary['transactions']['hourly_distribution'].empty:
-            summary['transactions']['hourly_distribution'].plot(kind='line', ax=ax, color='#5865f2')
-        ax.set_title('Transactions by Hour')
-        ax.set_xlabel('Hour')
-        ax.set_ylabel('Number of Transactions')
-        ax.set_facecolor('#2f3136')
-        ax.tick_params(colors='#dcddde')
-        self.transaction_canvas.draw()
+        self.transaction_chart.update(summary['transactions']['hourly_distribution'])
         
         # Update Menu Analysis
         top_items = summary['menu']['top_items']
@@ -642,28 +985,13 @@ class AdminDashboard(QMainWindow):
             self.top_items_table.setItem(i, 2, QTableWidgetItem(f"€{data['price']:.2f}"))
         
         # Plot category analysis
-        self.menu_figure.clear()
-        ax = self.menu_figure.add_subplot(111)
-        if not summary['menu']['category_analysis']['revenue'].empty:
-            summary['menu']['category_analysis']['revenue'].plot(kind='pie', ax=ax, autopct='%1.1f%%')
-        ax.set_title('Revenue by Category')
-        ax.set_facecolor('#2f3136')
-        self.menu_canvas.draw()
+        self.menu_chart.update(summary['menu']['category_analysis']['revenue'])
         
         # Update Tax Analysis
         self.total_tax_label.setText(f"€{summary['tax']['total']:.2f}")
         
         # Plot tax by category
-        self.tax_figure.clear()
-        ax = self.tax_figure.add_subplot(111)
-        if not summary['tax']['by_category'].empty:
-            summary['tax']['by_category'].plot(kind='bar', ax=ax, color='#5865f2')
-        ax.set_title('Tax by Category')
-        ax.set_xlabel('Category')
-        ax.set_ylabel('Tax Amount (€)')
-        ax.set_facecolor('#2f3136')
-        ax.tick_params(colors='#dcddde')
-        self.tax_canvas.draw()
+        self.tax_chart.update(summary['tax']['by_category'])
     
     def print_daily_report(self):
         """Generate and save a printable daily report as PDF"""
@@ -676,149 +1004,11 @@ class AdminDashboard(QMainWindow):
         
         summary = self.db.get_daily_summary(selected_date)
         
-        # Create reports directory if it doesn't exist
-        os.makedirs("Reports", exist_ok=True)
-        
-        # Generate filename with date
-        filename = f"daily_report_{selected_date}.pdf"
-        filepath = os.path.join("Reports", filename)
+        # Creates Reports/ or Boekhouding/ if needed
+        filepath = report_export.report_path('daily', selected_date)
         
         try:
-            # Create PDF document
-            doc = SimpleDocTemplate(filepath, pagesize=letter)
-            styles = getSampleStyleSheet()
-            elements = []
-            
-            # Title
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                spaceAfter=30
-            )
-            elements.append(Paragraph(f"Daily Sales Report - {selected_date}", title_style))
-            elements.append(Spacer(1, 20))
-            
-            # Revenue Summary
-            elements.append(Paragraph("Revenue Summary", styles['Heading2']))
-            revenue_data = [
-                ["Total Revenue", f"€{summary['revenue']['total']:.2f}"],
-                ["Average Order", f"€{summary['transactions']['average_order']:.2f}"],
-                ["Total Transactions", str(summary['transactions']['count'])]
-            ]
-            revenue_table = Table(revenue_data, colWidths=[3*inch, 2*inch])
-            revenue_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            elements.append(revenue_table)
-            elements.append(Spacer(1, 20))
-            
-            # Revenue by Hour Chart
-            if not summary['revenue']['by_hour'].empty:
-                elements.append(Paragraph("Revenue by Hour", styles['Heading2']))
-                drawing = Drawing(400, 200)
-                bc = VerticalBarChart()
-                bc.x = 50
-                bc.y = 50
-                bc.height = 125
-                bc.width = 300
-                bc.data = [summary['revenue']['by_hour'].values.tolist()]
-                bc.categoryAxis.categoryNames = [f"{h:02d}:00" for h in summary['revenue']['by_hour'].index]
-                bc.valueAxis.valueMin = 0
-                bc.valueAxis.valueMax = summary['revenue']['by_hour'].max() * 1.1
-                drawing.add(bc)
-                elements.append(drawing)
-                elements.append(Spacer(1, 20))
-            
-            # Menu Analysis
-            elements.append(Paragraph("Top Selling Items", styles['Heading2']))
-            if not summary['menu']['top_items'].empty:
-                menu_data = [["Item", "Quantity", "Revenue"]]
-                for name, data in summary['menu']['top_items'].iterrows():
-                    menu_data.append([
-                        name,
-                        str(int(data['quantity'])),
-                        f"€{data['price']:.2f}"
-                    ])
-                menu_table = Table(menu_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
-                menu_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 12),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                elements.append(menu_table)
-                elements.append(Spacer(1, 20))
-            
-            # Category Analysis
-            elements.append(Paragraph("Revenue by Category", styles['Heading2']))
-            if not summary['menu']['category_analysis']['revenue'].empty:
-                category_data = [["Category", "Revenue", "Quantity"]]
-                for category, revenue in summary['menu']['category_analysis']['revenue'].items():
-                    quantity = summary['menu']['category_analysis']['quantity'][category]
-                    category_data.append([
-                        category,
-                        f"€{revenue:.2f}",
-                        str(int(quantity))
-                    ])
-                category_table = Table(category_data, colWidths=[2*inch, 2*inch, 2*inch])
-                category_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 12),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                elements.append(category_table)
-                elements.append(Spacer(1, 20))
-            
-            # Tax Analysis
-            elements.append(Paragraph("Tax Analysis", styles['Heading2']))
-            tax_data = [
-                ["Total Tax", f"€{summary['tax']['total']:.2f}"]
-            ]
-            if not summary['tax']['by_category'].empty:
-                tax_data.append(["Tax by Category", ""])
-                for category, tax in summary['tax']['by_category'].items():
-                    tax_data.append([category, f"€{tax:.2f}"])
-            
-            tax_table = Table(tax_data, colWidths=[3*inch, 2*inch])
-            tax_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            elements.append(tax_table)
-            
-            # Build PDF
-            doc.build(elements)
+            report_export.build_daily_report_pdf(summary, selected_date, filepath)
             
             QMessageBox.information(self, "Success", f"Daily report has been saved to:\n{filepath}")
             pos_logger.log_info(f"Daily report generated successfully: {filepath}")
@@ -839,124 +1029,11 @@ class AdminDashboard(QMainWindow):
         
         summary = self.db.get_daily_summary(selected_date)
         
-        # Create Boekhouding directory if it doesn't exist
-        os.makedirs("Boekhouding", exist_ok=True)
-        
-        # Generate filename with date
-        filename = f"boekhouding_{selected_date}.pdf"
-        filepath = os.path.join("Boekhouding", filename)
+        # Creates Reports/ or Boekhouding/ if needed
+        filepath = report_export.report_path('boekhouding', selected_date)
         
         try:
-            # Create PDF document
-            doc = SimpleDocTemplate(filepath, pagesize=letter)
-            styles = getSampleStyleSheet()
-            elements = []
-            
-            # Title
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                spaceAfter=30
-            )
-            elements.append(Paragraph(f"Dagelijkse Boekhouding - {selected_date}", title_style))
-            elements.append(Spacer(1, 20))
-            
-            # Revenue Summary
-            elements.append(Paragraph("Omzet Overzicht", styles['Heading2']))
-            revenue_data = [
-                ["Totaal Omzet", f"€{summary['revenue']['total']:.2f}"],
-                ["Gemiddelde Bestelling", f"€{summary['transactions']['average_order']:.2f}"],
-                ["Totaal Transacties", str(summary['transactions']['count'])]
-            ]
-            revenue_table = Table(revenue_data, colWidths=[3*inch, 2*inch])
-            revenue_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            elements.append(revenue_table)
-            elements.append(Spacer(1, 20))
-            
-            # Payment Methods
-            elements.append(Paragraph("Betaalmethoden", styles['Heading2']))
-            payment_data = [
-                ["PIN", f"€{summary['revenue']['total'] * 0.7:.2f}"],  # Assuming 70% PIN payments
-                ["Contant", f"€{summary['revenue']['total'] * 0.3:.2f}"]  # Assuming 30% cash payments
-            ]
-            payment_table = Table(payment_data, colWidths=[3*inch, 2*inch])
-            payment_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            elements.append(payment_table)
-            elements.append(Spacer(1, 20))
-            
-            # Tax Analysis
-            elements.append(Paragraph("BTW Analyse", styles['Heading2']))
-            tax_data = [
-                ["Totaal BTW", f"€{summary['tax']['total']:.2f}"]
-            ]
-            if not summary['tax']['by_category'].empty:
-                tax_data.append(["BTW per Categorie", ""])
-                for category, tax in summary['tax']['by_category'].items():
-                    tax_data.append([category, f"€{tax:.2f}"])
-            
-            tax_table = Table(tax_data, colWidths=[3*inch, 2*inch])
-            tax_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            elements.append(tax_table)
-            elements.append(Spacer(1, 20))
-            
-            # Category Analysis
-            elements.append(Paragraph("Omzet per Categorie", styles['Heading2']))
-            if not summary['menu']['category_analysis']['revenue'].empty:
-                category_data = [["Categorie", "Omzet", "Aantal"]]
-                for category, revenue in summary['menu']['category_analysis']['revenue'].items():
-                    quantity = summary['menu']['category_analysis']['quantity'][category]
-                    category_data.append([
-                        category,
-                        f"€{revenue:.2f}",
-                        str(int(quantity))
-                    ])
-                category_table = Table(category_data, colWidths=[2*inch, 2*inch, 2*inch])
-                category_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 12),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                elements.append(category_table)
-            
-            # Build PDF
-            doc.build(elements)
+            report_export.build_accounting_pdf(summary, selected_date, filepath)
             
             QMessageBox.information(self, "Success", f"Boekhouding rapport is opgeslagen in:\n{filepath}")
             pos_logger.log_info(f"Accounting report generated successfully: {filepath}")
@@ -966,6 +1043,83 @@ class AdminDashboard(QMainWindow):
             pos_logger.log_error(error_msg)
             QMessageBox.critical(self, "Error", error_msg)
 
+    def export_accounting_range(self):
+        """Start exporting an accounting PDF for every day of the selected period"""
+        start_date = self.export_start_selector.date().toPyDate()
+        end_date = self.export_end_selector.date().toPyDate()
+        if end_date < start_date:
+            QMessageBox.warning(self, "Invalid Range", "The end date must not be before the start date.")
+            return
+        pos_logger.log_audit(
+            user=f"{self.user_data[1]} (ID: {self.user_data[0]})",
+            action="Export Accounting Reports",
+            details=f"Range: {start_date} - {end_date}"
+        )
+        
+        self.export_job = report_export.BatchExport(self.db.db_name, 'boekhouding', start_date, end_date)
+        self.export_job.start()
+        self.export_progress.setRange(0, self.export_job.total)
+        self.export_progress.setValue(0)
+        self.export_progress.setVisible(True)
+        self.export_btn.setEnabled(False)
+        self.export_cancel_btn.setEnabled(True)
+        self.export_status.setText(f"Exporting {self.export_job.total} days...")
+        self.export_timer.start()
+    
+    def update_export_progress(self):
+        """Poll the running export; write the manifest once every day is done"""
+        done = self.export_job.poll()
+        self.export_progress.setValue(done)
+        if not self.export_cancel_btn.isEnabled():
+            self.export_status.setText("Cancelling, waiting for the days being exported...")
+        else:
+            self.export_status.setText(f"{done} of {self.export_job.total} days exported")
+        if done < self.export_job.total:
+            return
+        self.finish_accounting_export()
+    
+    def cancel_accounting_export(self):
+        """Drop the days not started yet; the timer finishes once the rest are done"""
+        if self.export_job is not None:
+            self.export_job.cancel()
+            self.export_cancel_btn.setEnabled(False)
+            self.export_status.setText("Cancelling, waiting for the days being exported...")
+    
+    def finish_accounting_export(self):
+        self.export_timer.stop()
+        job, self.export_job = self.export_job, None
+        try:
+            manifest = job.finish()
+        except Exception as e:
+            error_msg = f"Fout bij het exporteren van de boekhouding: {str(e)}"
+            pos_logger.log_error(error_msg)
+            QMessageBox.critical(self, "Error", error_msg)
+            manifest = None
+        finally:
+            self.export_btn.setEnabled(True)
+            self.export_cancel_btn.setEnabled(False)
+            self.export_progress.setVisible(False)
+        if manifest is None:
+            self.export_status.setText("")
+            return
+        
+        exported = len(job.results) - len(job.failures)
+        prefix = "Cancelled: " if job.cancelled else ""
+        self.export_status.setText(f"{prefix}{exported} of {job.total} days exported, overview in {manifest}")
+        pos_logger.log_info(f"Accounting reports exported: {exported}/{job.total}, "
+                            f"{len(job.cancelled)} cancelled, manifest {manifest}")
+        for row in job.failures:
+            pos_logger.log_error(f"Accounting export failed for {row['day']}: {row['error']}")
+        if not self.isVisible():
+            # Cancelled by closing the dashboard; the log and manifest are enough
+            return
+        if job.failures:
+            QMessageBox.warning(self, "Export", f"{len(job.failures)} dagen konden niet worden geëxporteerd.\n"
+                                                f"Overzicht: {manifest}")
+        elif not job.cancelled:
+            QMessageBox.information(self, "Success", f"Boekhouding rapporten zijn opgeslagen in:\n"
+                                                     f"{job.directory}\nOverzicht: {manifest}")
+
     def closeEvent(self, event):
         """Handle window close event"""
         pos_logger.log_audit(
@@ -973,4 +1127,8 @@ class AdminDashboard(QMainWindow):
             action="Admin Dashboard Close",
             details="Dashboard closed"
         )
+        # A report still being computed has nowhere to go
+        self.daily_report_runner.cancel()
+        if self.export_job is not None:
+            self.cancel_accounting_export()
         event.accept()
\ No newline at end of file
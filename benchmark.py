@@ -0,0 +1,1514 @@
+"""Performance benchmarks for the POS system.
+
+Every benchmark runs against a throw-away database in a temporary directory,
+so it never touches the real ``pos_system.db``. Run one with::
+
+    python benchmark.py connections
+
+``plans`` is a regression check rather than a timing run: it exits non-zero
+when a hot query's plan falls back to a full table scan. ``range`` likewise
+fails when a full-year report exceeds its time budget, and ``startup`` when
+a waiter terminal is slow to show its login screen or loads the reporting
+libraries.
+"""
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from database import ConnectionManager, Database, day_range, get_database
+from order_buffer import OrderEntryBuffer
+import rollups
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _timed(func, repeat):
+    """Return the mean duration of ``func`` in microseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def _report(title, rows):
+    print(title)
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f"  {name.ljust(width)}  {value}")
+
+
+def _generate_history(db, first_day, days, orders_per_day=150, items_per_order=3, seed=42):
+    """Bulk-insert paid orders for ``days`` consecutive days starting at ``first_day``"""
+    rng = random.Random(seed + first_day.toordinal())
+    menu = db.get_menu_items()
+    with db.connection() as conn:
+        order_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM orders").fetchone()[0]
+        orders, lines, payments = [], [], []
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            for _ in range(orders_per_day):
+                order_id += 1
+                created = f"{day.isoformat()} {rng.randint(11, 22):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+                total = 0.0
+                # One line per menu item, as the unique order line index requires
+                for item in rng.sample(menu, items_per_order):
+                    quantity = rng.randint(1, 3)
+                    lines.append((order_id, item[0], quantity))
+                    total += item[3] * quantity
+                orders.append((order_id, rng.randint(1, 10), 1, "paid", created))
+                payments.append((order_id, rng.choice(("cash", "pin")), total, round(total * 0.05, 2), 1, created))
+        conn.executemany(
+            "INSERT INTO orders (id, table_number, user_id, status, created_at) VALUES (?, ?, ?, ?, ?)",
+            orders
+        )
+        conn.executemany("INSERT INTO order_items (order_id, menu_item_id, quantity) VALUES (?, ?, ?)", lines)
+        conn.executemany(
+            "INSERT INTO transactions (order_id, payment_method, amount, tip_amount, user_id, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            payments
+        )
+        rollups.rebuild(conn.cursor(), *day_range(first_day, first_day + timedelta(days=days - 1)))
+        conn.commit()
+    return len(lines)
+
+
+def _daily_reports(db):
+    """The per-day report readers the admin dashboard and PDF exports use"""
+    return [
+        ("get_daily_revenue", db.get_daily_revenue),
+        ("get_daily_summary", db.get_daily_summary),
+        ("get_daily_tips", db.get_daily_tips),
+        ("get_daily_transaction_analysis", db.get_daily_transaction_analysis),
+        ("get_daily_menu_analysis", db.get_daily_menu_analysis),
+        ("get_daily_tax_analysis", db.get_daily_tax_analysis),
+        ("get_daily_average_order", db.get_daily_average_order),
+        ("get_daily_average_guests", db.get_daily_average_guests),
+        ("get_daily_payment_method_total", lambda date: db.get_daily_payment_method_total(date, "cash")),
+        ("get_daily_tax_total", db.get_daily_tax_total),
+        ("get_daily_top_items", db.get_daily_top_items),
+        ("get_daily_employee_sales", db.get_daily_employee_sales),
+    ]
+
+
+def _legacy_daily_summary(db, day):
+    """The row-level pandas implementation get_daily_summary used to have"""
+    with db.connection() as conn:
+        rows = conn.execute("""
+            SELECT t.created_at, t.amount, o.table_number, t.user_id,
+                   oi.menu_item_id, oi.quantity, mi.price,
+                   mi.name, mi.category
+            FROM transactions t
+            JOIN orders o ON t.order_id = o.id
+            JOIN order_items oi ON o.id = oi.order_id
+            JOIN menu_items mi ON oi.menu_item_id = mi.id
+            WHERE t.created_at >= ? AND t.created_at < ?
+        """, day_range(day)).fetchall()
+    df = pd.DataFrame(rows, columns=[
+        'created_at', 'amount', 'table_number', 'user_id',
+        'menu_item_id', 'quantity', 'price', 'item_name', 'category'
+    ])
+    df['created_at'] = pd.to_datetime(df['created_at'])
+    df.groupby(df['created_at'].dt.hour)['amount'].sum()
+    df.groupby(df['created_at'].dt.hour)['amount'].count()
+    df.groupby('item_name').agg({
+        'quantity': 'sum',
+        'price': lambda x: (x * df.loc[x.index, 'quantity']).sum()
+    }).sort_values('quantity', ascending=False)
+    df.groupby('category')['amount'].sum()
+    df.groupby('category')['quantity'].sum()
+
+
+def bench_connections(args):
+    """Per-call latency of connect-per-call versus pooled connections"""
+    db = Database()
+    order_id = db.create_order(1, 1)
+    db.add_item_to_order(order_id, 1, 1)
+
+    def connect_per_call_read():
+        conn = sqlite3.connect(db.db_name)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT mi.name, oi.quantity, mi.price
+            FROM order_items oi
+            JOIN menu_items mi ON oi.menu_item_id = mi.id
+            WHERE oi.order_id = ?
+        """, (order_id,))
+        cursor.fetchall()
+        conn.close()
+
+    def connect_per_call_write():
+        conn = sqlite3.connect(db.db_name)
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO order_items (order_id, menu_item_id, quantity) VALUES (?, ?, ?)",
+            (order_id, 1, 1)
+        )
+        conn.commit()
+        conn.close()
+
+    _report(f"Per-call latency over {args.repeat} calls (us)", [
+        ("get_order_items, connect per call", f"{_timed(connect_per_call_read, args.repeat):.1f}"),
+        ("get_order_items, pooled", f"{_timed(lambda: db.get_order_items(order_id), args.repeat):.1f}"),
+        ("add_item_to_order, connect per call", f"{_timed(connect_per_call_write, args.repeat):.1f}"),
+        ("add_item_to_order, pooled", f"{_timed(lambda: db.add_item_to_order(order_id, 1, 1), args.repeat):.1f}"),
+    ])
+
+
+def bench_stress(args):
+    """Simulated terminals writing orders while report readers run"""
+    ConnectionManager.for_database(
+        "pos_system.db",
+        pool_size=args.terminals + args.readers,
+        storage_mode=args.storage_mode
+    )
+    db = Database()
+    today = datetime.utcnow().date()
+    deadline = time.perf_counter() + args.duration
+    lock = threading.Lock()
+    stats = {'orders': 0, 'reports': 0, 'failed_writes': 0, 'lock_waits': 0, 'max_write_ms': 0.0}
+
+    def terminal(table_number):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                order_id = db.create_order(table_number, 1)
+                ok = all(db.add_item_to_order(order_id, item_id, 1) for item_id in (1, 4, 7))
+                ok = ok and db.add_transaction(order_id, "pin", 33.5, 1.0, 1)
+                ok = ok and db.update_order_status(order_id, "paid")
+            except sqlite3.OperationalError:
+                ok = False
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with lock:
+                stats['orders'] += ok
+                stats['failed_writes'] += not ok
+                stats['lock_waits'] += elapsed_ms > args.lock_threshold_ms
+                stats['max_write_ms'] = max(stats['max_write_ms'], elapsed_ms)
+
+    def reader():
+        while time.perf_counter() < deadline:
+            db.get_daily_summary(today)
+            with lock:
+                stats['reports'] += 1
+
+    threads = [threading.Thread(target=terminal, args=(i + 1,)) for i in range(args.terminals)]
+    threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    _report(f"{args.terminals} terminals, {args.readers} report readers, "
+            f"{args.duration:.0f}s, storage mode '{args.storage_mode}'", [
+        ("orders/s", f"{stats['orders'] / args.duration:.1f}"),
+        ("reports/s", f"{stats['reports'] / args.duration:.1f}"),
+        ("failed writes (database is locked)", str(stats['failed_writes'])),
+        (f"lock waits (order > {args.lock_threshold_ms:.0f} ms)", str(stats['lock_waits'])),
+        ("slowest order (ms)", f"{stats['max_write_ms']:.1f}"),
+    ])
+
+
+def check_query_plans(args):
+    """Fail if any hot query falls back to a full table scan
+
+    The hot ``Database`` methods are run with a trace callback attached, and
+    every statement they issue is fed through ``EXPLAIN QUERY PLAN``.
+    """
+    db = Database()
+    today = datetime.utcnow().date()
+    order_id = db.create_order(1, 1)
+    db.add_item_to_order(order_id, 1, 2)
+    db.add_transaction(order_id, "cash", 9.0, 0.0, 1)
+    spare_order_id = db.create_order(2, 1)
+    # Loading the menu catalog reads the whole menu on purpose; do it up front
+    db.get_menu_catalog()
+
+    hot_calls = [
+        ("get_active_order_for_table", lambda: db.get_active_order_for_table(1)),
+        ("get_floor_state", db.get_floor_state),
+        ("get_order_items", lambda: db.get_order_items(order_id)),
+        ("get_order_details", lambda: db.get_order_details(order_id)),
+        ("get_daily_revenue", lambda: db.get_daily_revenue(today)),
+        ("get_daily_transaction_count", lambda: db.get_daily_transaction_count(today)),
+        ("delete_order_items", lambda: db.delete_order_items(spare_order_id)),
+        ("get_range_report", lambda: db.get_range_report(today - timedelta(days=90), today, 'month')),
+    ] + [(name, lambda call=call: call(today)) for name, call in _daily_reports(db)]
+
+    failures = []
+    with db.connection() as conn:
+        for name, call in hot_calls:
+            statements = []
+            conn.set_trace_callback(statements.append)
+            try:
+                call()
+            finally:
+                conn.set_trace_callback(None)
+            for sql in statements:
+                if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                    continue
+                plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+                # Scanning a subquery result or a constant row is fine; a base table is not
+                derived = {step.split()[1] for step in plan if step.startswith(('MATERIALIZE ', 'CO-ROUTINE '))}
+                scans = [step for step in plan if re.match(r"SCAN (?!CONSTANT ROW)(?!\()", step)
+                         and step.split()[1] not in derived]
+                print(f"{'FAIL' if scans else 'ok  '} {name}: {'; '.join(plan)}")
+                if scans:
+                    failures.append(name)
+
+    if failures:
+        print(f"{len(failures)} hot queries fall back to a table scan: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+def bench_history(args):
+    """Daily report time as the amount of stored history grows"""
+    db = Database()
+    # Time the report computation itself, not cache lookups
+    db.report_cache.enabled = False
+    report_day = date(2025, 6, 1)
+    reports = _daily_reports(db)
+    rows = []
+    stored_days = 0
+    for years in (1, 2, 4):
+        # Grow history backwards so the report day stays the most recent one
+        new_days = years * 365 - stored_days
+        _generate_history(db, report_day - timedelta(days=years * 365 - 1), new_days,
+                          orders_per_day=args.orders_per_day)
+        stored_days = years * 365
+        with db.connection() as conn:
+            conn.execute("ANALYZE")
+        for name, call in reports:
+            elapsed = _timed(lambda: call(report_day), args.repeat) / 1000
+            rows.append((f"{years}y  {name}", f"{elapsed:.2f}"))
+
+        def date_predicate_scan():
+            with db.connection() as conn:
+                conn.execute(
+                    "SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE DATE(created_at) = ?",
+                    (report_day.isoformat(),)
+                ).fetchone()
+        elapsed = _timed(date_predicate_scan, args.repeat) / 1000
+        rows.append((f"{years}y  DATE(created_at) = ? baseline", f"{elapsed:.2f}"))
+
+    _report(f"Report time for one day (ms), {args.orders_per_day} orders/day of history", rows)
+
+
+def bench_summary(args):
+    """get_daily_summary: rollup reads versus the legacy row-level pandas path"""
+    db = Database()
+    # Time the report computation itself, not cache lookups
+    db.report_cache.enabled = False
+    rows = []
+    for offset, line_items in enumerate(int(size) for size in args.line_items.split(',')):
+        day = date(2025, 1, 1) + timedelta(days=offset)
+        _generate_history(db, day, 1, orders_per_day=max(1, line_items // 3))
+        repeat = max(1, args.repeat // max(1, line_items // 1000))
+        legacy = _timed(lambda: _legacy_daily_summary(db, day), repeat) / 1000
+        aggregated = _timed(lambda: db.get_daily_summary(day), repeat) / 1000
+        rows.append((f"{line_items:>9,} line items", f"legacy {legacy:9.1f} ms   rollups {aggregated:8.1f} ms   "
+                                                     f"x{legacy / aggregated:.1f}"))
+    _report("get_daily_summary per call", rows)
+
+
+def bench_range(args):
+    """get_range_report over a year of multi-year history, per bucket
+
+    Exits non-zero when a full-year report exceeds ``--budget-ms``.
+    """
+    db = Database()
+    # Time the report computation itself, not cache lookups
+    db.report_cache.enabled = False
+    last_day = date(2025, 12, 31)
+    _generate_history(db, last_day - timedelta(days=args.years * 365 - 1), args.years * 365,
+                      orders_per_day=args.orders_per_day)
+    with db.connection() as conn:
+        conn.execute("ANALYZE")
+    first_day = date(last_day.year, 1, 1)
+    rows, slowest = [], 0.0
+    for bucket in ('day', 'week', 'month', 'quarter', 'year'):
+        elapsed = _timed(lambda: db.get_range_report(first_day, last_day, bucket), max(1, args.repeat // 50)) / 1000
+        slowest = max(slowest, elapsed)
+        rows.append((f"full year per {bucket}", f"{elapsed:8.1f} ms"))
+
+    def daily_summaries():
+        for offset in range(365):
+            db.get_daily_summary(first_day + timedelta(days=offset))
+    elapsed = _timed(daily_summaries, 1) / 1000
+    rows.append(("365 x get_daily_summary", f"{elapsed:8.1f} ms"))
+    _report(f"Range reports, {args.years} years of history at {args.orders_per_day} orders/day", rows)
+
+    if slowest > args.budget_ms:
+        print(f"Slowest full-year report took {slowest:.1f} ms, budget is {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+def bench_menu(args):
+    """OrderMenu open time and menu reads with a cold versus a warm menu catalog"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from ordermenu import OrderMenu
+
+    app = QApplication.instance() or QApplication([])
+    db = Database()
+    catalog = db.menu_catalog
+    order_id = db.create_order(1, 1)
+    for item in db.get_menu_items()[:10]:
+        db.add_item_to_order(order_id, item[0], 2)
+
+    def legacy_menu_items():
+        with db.connection() as conn:
+            conn.execute("SELECT id, name, category, price, description FROM menu_items").fetchall()
+
+    def legacy_order_items():
+        with db.connection() as conn:
+            conn.execute("""
+                SELECT mi.name, oi.quantity, mi.price
+                FROM order_items oi
+                JOIN menu_items mi ON oi.menu_item_id = mi.id
+                WHERE oi.order_id = ?
+            """, (order_id,)).fetchall()
+
+    def open_dialog():
+        menu = OrderMenu(1, (1, "Admin", "admin"))
+        app.processEvents()
+        menu.close()
+        menu.deleteLater()
+
+    def cold(func):
+        def run():
+            catalog.invalidate()
+            func()
+        return run
+
+    dialog_repeat = max(1, args.repeat // 25)
+    rows = [
+        ("menu items: query per call", f"{_timed(legacy_menu_items, args.repeat):8.1f} µs"),
+        ("menu items: catalog", f"{_timed(db.get_menu_items, args.repeat):8.1f} µs"),
+        ("order items: join per call", f"{_timed(legacy_order_items, args.repeat):8.1f} µs"),
+        ("order items: catalog", f"{_timed(lambda: db.get_order_items(order_id), args.repeat):8.1f} µs"),
+        ("OrderMenu open: cold catalog", f"{_timed(cold(open_dialog), dialog_repeat) / 1000:8.1f} ms"),
+        ("OrderMenu open: warm catalog", f"{_timed(open_dialog, dialog_repeat) / 1000:8.1f} ms"),
+    ]
+    _report("Menu catalog", rows)
+
+
+def bench_order_menu(args):
+    """Table-tap latency: a new OrderMenu per tap versus the shared, re-bound dialog"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from ordermenu import OrderMenu
+    from tablemanager import RestaurantView
+
+    app = QApplication.instance() or QApplication([])
+    user = (1, "Admin", "staff")
+    db = Database()
+    for table in range(1, 11, 2):
+        order_id = db.create_order(table, 1)
+        db.add_item_to_order(order_id, 1, 2)
+    taps = max(10, args.repeat // 25)
+
+    def rebuild_tap(table):
+        menu = OrderMenu(table, user)
+        app.processEvents()
+        menu.hide()
+        menu.deleteLater()
+
+    def shared_tap(table):
+        menu = OrderMenu.for_table(table, user)
+        app.processEvents()
+        menu.hide()
+
+    # One-off Qt costs (style sheets, fonts, platform plugin) are not part of either path
+    warm_up = RestaurantView(user)
+    app.processEvents()
+    rebuild_tap(1)
+    warm_up.hide()
+    warm_up.deleteLater()
+
+    rows = []
+    for name, tap in (("new dialog per tap", rebuild_tap), ("shared dialog", shared_tap)):
+        OrderMenu._shared = None
+        # Startup to first interaction: floor shown, idle work done, first table opened
+        start = time.perf_counter()
+        view = RestaurantView(user)
+        app.processEvents()
+        ready = time.perf_counter()
+        tap(1)
+        first_tap = time.perf_counter()
+        rows.append((f"{name}: startup to floor", f"{(ready - start) * 1000:7.1f} ms"))
+        rows.append((f"{name}: startup to first table open", f"{(first_tap - start) * 1000:7.1f} ms"))
+        elapsed = _timed(lambda: [tap(table) for table in range(1, 11)], max(1, taps // 10)) / 10 / 1000
+        rows.append((f"{name}: per table tap", f"{elapsed:7.1f} ms"))
+        view.hide()
+        view.deleteLater()
+        app.processEvents()
+    _report("Order dialog open latency (headless Qt)", rows)
+
+
+def bench_construct(args):
+    """Cost of constructing Database(): full bootstrap versus the once-per-process check"""
+    db = Database()
+    manager = db.connections
+
+    def bootstrap_every_time():
+        # What every Database() did before the schema check
+        manager.schema_ready = False
+        with db.connection() as conn:
+            conn.execute("PRAGMA user_version = 0")
+        Database()
+
+    def version_check():
+        manager.schema_ready = False
+        Database()
+
+    rows = [
+        ("full init_db per construction", f"{_timed(bootstrap_every_time, args.repeat):9.1f} µs"),
+        ("new process, schema up to date", f"{_timed(version_check, args.repeat):9.1f} µs"),
+        ("Database() after bootstrap", f"{_timed(Database, args.repeat):9.1f} µs"),
+        ("get_database()", f"{_timed(get_database, args.repeat):9.1f} µs"),
+    ]
+    _report("Database construction", rows)
+
+
+def bench_taps(args):
+    """Sustained menu taps per second: a commit per tap versus the write-behind buffer"""
+    db = Database()
+    rng = random.Random(42)
+    menu_ids = [item[0] for item in db.get_menu_items()]
+    taps = [rng.choice(menu_ids[:8]) for _ in range(args.repeat * 4)]
+
+    def commit_per_tap():
+        order_id = db.create_order(1, 1)
+        for menu_item_id in taps:
+            db.add_item_to_order(order_id, menu_item_id, 1)
+            db.get_order_items(order_id)
+        return order_id
+
+    def buffered(taps_per_flush):
+        def run():
+            order_id = db.create_order(1, 1)
+            buffer = OrderEntryBuffer(db)
+            buffer.load(order_id)
+            for count, menu_item_id in enumerate(taps, 1):
+                buffer.add(menu_item_id)
+                if count % taps_per_flush == 0:
+                    buffer.flush()
+            buffer.flush()
+            return order_id
+        return run
+
+    expected = {}
+    for menu_item_id in taps:
+        expected[menu_item_id] = expected.get(menu_item_id, 0) + 1
+    rows = []
+    for name, run, commits in (
+        ("commit per tap", commit_per_tap, len(taps)),
+        ("buffer, flush every 5 taps", buffered(5), -(-len(taps) // 5)),
+        ("buffer, flush every 20 taps", buffered(20), -(-len(taps) // 20)),
+    ):
+        start = time.perf_counter()
+        order_id = run()
+        elapsed = time.perf_counter() - start
+        stored = dict(db.get_order_lines(order_id))
+        status = "ok" if stored == expected else "MISMATCH"
+        rows.append((name, f"{len(taps) / elapsed:9.0f} taps/s   {commits:5d} commits   "
+                           f"{len(stored)} lines   {status}"))
+    _report(f"Order entry, {len(taps)} taps over 8 menu items", rows)
+
+
+def _legacy_order_table(table, lines, catalog, total_label):
+    """The full QTableWidget rebuild OrderMenu.update_order_table did on every tap"""
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QTableWidgetItem
+
+    lines = [line for line in lines if line[0] in catalog.items]
+    table.setRowCount(len(lines))
+    for row, (menu_item_id, quantity) in enumerate(lines):
+        name, price = catalog.items[menu_item_id][1], catalog.price(menu_item_id)
+        cells = [QTableWidgetItem(name), QTableWidgetItem(str(quantity)),
+                 QTableWidgetItem(f"€{price:.2f}"), QTableWidgetItem(f"€{quantity * price:.2f}")]
+        for column, cell in enumerate(cells):
+            cell.setFlags(cell.flags() & ~Qt.ItemIsEditable)
+            table.setItem(row, column, cell)
+    total_label.setText(f"Total: €{catalog.total(lines):.2f}")
+
+
+def bench_order_table(args):
+    """Tap latency on large orders: rebuilding the order grid versus the table model"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QLabel, QTableView, QTableWidget
+    from order_model import OrderTableModel
+
+    app = QApplication.instance() or QApplication([])
+    db = Database()
+    # Enough distinct dishes for a banquet-sized order
+    with db.connection() as conn:
+        conn.executemany("INSERT INTO menu_items (name, category, price, description) VALUES (?, ?, ?, ?)",
+                         [(f"Dish {n}", "Banquet", round(2.35 + n * 0.1, 2), "") for n in range(200)])
+        conn.commit()
+    catalog = db.get_menu_catalog()
+    menu_ids = list(catalog.items)
+    taps = max(20, args.repeat // 5)
+
+    rows = []
+    for size in (10, 60, 200):
+        lines = {menu_item_id: 1 for menu_item_id in menu_ids[:size]}
+        rng = random.Random(size)
+        tapped = [rng.choice(menu_ids[:size]) for _ in range(taps)]
+
+        table, label = QTableWidget(), QLabel()
+        table.setColumnCount(4)
+        table.show()
+        _legacy_order_table(table, lines.items(), catalog, label)
+        app.processEvents()
+
+        def legacy_tap(menu_item_id, lines=lines, table=table, label=label):
+            lines[menu_item_id] += 1
+            _legacy_order_table(table, lines.items(), catalog, label)
+            app.processEvents()
+
+        model, view, model_label = OrderTableModel(), QTableView(), QLabel()
+        view.setModel(model)
+        model.totalChanged.connect(lambda cents, l=model_label: l.setText(f"Total: €{cents / 100:.2f}"))
+        model.set_lines(((menu_item_id, 1) for menu_item_id in menu_ids[:size]), catalog)
+        view.show()
+        app.processEvents()
+
+        def model_tap(menu_item_id, model=model):
+            model.add(menu_item_id)
+            app.processEvents()
+
+        legacy = _timed(lambda: [legacy_tap(i) for i in tapped], 1) / taps
+        incremental = _timed(lambda: [model_tap(i) for i in tapped], 1) / taps
+        expected_cents = sum(round(catalog.price(i) * 100) * q for i, q in lines.items())
+        status = "ok" if model.total_cents == expected_cents else "MISMATCH"
+        rows.append((f"{size:3d} lines: rebuild grid", f"{legacy:8.0f} µs/tap"))
+        rows.append((f"{size:3d} lines: table model", f"{incremental:8.0f} µs/tap   "
+                                                      f"{legacy / incremental:5.1f}x   total {status}"))
+        for widget in (table, view):
+            widget.hide()
+            widget.deleteLater()
+    _report(f"Order grid update per tap, {taps} taps (headless Qt)", rows)
+
+
+
+def bench_dashboard(args):
+    """GUI-thread blocking while scrolling dates: inline daily reports versus the report worker"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QDate
+    from PyQt5.QtWidgets import QApplication
+    from admin_dashboard import AdminDashboard
+
+    app = QApplication.instance() or QApplication([])
+    db = Database()
+    # Time the report computation itself, not cache lookups
+    db.report_cache.enabled = False
+    first_day = date(2025, 6, 1)
+    _generate_history(db, first_day, args.days, orders_per_day=args.orders_per_day)
+    dashboard = AdminDashboard((1, "Admin", "admin"))
+    runner = dashboard.daily_report_runner
+    shown = []
+    dashboard.daily_report_runner.ready.connect(lambda day, _: shown.append(day))
+
+    def pump(until, stalls):
+        """Process events until ``until`` (and then until the runner is idle),
+        recording how long each batch held the GUI thread"""
+        while True:
+            start = time.perf_counter()
+            app.processEvents()
+            stalls.append(time.perf_counter() - start)
+            if start >= until and not runner.busy:
+                return
+            time.sleep(0.001)
+
+    def inline_report():
+        selected_date = dashboard.date_selector.date().toPyDate()
+        dashboard.show_daily_report(selected_date, db.get_daily_summary(selected_date))
+        shown.append(selected_date)
+
+    def scroll():
+        """Change the date every ``--step-ms``; changes that fall due while the
+        GUI thread is blocked arrive back to back, like queued key repeats"""
+        stalls = []
+        shown.clear()
+        start = time.perf_counter()
+        for offset in range(args.days):
+            due = start + offset * args.step_ms / 1000
+            while time.perf_counter() < due:
+                step = time.perf_counter()
+                app.processEvents()
+                stalls.append(time.perf_counter() - step)
+                time.sleep(0.001)
+            step = time.perf_counter()
+            dashboard.date_selector.setDate(QDate(first_day + timedelta(days=offset)))
+            stalls.append(time.perf_counter() - step)
+        pump(0, stalls)
+        elapsed = time.perf_counter() - start
+        last = first_day + timedelta(days=args.days - 1)
+        status = "ok" if shown and shown[-1] == last else "WRONG DATE"
+        return (f"busy {sum(stalls) * 1000:7.0f} ms   longest stall {max(stalls) * 1000:6.1f} ms   "
+                f"{len(shown):3d} reports shown   last shown after {elapsed * 1000:6.0f} ms   {status}")
+
+    dashboard.date_selector.setDate(QDate(first_day - timedelta(days=1)))
+    pump(time.perf_counter() + 0.2, [])
+    rows = [("report worker", scroll())]
+    dashboard.date_selector.dateChanged.disconnect()
+    dashboard.date_selector.dateChanged.connect(inline_report)
+    dashboard.date_selector.setDate(QDate(first_day - timedelta(days=1)))
+    rows.insert(0, ("inline on GUI thread", scroll()))
+    runner.wait()
+    _report(f"Scrolling {args.days} dates, one every {args.step_ms:.0f} ms (headless Qt)", rows)
+
+
+
+def bench_report_cache(args):
+    """Past-day reports: computed, read back from the report_cache table, and from memory"""
+    db = Database()
+    first_day = date(2025, 3, 1)
+    _generate_history(db, first_day, args.days, orders_per_day=args.orders_per_day)
+    days = [first_day + timedelta(days=offset) for offset in range(args.days)]
+    cache = db.report_cache
+
+    def view_all_days():
+        # What viewing and exporting each day reads
+        for day in days:
+            db.get_daily_summary(day)
+            db.get_daily_transaction_analysis(day)
+            db.get_daily_menu_analysis(day)
+        db.get_range_report(days[0], days[-1], 'week')
+
+    def cold():
+        cache.clear()
+        with db.connection() as conn:
+            conn.execute("DELETE FROM report_cache")
+            conn.commit()
+        view_all_days()
+
+    def from_disk():
+        cache.clear()
+        view_all_days()
+
+    rows = []
+    for name, run in (("computed (empty cache)", cold), ("report_cache table", from_disk),
+                      ("in-memory LRU", view_all_days)):
+        elapsed = _timed(run, 3) / 1000
+        rows.append((name, f"{elapsed:8.1f} ms"))
+
+    # A correction to one past day invalidates exactly that day's reports
+    with db.connection() as conn:
+        conn.execute("UPDATE transactions SET tip_amount = tip_amount + 1 "
+                      "WHERE id = (SELECT MIN(id) FROM transactions WHERE created_at >= ?)",
+                      (days[-1].isoformat(),))
+        conn.commit()
+    before = cache.stats()
+    view_all_days()
+    after = cache.stats()
+    rows.append(("after correcting one day", f"{after['misses'] - before['misses']} reports recomputed"))
+    stats = cache.stats()
+    rows.append(("totals", f"{stats['hits']} memory hits, {stats['disk_hits']} disk hits, "
+                           f"{stats['misses']} misses, hit rate {stats['hit_rate']:.0%}"))
+    _report(f"{args.days} past days x 3 daily reports + 1 range report, "
+            f"{args.orders_per_day} orders/day", rows)
+
+
+
+def bench_export(args):
+    """Boekhouding PDF export of a generated year: one day at a time versus the process pool"""
+    import report_export
+
+    db = Database()
+    last_day = date(2025, 12, 31)
+    first_day = last_day - timedelta(days=364)
+    _generate_history(db, first_day, 365, orders_per_day=args.orders_per_day)
+    export_first = last_day - timedelta(days=args.export_days - 1)
+    days = [export_first + timedelta(days=offset) for offset in range(args.export_days)]
+
+    def fresh_cache():
+        # Every run computes its summaries; none may reuse another run's
+        db.report_cache.clear()
+        with db.connection() as conn:
+            conn.execute("DELETE FROM report_cache")
+            conn.commit()
+
+    def one_at_a_time():
+        for day in days:
+            summary = db.get_daily_summary(day)
+            report_export.build_accounting_pdf(summary, day, report_export.report_path('boekhouding', day, "Sequential"))
+
+    rows = []
+    fresh_cache()
+    start = time.perf_counter()
+    one_at_a_time()
+    elapsed = time.perf_counter() - start
+    rows.append(("in process, one day at a time", f"{elapsed:7.2f} s   {len(days) / elapsed:6.1f} PDFs/s"))
+
+    cpus = os.cpu_count() or 1
+    for workers in sorted({1, 2, cpus}):
+        fresh_cache()
+        start = time.perf_counter()
+        batch = report_export.export_range(db.db_name, 'boekhouding', days[0], days[-1],
+                                           directory=f"Pool{workers}", workers=workers)
+        elapsed = time.perf_counter() - start
+        status = "ok" if not batch.failures and len(batch.results) == len(days) else f"{len(batch.failures)} FAILED"
+        rows.append((f"process pool, {workers} worker{'s' if workers > 1 else ''}",
+                     f"{elapsed:7.2f} s   {len(days) / elapsed:6.1f} PDFs/s   manifest {status}"))
+    _report(f"Export of {len(days)} boekhouding PDFs, {args.orders_per_day} orders/day, {cpus} CPUs", rows)
+
+
+
+def _legacy_chart(figure, canvas, series, kind, title, xlabel='', ylabel=''):
+    """How the dashboard redrew a chart before charts.py: clear, re-plot through pandas, draw"""
+    figure.clear()
+    ax = figure.add_subplot(111)
+    if not series.empty:
+        if kind == 'pie':
+            series.plot(kind='pie', ax=ax, autopct='%1.1f%%')
+        else:
+            series.plot(kind=kind, ax=ax, color='#5865f2')
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_facecolor('#2f3136')
+    ax.tick_params(colors='#dcddde')
+    canvas.draw()
+
+
+def bench_charts(args):
+    """Daily report chart refresh: clear and re-plot versus persistent chart artists"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QVBoxLayout, QWidget
+    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+    from matplotlib.figure import Figure
+    import charts
+
+    app = QApplication.instance() or QApplication([])
+    db = Database()
+    first_day = date(2025, 6, 1)
+    _generate_history(db, first_day, args.days, orders_per_day=args.orders_per_day)
+    summaries = [db.get_daily_summary(first_day + timedelta(days=offset)) for offset in range(args.days)]
+
+    specs = [
+        ("revenue by hour", lambda s: s['revenue']['by_hour'], 'bar', charts.BarChart,
+         ('Revenue by Hour', 'Hour', 'Revenue (€)')),
+        ("transactions by hour", lambda s: s['transactions']['hourly_distribution'], 'line', charts.LineChart,
+         ('Transactions by Hour', 'Hour', 'Number of Transactions')),
+        ("revenue by category", lambda s: s['menu']['category_analysis']['revenue'], 'pie', charts.PieChart,
+         ('Revenue by Category',)),
+        ("tax by category", lambda s: s['tax']['by_category'], 'bar', charts.BarChart,
+         ('Tax by Category', 'Category', 'Tax Amount (€)')),
+    ]
+    window = QWidget()
+    layout = QVBoxLayout(window)
+    canvases = []
+    for _ in range(2 * len(specs)):
+        figure = Figure(figsize=(10, 5), facecolor='#2f3136')
+        canvas = FigureCanvas(figure)
+        layout.addWidget(canvas)
+        canvases.append((figure, canvas))
+    window.resize(1200, 2400)
+    window.show()
+    app.processEvents()
+
+    def per_refresh(refresh):
+        # The first day builds the chart; time the days after it
+        refresh(summaries[0])
+        app.processEvents()
+        start = time.perf_counter()
+        for summary in summaries[1:]:
+            refresh(summary)
+            app.processEvents()
+        return (time.perf_counter() - start) / (len(summaries) - 1) * 1000
+
+    rows = []
+    for n, (name, series_of, kind, chart_class, labels) in enumerate(specs):
+        figure, canvas = canvases[2 * n]
+        legacy = per_refresh(lambda s: _legacy_chart(figure, canvas, series_of(s), kind, *labels))
+        figure, canvas = canvases[2 * n + 1]
+        chart = chart_class(figure, canvas, *labels)
+        persistent = per_refresh(lambda s: chart.update(series_of(s)))
+        unchanged = _timed(lambda: (chart.update(series_of(summaries[-1])), app.processEvents()), 50) / 1000
+        rows.append((name, f"clear + re-plot {legacy:6.1f} ms   persistent {persistent:6.1f} ms   "
+                           f"{legacy / persistent:4.1f}x   unchanged data {unchanged:5.2f} ms"))
+    window.hide()
+    _report(f"Chart refresh per day, {args.days} days (headless Qt, Agg)", rows)
+
+
+
+# Runs in a fresh interpreter so nothing is imported yet. Prints "ready" as
+# soon as the login screen is painted, then one line of phase timings.
+_STARTUP_PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import main
+imported = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+from login import LoginScreen
+from tablemanager import RestaurantView
+app = QApplication(sys.argv)
+login = LoginScreen()
+app.processEvents()
+shown = time.perf_counter()
+print("ready", flush=True)
+view = RestaurantView((2, "Staff", "staff"))
+app.processEvents()
+staff = time.perf_counter()
+loaded = sorted(name for name in json.loads(sys.argv[1]) if name in sys.modules)
+import admin_dashboard
+admin = time.perf_counter()
+print(json.dumps({'import': imported - start, 'login': shown - imported, 'staff': staff - shown,
+                  'admin_import': admin - staff, 'loaded': loaded}))
+"""
+
+# Modules a staff terminal must not load: they belong to reports and the dashboard
+STARTUP_FORBIDDEN = ['pandas', 'numpy', 'matplotlib', 'reportlab']
+
+
+def bench_startup(args):
+    """Cold start of a waiter terminal: imports and time to the login screen
+
+    Each run is a new interpreter. Exits non-zero when the median time from
+    launch to a painted login screen exceeds ``--startup-budget-ms``, or when
+    a staff login loads any of ``STARTUP_FORBIDDEN``.
+    """
+    import json
+    import statistics
+    import subprocess
+
+    Database()  # the schema exists before the first launch, as on a terminal
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.environ.get('PYTHONPATH')])))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    runs = []
+    for _ in range(max(3, args.repeat // 100)):
+        launched = time.perf_counter()
+        child = subprocess.Popen([sys.executable, '-c', _STARTUP_PROBE, json.dumps(STARTUP_FORBIDDEN)],
+                                 stdout=subprocess.PIPE, text=True, env=env)
+        if child.stdout.readline().strip() != "ready":
+            child.wait()
+            print("Startup probe failed before showing the login screen")
+            return 1
+        ready = time.perf_counter() - launched
+        phases = json.loads(child.stdout.readline())
+        child.wait()
+        phases['launch'] = ready
+        runs.append(phases)
+
+    def median(key):
+        return statistics.median(run[key] for run in runs) * 1000
+
+    rows = [
+        ("import main (login, floor, order menu)", f"{median('import'):7.1f} ms"),
+        ("build and paint LoginScreen", f"{median('login'):7.1f} ms"),
+        ("launch to login screen", f"{median('launch'):7.1f} ms"),
+        ("staff login to floor", f"{median('staff'):7.1f} ms"),
+        ("first admin dashboard import", f"{median('admin_import'):7.1f} ms"),
+    ]
+    _report(f"Waiter terminal cold start, median of {len(runs)} launches", rows)
+
+    status = 0
+    loaded = sorted({name for run in runs for name in run['loaded']})
+    if loaded:
+        print(f"A staff start loaded {', '.join(loaded)}")
+        status = 1
+    if median('launch') > args.startup_budget_ms:
+        print(f"Launch to login screen took {median('launch'):.1f} ms, budget is {args.startup_budget_ms:.0f} ms")
+        status = 1
+    return status
+
+
+def bench_logging(args):
+    """Caller-side cost of a burst of audit events: file I/O per call versus the queue
+
+    Each is run against the page cache and against a disk that stalls
+    ``--log-stall-ms`` on every 200th write (as an SD card or a network share
+    does under writeback). The queued runs also rotate and gzip the audit log
+    during the burst, on the listener thread.
+    """
+    import logging
+    import statistics
+    # Imported here so its logs/ directory lands in the benchmark's temp dir
+    from logger import pos_logger
+
+    events = args.log_events
+    burst_bytes = 256 * 1024
+
+    legacy = logging.getLogger('benchmark.audit')
+    legacy.propagate = False
+    legacy.setLevel(logging.INFO)
+    legacy_handler = logging.FileHandler('legacy_audit.log')
+    legacy_handler.setFormatter(pos_logger.file_handlers['audit'].formatter)
+    legacy.addHandler(legacy_handler)
+    audit_handler = pos_logger.file_handlers['audit']
+    audit_handler.maxBytes = burst_bytes
+
+    def legacy_audit(number):
+        # What log_audit did before: the audit logger writing straight to its file
+        legacy.info("", extra={'user': "Staff (ID: 2)", 'action': "Add Item",
+                               'details': f"Table 4, order {number}, item 12 x 1"})
+
+    def queued_audit(number):
+        pos_logger.log_audit("Staff (ID: 2)", "Add Item", f"Table 4, order {number}, item 12 x 1")
+
+    def stalling(flush, stall):
+        writes = [0]
+
+        def stalled_flush():
+            flush()
+            writes[0] += 1
+            if writes[0] % 200 == 0:
+                time.sleep(stall)
+        return stalled_flush
+
+    rows = []
+    for disk, stall in (("page cache", 0.0), (f"{args.log_stall_ms:g} ms stalls", args.log_stall_ms / 1000)):
+        for name, handler, log in (("FileHandler per call", legacy_handler, legacy_audit),
+                                   ("queue + listener", audit_handler, queued_audit)):
+            if stall:
+                handler.flush = stalling(type(handler).flush.__get__(handler), stall)
+            durations = []
+            start = time.perf_counter()
+            for number in range(events):
+                call = time.perf_counter()
+                log(number)
+                durations.append(time.perf_counter() - call)
+            returned = time.perf_counter() - start
+            pos_logger.flush()
+            written = time.perf_counter() - start
+            handler.__dict__.pop('flush', None)
+            durations.sort()
+            rows.append((f"{disk}, {name}: mean / p99 / max per call",
+                         f"{statistics.mean(durations) * 1e6:7.1f} / {durations[int(len(durations) * 0.99)] * 1e6:.1f}"
+                         f" / {durations[-1] * 1e6:.0f} µs"))
+            rows.append((f"{disk}, {name}: burst returned / on disk",
+                         f"{returned * 1000:7.1f} / {written * 1000:.1f} ms"))
+    legacy_handler.close()
+    segments = [name for name in os.listdir('logs') if name.startswith('audit.log.')]
+    rows.append((f"audit segments rotated at {burst_bytes // 1024} KB", f"{len(segments):7d} gzipped"))
+    _report(f"Burst of {events:,} audit events", rows)
+
+def bench_log_viewer(args):
+    """One LogViewer poll on a long shift's system log: re-read everything versus tail-follow"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QTextEdit
+    from PyQt5.QtGui import QTextCursor
+
+    app = QApplication.instance() or QApplication([])
+    from admin_dashboard import LogViewer
+    from logger import LOG_DIR, pos_logger
+
+    path = os.path.join(LOG_DIR, 'system.log')
+    polls = max(5, args.repeat // 50)
+    rows = []
+    for lines in (1_000, 10_000, 50_000):
+        with open(path, 'w') as f:
+            pass
+        for number in range(lines):
+            pos_logger.log_info(f"Database UPDATE on table orders ({number})")
+        pos_logger.flush()
+
+        # What update_logs did before: read the whole file into a QTextEdit
+        legacy = QTextEdit()
+        legacy.setReadOnly(True)
+
+        def legacy_poll():
+            with open(path, 'r') as f:
+                legacy.setText(f.read())
+            legacy.moveCursor(QTextCursor.End)
+
+        viewer = LogViewer()
+        viewer.show()
+        app.processEvents()
+
+        def new_lines():
+            for _ in range(20):
+                pos_logger.log_info("Database INSERT on table order_items")
+            pos_logger.flush()
+
+        def timed_polls(poll):
+            total = 0.0
+            for _ in range(polls):
+                new_lines()
+                start = time.perf_counter()
+                poll()
+                app.processEvents()
+                total += time.perf_counter() - start
+            return total / polls * 1000
+
+        legacy_ms = timed_polls(legacy_poll)
+        tail_ms = timed_polls(viewer.update_logs)
+        rows.append((f"{lines:>6,} lines, 20 new: re-read whole file",
+                     f"{legacy_ms:8.2f} ms   {legacy.document().characterCount() / 1024:7.0f} KB shown"))
+        rows.append((f"{lines:>6,} lines, 20 new: tail-follow",
+                     f"{tail_ms:8.2f} ms   {viewer.log_display.document().characterCount() / 1024:7.0f} KB shown"))
+        viewer.hide()
+        viewer.deleteLater()
+        legacy.deleteLater()
+        app.processEvents()
+    _report(f"Log viewer poll, mean of {polls}", rows)
+
+
+def bench_metrics(args):
+    """Cost of the metrics instrumentation on a hot Database call and on its own"""
+    import metrics
+
+    db = Database()
+    db.get_menu_catalog()
+    plain = Database.get_menu_catalog.__wrapped__
+    histogram = metrics.registry.histogram('benchmark_seconds')
+
+    def empty_block():
+        with metrics.timed('benchmark_seconds', handler='empty'):
+            pass
+
+    rows = [
+        ("get_menu_catalog(), uninstrumented", f"{_timed(lambda: plain(db), args.repeat * 20):7.2f} µs"),
+        ("get_menu_catalog(), instrumented", f"{_timed(db.get_menu_catalog, args.repeat * 20):7.2f} µs"),
+        ("timed() around an empty block", f"{_timed(empty_block, args.repeat * 20):7.2f} µs"),
+        ("Histogram.observe()", f"{_timed(lambda: histogram.observe(0.003, handler='x'), args.repeat * 20):7.2f} µs"),
+        ("openmetrics() of this run", f"{_timed(metrics.registry.openmetrics, max(1, args.repeat // 10)):7.0f} µs"),
+    ]
+    _report("Metrics overhead per call", rows)
+
+
+def bench_sql_profile(args):
+    """A shift's workload with and without the query profiler, then its summary"""
+    from query_profiler import QueryProfiler
+
+    def shift(db):
+        """Taps, payments and the day's reports, as one terminal runs them"""
+        order_ids = []
+        for table in range(1, 21):
+            order_id = db.create_order(table, 1)
+            for menu_item_id in range(1, 9):
+                db.add_item_to_order(order_id, menu_item_id, 1)
+                db.get_order_items(order_id)
+            order_ids.append(order_id)
+        for order_id in order_ids:
+            db.add_transaction(order_id, 'cash', 50.0, 2.5, 1)
+            db.update_order_status(order_id, 'paid')
+        for offset in range(args.days):
+            day = date(2025, 12, 31) - timedelta(days=offset)
+            db.get_daily_summary(day)
+            db.get_daily_transaction_analysis(day)
+            db.get_daily_menu_analysis(day)
+
+    rows = []
+    profiler = QueryProfiler(args.slow_ms)
+    for name, db_name, options in (("plain connections", "plain.db", {}),
+                                   ("profiled connections", "profiled.db", {'profiler': profiler})):
+        ConnectionManager.for_database(db_name, **options)
+        db = Database(db_name)
+        db.report_cache.enabled = False
+        _generate_history(db, date(2025, 12, 31) - timedelta(days=args.days - 1), args.days,
+                          orders_per_day=args.orders_per_day)
+        start = time.perf_counter()
+        shift(db)
+        rows.append((name, f"{(time.perf_counter() - start) * 1000:8.1f} ms"))
+    _report(f"Shift workload, {args.days} days of reports", rows)
+    print()
+    print(f"{len(profiler.statements)} statements, {profiler.slow_queries} over {args.slow_ms:g} ms "
+          f"(see logs/slow_queries.log)")
+    print(profiler.summary_table())
+
+
+def bench_login(args):
+    """Shift change: staff logging in one after another, PINs checked inline versus by the worker"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    import database
+    from login import LoginScreen
+
+    app = QApplication.instance() or QApplication([])
+    db = Database()
+    staff = [f"staff{n}" for n in range(args.logins)]
+    for name in staff:
+        db.add_user(name, 'staff', '1234')
+    users = {user[1]: user[:3] for user in db.get_all_users()}
+    screen = LoginScreen()
+    logged_in = []
+    # Stay on the login screen instead of opening a floor per login
+    screen.show_restaurant_view = lambda: logged_in.append(screen.current_user)
+
+    def shift_change(check):
+        """Log every user in, each as soon as the previous one is through,
+        while a 5 ms timer measures how long the event loop goes unserved"""
+        gaps, last = [], [time.perf_counter()]
+
+        def tick():
+            now = time.perf_counter()
+            gaps.append(now - last[0])
+            last[0] = now
+
+        timer = QTimer()
+        timer.setInterval(5)
+        timer.timeout.connect(tick)
+        logged_in.clear()
+        timer.start()
+        start = last[0] = time.perf_counter()
+        for name in staff:
+            expected = len(logged_in) + 1
+            check(users[name])
+            app.processEvents()
+            while len(logged_in) < expected:
+                time.sleep(0.001)
+                app.processEvents()
+        elapsed = time.perf_counter() - start
+        timer.stop()
+        status = "ok" if len(logged_in) == len(staff) and all(logged_in) else "LOGIN FAILED"
+        return (f"{elapsed / len(staff) * 1000:6.1f} ms per login   "
+                f"longest event loop gap {max(gaps, default=0) * 1000:6.1f} ms   {status}")
+
+    def inline(user):
+        screen.login_checked(user, db.verify_user(user[1], '1234'))
+
+    rows = [
+        ("inline on GUI thread", shift_change(inline)),
+        ("PIN worker", shift_change(lambda user: screen.check_pin(user, '1234'))),
+    ]
+    _report(f"{args.logins} staff logging in at {database.PIN_HASH_ITERATIONS:,} PBKDF2 iterations (headless Qt)", rows)
+
+    # Raising the iterations: the next login verifies with the old parameters
+    # and re-hashes with the new ones, later logins only use the new ones
+    database.PIN_HASH_ITERATIONS = args.pin_iterations
+    rows = []
+    for label in ("first login, re-hashed", "next login"):
+        start = time.perf_counter()
+        for name in staff:
+            db.verify_user(name, '1234')
+        rows.append((label, f"{(time.perf_counter() - start) / len(staff) * 1000:7.1f} ms"))
+    with db.connection() as conn:
+        stored = conn.execute("SELECT COUNT(*) FROM users WHERE hash_iterations = ?",
+                              (args.pin_iterations,)).fetchone()[0]
+    rows.append(("users on the new parameters", f"{stored} of {len(users)}"))
+    _report(f"verify_user after raising the iterations to {args.pin_iterations:,}", rows)
+    screen.pin_runner.wait()
+
+
+def bench_user_switch(args):
+    """Waiters taking turns on one terminal: rebuilding the login screen and floor versus keeping them"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from login import LoginScreen
+    from tablemanager import RestaurantView
+
+    app = QApplication.instance() or QApplication([])
+    db = Database()
+    for n in range(args.logins):
+        db.add_user(f"staff{n}", 'staff', '1234')
+    staff = [user[:3] for user in db.get_all_users() if user[2] == 'staff']
+
+    def rebuild(user):
+        """What logout and login did before: a new window each time"""
+        login = LoginScreen()
+        app.processEvents()
+        shown = time.perf_counter()
+        floor = RestaurantView(user)
+        app.processEvents()
+        login.close()
+        login.deleteLater()
+        floor.close()
+        floor.deleteLater()
+        return shown
+
+    floors = []
+
+    def switch(user):
+        """Logout hides the floor and shows the login screen again"""
+        if floors:
+            floors[-1].logout()
+            login = floors[-1].login_screen
+        else:
+            login = LoginScreen.shared()
+        app.processEvents()
+        shown = time.perf_counter()
+        login.current_user = user
+        login.show_restaurant_view()
+        app.processEvents()
+        floors.append(login.restaurant_view)
+        return shown
+
+    rows = []
+    for name, cycle in (("rebuild on every login", rebuild), ("resident floor, set_user", switch)):
+        cycle(staff[0])  # the first login builds everything either way
+        to_login, to_floor = [], []
+        for i in range(args.repeat // 10):
+            start = time.perf_counter()
+            shown = cycle(staff[i % len(staff)])
+            app.processEvents()
+            to_login.append(shown - start)
+            to_floor.append(time.perf_counter() - shown)
+        to_login.sort()
+        to_floor.sort()
+        rows.append((name, f"logout to login screen {to_login[len(to_login) // 2] * 1000:6.1f} ms   "
+                           f"login to floor {to_floor[len(to_floor) // 2] * 1000:6.1f} ms (median)"))
+        app.processEvents()
+    _report(f"{args.repeat // 10} user switches between {len(staff)} waiters (headless Qt, PIN check excluded)", rows)
+
+
+def bench_floor(args):
+    """Loading the floor: a query per table versus get_floor_state, and the cost of live polling"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from tablemanager import RestaurantView
+
+    app = QApplication.instance() or QApplication([])
+    db = Database()
+    _generate_history(db, date(2025, 12, 31) - timedelta(days=args.days - 1), args.days,
+                      orders_per_day=args.orders_per_day)
+    # Half the floor seated, with a few lines each
+    for table in range(1, 11, 2):
+        order_id = db.create_order(table, 1)
+        for menu_item_id in range(1, table + 2):
+            db.add_item_to_order(order_id, menu_item_id, 1)
+
+    def per_table():
+        """What the floor would need without a batch query"""
+        state = {}
+        for table in range(1, 11):
+            order_id = db.get_active_order_for_table(table)
+            if order_id:
+                lines = db.get_order_items(order_id)
+                state[table] = (sum(q for _, q, _ in lines), sum(q * p for _, q, p in lines))
+        return state
+
+    floor = RestaurantView((1, "Admin", "staff"))
+    app.processEvents()
+    repaints = []
+    for table in floor.tables:
+        table.update = lambda table=table: repaints.append(table.table_number)
+
+    # Another terminal adds to an order line of table 3
+    other = sqlite3.connect(db.db_name)
+    order_id = db.get_active_order_for_table(3)
+
+    def change_one_table():
+        other.execute("UPDATE order_items SET quantity = quantity + 1 WHERE order_id = ? AND menu_item_id = 1",
+                      (order_id,))
+        other.commit()
+        floor.poll_floor()
+
+    repeat = args.repeat
+    rows = [
+        ("query per table (10 tables)", f"{_timed(per_table, repeat):9.1f} us"),
+        ("get_floor_state", f"{_timed(db.get_floor_state, repeat):9.1f} us"),
+        ("poll, nothing changed", f"{_timed(floor.poll_floor, repeat):9.1f} us"),
+        ("another terminal commits, then poll", f"{_timed(change_one_table, repeat // 10):9.1f} us"),
+    ]
+    other.close()
+    changed = sorted(set(repaints))
+    rows.append(("tables repainted", f"{', '.join(map(str, changed)) or 'none'} of 10"))
+    _report(f"Floor state with {args.days} days of order history", rows)
+    if changed != [3]:
+        print("Expected only table 3 to repaint")
+        return 1
+    return 0
+
+
+def _legacy_table_widget_class():
+    """The QFrame per table the floor used before the floor plan scene"""
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QBrush, QColor, QFont, QPainter, QPen
+    from PyQt5.QtWidgets import QFrame
+
+    class LegacyTableWidget(QFrame):
+        def __init__(self, table_number):
+            super().__init__()
+            self.table_number = table_number
+            self.status = "empty"
+            self.setStyleSheet("""
+                LegacyTableWidget { background-color: #2d2d2d; border: 2px solid #3d3d3d; border-radius: 10px; }
+                LegacyTableWidget:hover { border: 2px solid #4d4d4d; }
+            """)
+            self.setFixedSize(120, 120)
+
+        def paintEvent(self, event):
+            painter = QPainter(self)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(QPen(QColor("#3d3d3d"), 2))
+            painter.setBrush(QBrush(QColor("#2d2d2d")))
+            painter.drawRoundedRect(10, 10, 100, 100, 10, 10)
+            painter.setPen(QColor("#ffffff"))
+            painter.setFont(QFont("Arial", 16, QFont.Bold))
+            painter.drawText(self.rect(), Qt.AlignCenter, f"Table {self.table_number}")
+            status_color = {"empty": "#4CAF50", "occupied": "#f44336", "reserved": "#FFC107"}
+            painter.setBrush(QBrush(QColor(status_color[self.status])))
+            painter.setPen(Qt.NoPen)
+            painter.drawEllipse(15, 15, 10, 10)
+
+    return LegacyTableWidget
+
+
+def bench_floor_plan(args):
+    """A large venue: a QFrame per table in a grid versus the floor plan scene"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QGridLayout, QScrollArea, QWidget
+    from floor_plan import FloorPlanScene, FloorPlanView
+
+    app = QApplication.instance() or QApplication([])
+    db = Database()
+    count = args.floor_tables
+    areas = ["Terrace", "Bar", "Ground floor", "First floor"]
+    per_area = -(-count // len(areas))
+    plan = []
+    for number in range(1, count + 1):
+        area, index = divmod(number - 1, per_area)
+        row, column = divmod(index, 8)
+        round_table = number % 3 == 0
+        plan.append((number, areas[area], area * 1300 + column * 150, row * 150,
+                     100, 100, 2 if round_table else 4, 'round' if round_table else 'rect'))
+    db.set_floor_plan(plan)
+    order_id = db.create_order(1, 1)
+    db.add_item_to_order(order_id, 1, 1)
+    state = db.get_floor_state()
+    changes = range(1, count + 1, max(1, count // 50))
+
+    def pump():
+        for _ in range(3):
+            app.processEvents()
+
+    def measure(name, build, change, scroll, zoom=None):
+        start = time.perf_counter()
+        window, tables, bar = build()
+        window.resize(1200, 800)
+        window.show()
+        pump()
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        for number in changes:
+            change(tables[number])
+            pump()
+        repaint = (time.perf_counter() - start) / len(changes)
+        start = time.perf_counter()
+        for step in range(50):
+            scroll(bar, step)
+            pump()
+        scrolled = (time.perf_counter() - start) / 50
+        cells = [f"build {built * 1000:7.1f} ms", f"change one table {repaint * 1000:6.2f} ms",
+                 f"scroll step {scrolled * 1000:6.2f} ms"]
+        if zoom is not None:
+            start = time.perf_counter()
+            for step in range(20):
+                zoom(step)
+                pump()
+            cells.append(f"zoom step {(time.perf_counter() - start) / 20 * 1000:6.2f} ms")
+        window.close()
+        window.deleteLater()
+        pump()
+        return name, "   ".join(cells)
+
+    def build_widgets():
+        LegacyTableWidget = _legacy_table_widget_class()
+        scroll = QScrollArea()
+        container = QWidget()
+        grid = QGridLayout(container)
+        grid.setSpacing(30)
+        tables = {}
+        for i, row in enumerate(plan):
+            tables[row[0]] = LegacyTableWidget(row[0])
+            grid.addWidget(tables[row[0]], i // 16, i % 16)
+        scroll.setWidget(container)
+        return scroll, tables, scroll.verticalScrollBar()
+
+    def change_widget(table):
+        table.status = "occupied" if table.status == "empty" else "empty"
+        table.update()
+
+    def build_scene():
+        scene = FloorPlanScene()
+        view = FloorPlanView(scene)
+        scene.set_plan(db.get_floor_plan())
+        for number, item in scene.tables.items():
+            item.set_state(state.get(number))
+        view.resetTransform()  # real size, so there is something to scroll
+        build_scene.view = view
+        return view, scene.tables, view.horizontalScrollBar()
+
+    def change_item(item):
+        item.set_state(None if item.opened_at else (0, 'pending', 1, 4.5, 60))
+
+    def scroll_bar(bar, step):
+        bar.setValue(bar.minimum() + (bar.maximum() - bar.minimum()) * (step % 25) // 25)
+
+    def zoom(step):
+        build_scene.view.zoom_by(1.1 if step < 10 else 1 / 1.1)
+
+    rows = [
+        measure("QFrame per table, grid", build_widgets, change_widget, scroll_bar),
+        measure("floor plan scene", build_scene, change_item, scroll_bar, zoom),
+    ]
+    _report(f"{count} tables in {len(areas)} areas, 1200x800 window (headless Qt)", rows)
+
+
+BENCHMARKS = {
+    'connections': bench_connections,
+    'stress': bench_stress,
+    'plans': check_query_plans,
+    'history': bench_history,
+    'summary': bench_summary,
+    'range': bench_range,
+    'menu': bench_menu,
+    'order-menu': bench_order_menu,
+    'construct': bench_construct,
+    'taps': bench_taps,
+    'order-table': bench_order_table,
+    'dashboard': bench_dashboard,
+    'report-cache': bench_report_cache,
+    'export': bench_export,
+    'charts': bench_charts,
+    'startup': bench_startup,
+    'logging': bench_logging,
+    'log-viewer': bench_log_viewer,
+    'metrics': bench_metrics,
+    'sql-profile': bench_sql_profile,
+    'login': bench_login,
+    'user-switch': bench_user_switch,
+    'floor': bench_floor,
+    'floor-plan': bench_floor_plan,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run POS performance benchmarks")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=500, help="iterations per measurement")
+    parser.add_argument('--terminals', type=int, default=6, help="stress: concurrent writing terminals")
+    parser.add_argument('--readers', type=int, default=2, help="stress: concurrent report readers")
+    parser.add_argument('--duration', type=float, default=10.0, help="stress: seconds to run")
+    parser.add_argument('--storage-mode', default='wal', help="stress: storage mode to test")
+    parser.add_argument('--orders-per-day', type=int, default=150, help="history: generated orders per day")
+    parser.add_argument('--line-items', default="1000,100000,1000000",
+                        help="summary: comma-separated line items per day to test")
+    parser.add_argument('--years', type=int, default=3, help="range: years of generated history")
+    parser.add_argument('--budget-ms', type=float, default=1000.0,
+                        help="range: maximum time for a full-year report")
+    parser.add_argument('--startup-budget-ms', type=float, default=600.0,
+                        help="startup: maximum time from launch to the login screen")
+    parser.add_argument('--log-events', type=int, default=20000, help="logging: audit events in the burst")
+    parser.add_argument('--log-stall-ms', type=float, default=5.0,
+                        help="logging: simulated disk stall on every 200th write")
+    parser.add_argument('--slow-ms', type=float, default=20.0, help="sql-profile: slow-query threshold")
+    parser.add_argument('--logins', type=int, default=8, help="login, user-switch: staff users to log in")
+    parser.add_argument('--pin-iterations', type=int, default=200000,
+                        help="login: PBKDF2 iterations to re-hash the PINs to")
+    parser.add_argument('--floor-tables', type=int, default=200, help="floor-plan: tables on the plan")
+    parser.add_argument('--days', type=int, default=30, help="dashboard, report-cache, charts, floor: days of history to use")
+    parser.add_argument('--step-ms', type=float, default=40.0, help="dashboard: time between date changes")
+    parser.add_argument('--export-days', type=int, default=365, help="export: days to export")
+    parser.add_argument('--lock-threshold-ms', type=float, default=50.0,
+                        help="stress: order latency counted as a lock wait")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        sys.exit(BENCHMARKS[args.benchmark](args))
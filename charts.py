@@ -0,0 +1,137 @@
+"""Dashboard charts that keep their matplotlib artists between refreshes.
+
+Clearing a figure and re-plotting through pandas rebuilds the axes, ticks
+and every artist on each refresh. The charts here create their axes once
+and update the data of their bars, line or pie wedges in place. A refresh
+with the same data as the previous one does nothing, and redraws go
+through ``draw_idle`` so several chart updates in one event loop pass are
+painted together.
+
+``update`` takes a pandas Series: the index gives the bar, point or wedge
+labels and the values their sizes.
+"""
+import math
+
+ACCENT = '#5865f2'
+BACKGROUND = '#2f3136'
+TEXT = '#dcddde'
+
+
+class Chart:
+    """One set of axes on a figure, restyled only when it is created"""
+
+    def __init__(self, figure, canvas, title: str, xlabel: str = '', ylabel: str = ''):
+        self.figure = figure
+        self.canvas = canvas
+        self.ax = figure.add_subplot(111)
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.ax.set_facecolor(BACKGROUND)
+        self.ax.tick_params(colors=TEXT)
+        self._data = None
+
+    def set_title(self, title: str):
+        if self.ax.get_title() != title:
+            self.ax.set_title(title)
+            self.canvas.draw_idle()
+
+    def update(self, series) -> bool:
+        """Show ``series``; returns False when it equals what is shown already"""
+        data = (tuple(series.index), tuple(float(value) for value in series.values))
+        if data == self._data:
+            return False
+        self._data = data
+        labels, values = data
+        self._update([str(label) for label in labels], labels, values)
+        self.canvas.draw_idle()
+        return True
+
+    def _update(self, labels, index, values):
+        raise NotImplementedError
+
+
+class BarChart(Chart):
+    """Vertical bars; heights change in place while the labels stay the same"""
+
+    def __init__(self, figure, canvas, title, xlabel='', ylabel='', rotation=90, tight_layout=False):
+        super().__init__(figure, canvas, title, xlabel, ylabel)
+        self.rotation = rotation
+        self.tight_layout = tight_layout
+        self._bars = None
+        self._labels = None
+
+    def _update(self, labels, index, values):
+        if labels == self._labels:
+            for bar, value in zip(self._bars, values):
+                bar.set_height(value)
+        else:
+            if self._bars is not None:
+                self._bars.remove()
+            positions = range(len(values))
+            self._bars = self.ax.bar(positions, values, width=0.5, color=ACCENT)
+            self.ax.set_xticks(positions)
+            self.ax.set_xticklabels(labels, rotation=self.rotation)
+            self.ax.set_xlim(-0.5, max(len(values), 1) - 0.5)
+            self._labels = labels
+            if self.tight_layout:
+                self.figure.tight_layout()
+        top = max(values, default=0)
+        self.ax.set_ylim(0, top * 1.05 if top > 0 else 1)
+
+
+class LineChart(Chart):
+    """A single line whose points are replaced in place"""
+
+    def __init__(self, figure, canvas, title, xlabel='', ylabel=''):
+        super().__init__(figure, canvas, title, xlabel, ylabel)
+        self._line, = self.ax.plot([], [], color=ACCENT)
+
+    def _update(self, labels, index, values):
+        self._line.set_data(index, values)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+
+class PieChart(Chart):
+    """A pie with percentage labels; wedge angles change in place while the labels stay the same"""
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.6
+
+    def __init__(self, figure, canvas, title):
+        super().__init__(figure, canvas, title)
+        self.ax.set_aspect('equal')
+        self.ax.set_xticks([])
+        self.ax.set_yticks([])
+        self._wedges = []
+        self._texts = []
+        self._pct_texts = []
+        self._labels = None
+
+    def _update(self, labels, index, values):
+        total = sum(values)
+        if total <= 0:
+            labels, values = [], []
+        if labels != self._labels:
+            for artist in self._wedges + self._texts + self._pct_texts:
+                artist.remove()
+            self._wedges, self._texts, self._pct_texts = [], [], []
+            self._labels = labels
+            if values:
+                self._wedges, self._texts, self._pct_texts = self.ax.pie(
+                    values, labels=labels, autopct='%1.1f%%',
+                    labeldistance=self.LABEL_DISTANCE, pctdistance=self.PCT_DISTANCE)
+            return
+
+        theta = 0.0
+        for wedge, text, pct_text, value in zip(self._wedges, self._texts, self._pct_texts, values):
+            fraction = value / total
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + fraction * 360)
+            middle = math.radians(theta + fraction * 180)
+            x, y = math.cos(middle), math.sin(middle)
+            text.set_position((self.LABEL_DISTANCE * x, self.LABEL_DISTANCE * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            pct_text.set_position((self.PCT_DISTANCE * x, self.PCT_DISTANCE * y))
+            pct_text.set_text(f"{fraction * 100:.1f}%")
+            theta += fraction * 360
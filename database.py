@@ -1,329 +1,606 @@
 import sqlite3
 from typing import List, Tuple, Optional
 import csv
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
+from contextlib import contextmanager
 import os
-import pandas as pd
-import numpy as np
+import queue
+import threading
+# pandas is imported inside the report methods, so staff terminals that never
+# build a report do not pay for loading it
 import hashlib
+import hmac
 import secrets
+import migrations
+import rollups
+from menu_catalog import MenuCatalog
+from report_cache import ReportCache, touch_days
+from metrics import instrumented, registry
+from query_profiler import QueryProfiler
 
+# Pragmas applied to every connection, per storage mode. "wal" lets report
+# reads run alongside order writes from other terminals; "rollback" is
+# SQLite's default journal and is kept for comparison and for file systems
+# without shared-memory support (e.g. network shares).
+STORAGE_MODES = {
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,           # 16 MB page cache
+        'mmap_size': 64 * 1024 * 1024,  # 64 MB memory-mapped I/O
+        'wal_autocheckpoint': 1000,     # checkpoint after ~4 MB of WAL
+        'temp_store': 'MEMORY',
+    },
+    'rollback': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+    },
+}
+
+# PIN hashing: algorithm name -> hashlib digest for PBKDF2. New and changed
+# PINs are hashed with PIN_HASH_ALGORITHM and PIN_HASH_ITERATIONS; every user
+# stores the parameters of their own hash and is re-hashed with the current
+# ones at their next successful login, so these can be raised at any time.
+PIN_HASH_ALGORITHMS = {
+    'pbkdf2_sha256': 'sha256',
+    'pbkdf2_sha512': 'sha512',
+}
+PIN_HASH_ALGORITHM = 'pbkdf2_sha256'
+PIN_HASH_ITERATIONS = 100000
+# The parameters of PINs hashed before they were stored (schema version 7)
+LEGACY_PIN_HASH = ('pbkdf2_sha256', 100000)
+
+# Columns of a floor plan CSV, as used by --import-floor-plan
+FLOOR_PLAN_COLUMNS = ('table_number', 'area', 'x', 'y', 'width', 'height', 'seats', 'shape')
+
+# Failed PIN entries after which an account is locked
+MAX_FAILED_ATTEMPTS = 5
+
+def day_range(start_date, end_date=None) -> Tuple[str, str]:
+    """Return the half-open ``[start, end)`` range covering the days
+
+    Report queries compare ``created_at >= start AND created_at < end`` so
+    SQLite can use the ``created_at`` indexes instead of evaluating
+    ``DATE(created_at)`` on every row. The bounds are bare ``YYYY-MM-DD``
+    strings, which sort correctly against both timestamps and the ``day``
+    column of the rollup tables. ``end_date`` is inclusive and defaults to
+    ``start_date``.
+    """
+    start = datetime.strptime(str(start_date)[:10], "%Y-%m-%d").date()
+    end = datetime.strptime(str(end_date or start_date)[:10], "%Y-%m-%d").date()
+    return start.isoformat(), (end + timedelta(days=1)).isoformat()
+
+# SQL expressions mapping a rollup ``day`` to the label of its report period.
+# Weeks are labelled by their Monday, quarters as e.g. "2025-Q1".
+PERIOD_BUCKETS = {
+    'day': "day",
+    'week': "date(day, '-' || ((CAST(strftime('%w', day) AS INTEGER) + 6) % 7) || ' days')",
+    'month': "substr(day, 1, 7)",
+    'quarter': "substr(day, 1, 4) || '-Q' || ((CAST(substr(day, 6, 2) AS INTEGER) + 2) / 3)",
+    'year': "substr(day, 1, 4)",
+}
+
+class ConnectionManager:
+    """Hands out long-lived SQLite connections for one database file.
+
+    The GUI (main) thread keeps a single resident connection for the lifetime
+    of the process. Worker threads borrow a connection from a bounded pool and
+    return it when their outermost ``connection()`` block exits. Every
+    connection keeps its own prepared-statement cache, so repeated queries are
+    not re-compiled.
+
+    When ``POS_SQL_PROFILE`` is set, connections are opened through a
+    ``QueryProfiler`` (see ``query_profiler``) that times every statement.
+    """
+    _managers = {}
+    _managers_lock = threading.Lock()
+
+    def __init__(self, db_name: str, pool_size: int = 4,
+                 cached_statements: int = 256, timeout: float = 5.0,
+                 storage_mode: str = 'wal', profiler: QueryProfiler = None):
+        if storage_mode not in STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode: {storage_mode}")
+        self.db_name = db_name
+        self.pool_size = pool_size
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self.storage_mode = storage_mode
+        self._local = threading.local()
+        self._pool = queue.Queue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._pooled_count = 0
+        self._open_connections = []
+        self.profiler = profiler or QueryProfiler.from_environment()
+        # Set once Database has bootstrapped the schema in this process
+        self.schema_ready = False
+
+    @classmethod
+    def for_database(cls, db_name: str, **options) -> "ConnectionManager":
+        """Return the process-wide manager for a database file"""
+        key = os.path.abspath(db_name)
+        with cls._managers_lock:
+            manager = cls._managers.get(key)
+            if manager is None:
+                manager = cls(db_name, **options)
+                cls._managers[key] = manager
+            return manager
+
+    def _open(self) -> sqlite3.Connection:
+        connect = self.profiler.connect if self.profiler else sqlite3.connect
+        conn = connect(
+            self.db_name,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        self._configure(conn)
+        with self._lock:
+            self._open_connections.append(conn)
+        return conn
+
+    def _configure(self, conn: sqlite3.Connection):
+        """Apply the storage mode pragmas and busy timeout to a new connection"""
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        for pragma, value in STORAGE_MODES[self.storage_mode].items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+
+    def _checkout(self) -> sqlite3.Connection:
+        if threading.current_thread() is threading.main_thread():
+            return self._open()
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_grow = self._pooled_count < self.pool_size
+            if can_grow:
+                self._pooled_count += 1
+        if can_grow:
+            return self._open()
+        try:
+            return self._pool.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("connection pool exhausted")
+
+    def _checkin(self, conn: sqlite3.Connection):
+        # Never hand out a connection with someone else's half-done work
+        if conn.in_transaction:
+            conn.rollback()
+        self._pool.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        """Yield this thread's connection, borrowing one from the pool if needed"""
+        local = self._local
+        if getattr(local, 'conn', None) is None:
+            local.conn = self._checkout()
+            local.depth = 0
+        local.depth += 1
+        conn = local.conn
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            local.depth -= 1
+            if local.depth == 0 and threading.current_thread() is not threading.main_thread():
+                local.conn = None
+                self._checkin(conn)
+
+    def checkpoint(self, mode: str = 'PASSIVE') -> Tuple:
+        """Run a WAL checkpoint; returns (busy, wal pages, checkpointed pages)"""
+        with self.connection() as conn:
+            return conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+
+    def close_all(self):
+        """Close every connection this manager has opened"""
+        with self._lock:
+            connections, self._open_connections = self._open_connections, []
+            self._pooled_count = 0
+        self._pool = queue.Queue(maxsize=self.pool_size)
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+@instrumented('pos_db_call_seconds', exclude=('connection', 'close'))
 class Database:
+    _bootstrap_lock = threading.Lock()
+
     def __init__(self, db_name: str = "pos_system.db"):
         self.db_name = db_name
-        # Create necessary directories
-        os.makedirs("Bills", exist_ok=True)
-        os.makedirs("Kitchen_tickets", exist_ok=True)
-        self.init_db()
+        self.connections = ConnectionManager.for_database(db_name)
+        self.menu_catalog = MenuCatalog.for_database(db_name)
+        self.report_cache = ReportCache.for_database(db_name)
+        if not self.connections.schema_ready:
+            self._bootstrap()
+
+    def _bootstrap(self):
+        """Create the output directories and bring the schema up to date
+
+        Runs once per process and database file. ``init_db`` stamps the schema
+        version into ``PRAGMA user_version``, so a database that is already up
+        to date costs a single pragma read instead of the full bootstrap.
+        """
+        with Database._bootstrap_lock:
+            if self.connections.schema_ready:
+                return
+            # Create necessary directories
+            os.makedirs("Bills", exist_ok=True)
+            os.makedirs("Kitchen_tickets", exist_ok=True)
+            with self.connection() as conn:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < migrations.SCHEMA_VERSION:
+                self.init_db()
+            self.connections.schema_ready = True
 
-    def _hash_password(self, password: str, salt: str = None) -> Tuple[str, str]:
-        """Hash a password with a salt"""
+    def connection(self):
+        """Context manager yielding a pooled connection for the current thread"""
+        return self.connections.connection()
+
+    def close(self):
+        """Fold the WAL back into the database file and close all connections"""
+        try:
+            if self.connections.storage_mode == 'wal':
+                self.connections.checkpoint('TRUNCATE')
+        except sqlite3.Error as e:
+            print(f"Error while checkpointing database: {str(e)}")
+        self.connections.close_all()
+
+    def _hash_password(self, password: str, salt: str = None, algorithm: str = None,
+                       iterations: int = None) -> Tuple[str, str]:
+        """Hash a password with a salt, by default with the current parameters
+
+        Takes 100 ms or more by design; call it from a worker thread, not
+        the GUI thread.
+        """
         if salt is None:
             salt = secrets.token_hex(16)
+        algorithm = algorithm or PIN_HASH_ALGORITHM
+        iterations = iterations or PIN_HASH_ITERATIONS
         key = hashlib.pbkdf2_hmac(
-            'sha256',
+            PIN_HASH_ALGORITHMS[algorithm],
             password.encode('utf-8'),
             salt.encode('utf-8'),
-            100000  # Number of iterations
+            iterations
         )
         return hashlib.sha256(key).hexdigest(), salt
 
     def init_db(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        # Create users table with security features
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                role TEXT NOT NULL CHECK(role IN ('admin', 'staff')),
-                pin TEXT NOT NULL,
-                salt TEXT NOT NULL,
-                last_login TIMESTAMP,
-                failed_attempts INTEGER DEFAULT 0,
-                account_locked BOOLEAN DEFAULT 0
-            )
-        ''')
+            # Create users table with security features
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE,
+                    role TEXT NOT NULL CHECK(role IN ('admin', 'staff')),
+                    pin TEXT NOT NULL,
+                    salt TEXT NOT NULL,
+                    last_login TIMESTAMP,
+                    failed_attempts INTEGER DEFAULT 0,
+                    account_locked BOOLEAN DEFAULT 0
+                )
+            ''')
         
-        # Create menu items table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS menu_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                category TEXT NOT NULL,
-                price REAL NOT NULL,
-                description TEXT
-            )
-        ''')
+            # Create menu items table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS menu_items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    price REAL NOT NULL,
+                    description TEXT
+                )
+            ''')
         
-        # Create orders table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                table_number INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                status TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
+            # Create orders table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS orders (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    table_number INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            ''')
         
-        # Create order items table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS order_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_id INTEGER NOT NULL,
-                menu_item_id INTEGER NOT NULL,
-                quantity INTEGER NOT NULL,
-                FOREIGN KEY (order_id) REFERENCES orders (id),
-                FOREIGN KEY (menu_item_id) REFERENCES menu_items (id)
-            )
-        ''')
+            # Create order items table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS order_items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    order_id INTEGER NOT NULL,
+                    menu_item_id INTEGER NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    FOREIGN KEY (order_id) REFERENCES orders (id),
+                    FOREIGN KEY (menu_item_id) REFERENCES menu_items (id)
+                )
+            ''')
         
-        # Create transactions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_id INTEGER NOT NULL,
-                payment_method TEXT NOT NULL,
-                amount REAL NOT NULL,
-                tip_amount REAL NOT NULL,
-                user_id INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (order_id) REFERENCES orders (id),
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
+            # Create transactions table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS transactions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    order_id INTEGER NOT NULL,
+                    payment_method TEXT NOT NULL,
+                    amount REAL NOT NULL,
+                    tip_amount REAL NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (order_id) REFERENCES orders (id),
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            ''')
         
-        # Create default admin user if not exists
-        cursor.execute("SELECT * FROM users WHERE role = 'admin'")
-        if not cursor.fetchone():
-            hashed_pin, salt = self._hash_password("1234")
-            cursor.execute(
-                "INSERT INTO users (name, role, pin, salt) VALUES (?, ?, ?, ?)",
-                ("Admin", "admin", hashed_pin, salt)
-            )
+            # Create default admin user if not exists
+            cursor.execute("SELECT * FROM users WHERE role = 'admin'")
+            if not cursor.fetchone():
+                # The hash parameter columns are added by migration 7 and
+                # default to the legacy parameters
+                hashed_pin, salt = self._hash_password("1234", None, *LEGACY_PIN_HASH)
+                cursor.execute(
+                    "INSERT INTO users (name, role, pin, salt) VALUES (?, ?, ?, ?)",
+                    ("Admin", "admin", hashed_pin, salt)
+                )
             
-        # Insert default menu items if not exists
-        cursor.execute("SELECT COUNT(*) FROM menu_items")
-        if cursor.fetchone()[0] == 0:
-            menu_items = [
-                # Japanese Food Items
-                ("Miso Soup", "Starters", 4.50, "Traditional Japanese soup with tofu and seaweed"),
-                ("Edamame", "Starters", 5.50, "Steamed soybeans with sea salt"),
-                ("Gyoza", "Starters", 7.50, "Pan-fried dumplings with pork and vegetables"),
-                ("California Roll", "Sushi", 8.50, "Crab, avocado, and cucumber roll"),
-                ("Salmon Nigiri", "Sushi", 9.50, "Fresh salmon over pressed sushi rice"),
-                ("Tuna Roll", "Sushi", 8.50, "Fresh tuna roll with cucumber"),
-                ("Chicken Teriyaki", "Main Dishes", 15.50, "Grilled chicken with teriyaki sauce"),
-                ("Beef Ramen", "Main Dishes", 14.50, "Noodles in beef broth with vegetables"),
-                ("Vegetable Tempura", "Side Dishes", 7.50, "Assorted vegetables in crispy batter"),
-                ("Green Tea Ice Cream", "Desserts", 5.50, "Traditional Japanese dessert"),
+            # Insert default menu items if not exists
+            cursor.execute("SELECT COUNT(*) FROM menu_items")
+            if cursor.fetchone()[0] == 0:
+                menu_items = [
+                    # Japanese Food Items
+                    ("Miso Soup", "Starters", 4.50, "Traditional Japanese soup with tofu and seaweed"),
+                    ("Edamame", "Starters", 5.50, "Steamed soybeans with sea salt"),
+                    ("Gyoza", "Starters", 7.50, "Pan-fried dumplings with pork and vegetables"),
+                    ("California Roll", "Sushi", 8.50, "Crab, avocado, and cucumber roll"),
+                    ("Salmon Nigiri", "Sushi", 9.50, "Fresh salmon over pressed sushi rice"),
+                    ("Tuna Roll", "Sushi", 8.50, "Fresh tuna roll with cucumber"),
+                    ("Chicken Teriyaki", "Main Dishes", 15.50, "Grilled chicken with teriyaki sauce"),
+                    ("Beef Ramen", "Main Dishes", 14.50, "Noodles in beef broth with vegetables"),
+                    ("Vegetable Tempura", "Side Dishes", 7.50, "Assorted vegetables in crispy batter"),
+                    ("Green Tea Ice Cream", "Desserts", 5.50, "Traditional Japanese dessert"),
                 
-                # Hot Drinks
-                ("Coffee", "Hot Drinks", 2.50, "Fresh brewed coffee"),
-                ("Cappuccino", "Hot Drinks", 3.50, "Espresso with steamed milk and foam"),
-                ("Green Tea", "Hot Drinks", 2.00, "Traditional Japanese green tea"),
-                ("Hot Chocolate", "Hot Drinks", 3.00, "Rich and creamy hot chocolate"),
+                    # Hot Drinks
+                    ("Coffee", "Hot Drinks", 2.50, "Fresh brewed coffee"),
+                    ("Cappuccino", "Hot Drinks", 3.50, "Espresso with steamed milk and foam"),
+                    ("Green Tea", "Hot Drinks", 2.00, "Traditional Japanese green tea"),
+                    ("Hot Chocolate", "Hot Drinks", 3.00, "Rich and creamy hot chocolate"),
                 
-                # Cold Drinks
-                ("Cola", "Cold Drinks", 2.50, "Refreshing cola"),
-                ("Fanta", "Cold Drinks", 2.50, "Orange flavored soda"),
-                ("Sprite", "Cold Drinks", 2.50, "Lemon-lime flavored soda"),
-                ("Mineral Water", "Cold Drinks", 2.00, "Sparkling mineral water"),
+                    # Cold Drinks
+                    ("Cola", "Cold Drinks", 2.50, "Refreshing cola"),
+                    ("Fanta", "Cold Drinks", 2.50, "Orange flavored soda"),
+                    ("Sprite", "Cold Drinks", 2.50, "Lemon-lime flavored soda"),
+                    ("Mineral Water", "Cold Drinks", 2.00, "Sparkling mineral water"),
                 
-                # Beers
-                ("Pils", "Beers", 3.00, "Light lager beer"),
-                ("Special Beer", "Beers", 3.50, "Premium craft beer"),
-                ("Dark Beer", "Beers", 3.50, "Rich and malty dark beer"),
-                ("Wheat Beer", "Beers", 4.00, "Smooth wheat beer"),
+                    # Beers
+                    ("Pils", "Beers", 3.00, "Light lager beer"),
+                    ("Special Beer", "Beers", 3.50, "Premium craft beer"),
+                    ("Dark Beer", "Beers", 3.50, "Rich and malty dark beer"),
+                    ("Wheat Beer", "Beers", 4.00, "Smooth wheat beer"),
                 
-                # Wines
-                ("Red Wine", "Wines", 4.00, "House red wine"),
-                ("White Wine", "Wines", 4.00, "House white wine"),
-                ("Rosé Wine", "Wines", 4.00, "House rosé wine"),
-                ("Prosecco", "Wines", 5.00, "Italian sparkling wine"),
+                    # Wines
+                    ("Red Wine", "Wines", 4.00, "House red wine"),
+                    ("White Wine", "Wines", 4.00, "House white wine"),
+                    ("Rosé Wine", "Wines", 4.00, "House rosé wine"),
+                    ("Prosecco", "Wines", 5.00, "Italian sparkling wine"),
                 
-                # Cocktails
-                ("Mojito", "Cocktails", 8.50, "White rum, mint, lime, and soda"),
-                ("Caipirinha", "Cocktails", 8.50, "Cachaça, lime, and sugar"),
-                ("Margarita", "Cocktails", 8.50, "Tequila, lime, and triple sec"),
-                ("Pina Colada", "Cocktails", 9.00, "Rum, coconut cream, and pineapple juice")
-            ]
-            cursor.executemany(
-                "INSERT INTO menu_items (name, category, price, description) VALUES (?, ?, ?, ?)",
-                menu_items
-            )
+                    # Cocktails
+                    ("Mojito", "Cocktails", 8.50, "White rum, mint, lime, and soda"),
+                    ("Caipirinha", "Cocktails", 8.50, "Cachaça, lime, and sugar"),
+                    ("Margarita", "Cocktails", 8.50, "Tequila, lime, and triple sec"),
+                    ("Pina Colada", "Cocktails", 9.00, "Rum, coconut cream, and pineapple juice")
+                ]
+                cursor.executemany(
+                    "INSERT INTO menu_items (name, category, price, description) VALUES (?, ?, ?, ?)",
+                    menu_items
+                )
         
-        conn.commit()
-        conn.close()
+            conn.commit()
+            
+            # Bring indexes and later schema changes up to date
+            version = migrations.migrate(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
 
     def add_user(self, name: str, role: str, pin: str) -> bool:
         """Add a new user to the database with hashed password"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
+            with self.connection() as conn:
+                cursor = conn.cursor()
             
-            # Check if username already exists
-            cursor.execute("SELECT id FROM users WHERE name = ?", (name,))
-            if cursor.fetchone():
-                return False
+                # Check if username already exists
+                cursor.execute("SELECT id FROM users WHERE name = ?", (name,))
+                if cursor.fetchone():
+                    return False
                 
-            hashed_pin, salt = self._hash_password(pin)
-            cursor.execute(
-                "INSERT INTO users (name, role, pin, salt) VALUES (?, ?, ?, ?)",
-                (name, role, hashed_pin, salt)
-            )
-            conn.commit()
-            conn.close()
-            return True
+                hashed_pin, salt = self._hash_password(pin)
+                cursor.execute(
+                    "INSERT INTO users (name, role, pin, salt, hash_algorithm, hash_iterations) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (name, role, hashed_pin, salt, PIN_HASH_ALGORITHM, PIN_HASH_ITERATIONS)
+                )
+                conn.commit()
+                return True
         except sqlite3.Error:
             return False
 
     def remove_user(self, user_id: int) -> bool:
         """Remove a user from the database"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-            conn.commit()
-            conn.close()
-            return True
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+                conn.commit()
+                return True
         except sqlite3.Error:
             return False
 
     def get_all_users(self) -> List[Tuple]:
         """Get all users from the database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, role, pin FROM users")
-        users = cursor.fetchall()
-        conn.close()
-        return users
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name, role, pin FROM users")
+            users = cursor.fetchall()
+            return users
 
     def verify_user(self, name: str, pin: str) -> Optional[Tuple]:
-        """Verify user credentials with password hashing"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        """Verify user credentials with password hashing
+
+        A user whose PIN was hashed with older parameters is re-hashed with
+        the current ones on success. Hashing is slow on purpose, so the
+        login screen calls this from a worker thread.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        # Get user data including salt
-        cursor.execute(
-            "SELECT id, name, role, pin, salt, account_locked, failed_attempts FROM users WHERE name = ?",
-            (name,)
-        )
-        user = cursor.fetchone()
+            # Get user data including salt and hash parameters
+            cursor.execute(
+                "SELECT id, name, role, pin, salt, account_locked, hash_algorithm, hash_iterations "
+                "FROM users WHERE name = ?",
+                (name,)
+            )
+            user = cursor.fetchone()
         
-        if not user:
-            conn.close()
-            return None
+            if not user:
+                return None
             
-        user_id, user_name, role, stored_pin, salt, account_locked, failed_attempts = user
+            user_id, user_name, role, stored_pin, salt, account_locked, algorithm, iterations = user
         
-        # Check if account is locked
-        if account_locked:
-            conn.close()
-            return None
+            # Check if account is locked
+            if account_locked:
+                return None
+
+            if algorithm not in PIN_HASH_ALGORITHMS:
+                print(f"Error verifying user {user_name}: unknown hash algorithm {algorithm}")
+                return None
             
-        # Verify password
-        hashed_pin, _ = self._hash_password(pin, salt)
+            # Verify password
+            hashed_pin, _ = self._hash_password(pin, salt, algorithm, iterations)
         
-        if hashed_pin == stored_pin:
-            # Reset failed attempts and update last login
-            cursor.execute(
-                "UPDATE users SET failed_attempts = 0, last_login = CURRENT_TIMESTAMP WHERE id = ?",
-                (user_id,)
-            )
-            conn.commit()
-            conn.close()
-            return (user_id, user_name, role)
-        else:
-            # Increment failed attempts
-            failed_attempts += 1
-            if failed_attempts >= 5:
+            if hmac.compare_digest(hashed_pin, stored_pin):
+                # Reset failed attempts and update last login
                 cursor.execute(
-                    "UPDATE users SET failed_attempts = ?, account_locked = 1 WHERE id = ?",
-                    (failed_attempts, user_id)
+                    "UPDATE users SET failed_attempts = 0, last_login = CURRENT_TIMESTAMP WHERE id = ?",
+                    (user_id,)
                 )
+                if (algorithm, iterations) != (PIN_HASH_ALGORITHM, PIN_HASH_ITERATIONS):
+                    hashed_pin, salt = self._hash_password(pin)
+                    cursor.execute(
+                        "UPDATE users SET pin = ?, salt = ?, hash_algorithm = ?, hash_iterations = ? "
+                        "WHERE id = ?",
+                        (hashed_pin, salt, PIN_HASH_ALGORITHM, PIN_HASH_ITERATIONS, user_id)
+                    )
+                conn.commit()
+                return (user_id, user_name, role)
             else:
+                # Increment failed attempts in one statement, so attempts
+                # verified at the same time on several terminals all count
                 cursor.execute(
-                    "UPDATE users SET failed_attempts = ? WHERE id = ?",
-                    (failed_attempts, user_id)
+                    "UPDATE users SET failed_attempts = failed_attempts + 1, "
+                    "account_locked = (failed_attempts + 1 >= ?) WHERE id = ?",
+                    (MAX_FAILED_ATTEMPTS, user_id)
                 )
-            conn.commit()
-            conn.close()
-            return None
+                conn.commit()
+                return None
 
     def get_menu_items(self) -> List[Tuple]:
         """Get all menu items"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, category, price, description FROM menu_items")
-        items = cursor.fetchall()
-        conn.close()
-        return items
+        return list(self.get_menu_catalog().items.values())
+
+    def get_menu_catalog(self) -> MenuCatalog:
+        """Get the cached menu catalog, reloaded if the menu changed"""
+        with self.connection() as conn:
+            return self.menu_catalog.refresh(conn)
 
     def create_order(self, table_number: int, user_id: int) -> int:
         """Create a new order and return its ID"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO orders (table_number, user_id, status) VALUES (?, ?, ?)",
-            (table_number, user_id, "pending")
-        )
-        order_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return order_id
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO orders (table_number, user_id, status) VALUES (?, ?, ?)",
+                (table_number, user_id, "pending")
+            )
+            order_id = cursor.lastrowid
+            conn.commit()
+            return order_id
 
     def add_item_to_order(self, order_id: int, menu_item_id: int, quantity: int) -> bool:
         """Add an item to an existing order"""
+        return self.add_items_to_order(order_id, {menu_item_id: quantity})
+
+    def add_items_to_order(self, order_id: int, quantities: dict) -> bool:
+        """Add quantity deltas per menu item to an order in one transaction
+
+        Each menu item has at most one line per order; deltas are added to it
+        and lines that drop to zero are removed.
+        """
         try:
-            conn = sqlite3.connect(self.db_name)
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany("""
+                    INSERT INTO order_items (order_id, menu_item_id, quantity) VALUES (?, ?, ?)
+                    ON CONFLICT (order_id, menu_item_id) DO UPDATE SET
+                        quantity = quantity + excluded.quantity
+                """, [(order_id, item_id, quantity) for item_id, quantity in quantities.items()])
+                cursor.execute(
+                    "DELETE FROM order_items WHERE order_id = ? AND quantity <= 0",
+                    (order_id,)
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Error while adding items to order: {str(e)}")
+            return False
+
+    def get_order_lines(self, order_id: int) -> List[Tuple]:
+        """Get the (menu_item_id, quantity) lines of an order"""
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "INSERT INTO order_items (order_id, menu_item_id, quantity) VALUES (?, ?, ?)",
-                (order_id, menu_item_id, quantity)
+                "SELECT menu_item_id, quantity FROM order_items WHERE order_id = ?",
+                (order_id,)
             )
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.Error:
-            return False
+            return cursor.fetchall()
 
     def get_order_items(self, order_id: int) -> List[Tuple]:
-        """Get all items in an order"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT mi.name, oi.quantity, mi.price
-            FROM order_items oi
-            JOIN menu_items mi ON oi.menu_item_id = mi.id
-            WHERE oi.order_id = ?
-        """, (order_id,))
-        items = cursor.fetchall()
-        conn.close()
-        return items
+        """Get all items in an order as (name, quantity, price)"""
+        with self.connection() as conn:
+            menu = self.menu_catalog.refresh(conn).items
+            lines = conn.execute(
+                "SELECT menu_item_id, quantity FROM order_items WHERE order_id = ?",
+                (order_id,)
+            ).fetchall()
+        return [(menu[item_id][1], quantity, menu[item_id][3])
+                for item_id, quantity in lines if item_id in menu]
 
     def delete_order_items(self, order_id: int) -> bool:
         """Delete all items associated with an order"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
+            with self.connection() as conn:
+                cursor = conn.cursor()
             
-            # First delete related transactions
-            cursor.execute("DELETE FROM transactions WHERE order_id = ?", (order_id,))
+                # Take the order back out of the sales rollups
+                cursor.execute("SELECT status FROM orders WHERE id = ?", (order_id,))
+                row = cursor.fetchone()
+                if row and row[0] == 'paid':
+                    rollups.apply_order_lines(cursor, order_id, sign=-1)
+                cursor.execute("SELECT id FROM transactions WHERE order_id = ?", (order_id,))
+                for (transaction_id,) in cursor.fetchall():
+                    rollups.apply_transaction(cursor, transaction_id, sign=-1)
             
-            # Then delete order items
-            cursor.execute("DELETE FROM order_items WHERE order_id = ?", (order_id,))
+                # First delete related transactions
+                cursor.execute("DELETE FROM transactions WHERE order_id = ?", (order_id,))
             
-            # Finally delete the order
-            cursor.execute("DELETE FROM orders WHERE id = ?", (order_id,))
+                # Then delete order items
+                cursor.execute("DELETE FROM order_items WHERE order_id = ?", (order_id,))
             
-            conn.commit()
-            conn.close()
-            return True
+                # Finally delete the order
+                cursor.execute("DELETE FROM orders WHERE id = ?", (order_id,))
+            
+                conn.commit()
+                return True
         except sqlite3.Error as e:
             print(f"Error while deleting order items: {str(e)}")
             return False
@@ -331,159 +608,251 @@ class Database:
     def update_order_status(self, order_id: int, status: str) -> bool:
         """Update the status of an order"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
+            with self.connection() as conn:
+                cursor = conn.cursor()
             
-            if status == "deleted":
-                # First delete all order items
-                if not self.delete_order_items(order_id):
-                    return False
+                if status == "deleted":
+                    # First delete all order items
+                    if not self.delete_order_items(order_id):
+                        return False
                     
-            cursor.execute(
-                "UPDATE orders SET status = ? WHERE id = ?",
-                (status, order_id)
-            )
-            conn.commit()
-            conn.close()
-            return True
+                if status == "paid":
+                    # Roll the lines up only on the transition to paid
+                    cursor.execute(
+                        "UPDATE orders SET status = ? WHERE id = ? AND status != ?",
+                        (status, order_id, status)
+                    )
+                    if cursor.rowcount:
+                        rollups.apply_order_lines(cursor, order_id)
+                else:
+                    cursor.execute(
+                        "UPDATE orders SET status = ? WHERE id = ?",
+                        (status, order_id)
+                    )
+                conn.commit()
+                return True
         except sqlite3.Error:
             return False
 
     def get_order_details(self, order_id: int) -> Tuple:
         """Get order details including user information"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT o.id, o.table_number, o.status, o.created_at, u.name as user_name
-            FROM orders o
-            JOIN users u ON o.user_id = u.id
-            WHERE o.id = ?
-        """, (order_id,))
-        order = cursor.fetchone()
-        conn.close()
-        return order
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT o.id, o.table_number, o.status, o.created_at, u.name as user_name
+                FROM orders o
+                JOIN users u ON o.user_id = u.id
+                WHERE o.id = ?
+            """, (order_id,))
+            order = cursor.fetchone()
+            return order
 
     def clear_all_orders(self) -> bool:
         """Clear all orders and their items from the database"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
+            with self.connection() as conn:
+                cursor = conn.cursor()
             
-            # First delete all transactions
-            cursor.execute("DELETE FROM transactions")
+                for table in rollups.ROLLUP_TABLES:
+                    cursor.execute(f"DELETE FROM {table}")
             
-            # Then delete all order items
-            cursor.execute("DELETE FROM order_items")
+                # First delete all transactions
+                cursor.execute("DELETE FROM transactions")
             
-            # Finally delete all orders
-            cursor.execute("DELETE FROM orders")
+                # Then delete all order items
+                cursor.execute("DELETE FROM order_items")
             
-            conn.commit()
-            conn.close()
-            return True
+                # Finally delete all orders
+                cursor.execute("DELETE FROM orders")
+            
+                conn.commit()
+                return True
         except sqlite3.Error as e:
             print(f"Error while clearing all orders: {str(e)}")
             return False
 
     def get_active_order_for_table(self, table_number: int) -> Optional[int]:
         """Get the active (pending or confirmed) order ID for a table"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id FROM orders 
-            WHERE table_number = ? AND status IN ('pending', 'confirmed')
-            ORDER BY created_at DESC LIMIT 1
-        """, (table_number,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else None
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id FROM orders 
+                WHERE table_number = ? AND status IN ('pending', 'confirmed')
+                ORDER BY created_at DESC LIMIT 1
+            """, (table_number,))
+            result = cursor.fetchone()
+            return result[0] if result else None
+
+    def get_floor_state(self) -> dict:
+        """Get the open order of every occupied table in one query
+
+        Returns ``{table_number: (order_id, status, item_count, total,
+        elapsed_seconds)}``; tables without a pending or confirmed order are
+        left out. When a table has several open orders the newest one is
+        reported, as in ``get_active_order_for_table``.
+        """
+        with self.connection() as conn:
+            rows = conn.execute("""
+                SELECT o.table_number, o.id, o.status,
+                       COALESCE(SUM(oi.quantity), 0),
+                       COALESCE(SUM(oi.quantity * mi.price), 0),
+                       (julianday('now') - julianday(o.created_at)) * 86400
+                FROM orders o
+                LEFT JOIN order_items oi ON oi.order_id = o.id
+                LEFT JOIN menu_items mi ON mi.id = oi.menu_item_id
+                WHERE o.status IN ('pending', 'confirmed')
+                GROUP BY o.id
+                ORDER BY o.table_number, o.created_at, o.id
+            """).fetchall()
+        # Newest order last, so it wins
+        return {row[0]: row[1:] for row in rows}
+
+    def get_floor_plan(self) -> List[Tuple]:
+        """Get the floor plan as (table_number, area, x, y, width, height, seats, shape)"""
+        with self.connection() as conn:
+            return conn.execute("""
+                SELECT table_number, area, x, y, width, height, seats, shape
+                FROM floor_tables ORDER BY area, table_number
+            """).fetchall()
+
+    def set_floor_plan(self, tables: List[Tuple]) -> bool:
+        """Replace the floor plan with ``tables``, in the order of ``get_floor_plan``"""
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM floor_tables")
+                cursor.executemany(
+                    "INSERT INTO floor_tables (table_number, area, x, y, width, height, seats, shape) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    tables
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Error saving floor plan: {str(e)}")
+            return False
+
+    def export_floor_plan(self, path: str):
+        """Write the floor plan to a CSV file that ``import_floor_plan`` reads back"""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(FLOOR_PLAN_COLUMNS)
+            writer.writerows(self.get_floor_plan())
+
+    def import_floor_plan(self, path: str) -> bool:
+        """Replace the floor plan with the tables in a CSV file"""
+        try:
+            with open(path, newline='') as f:
+                tables = [(int(row['table_number']), row['area'], float(row['x']), float(row['y']),
+                           float(row['width']), float(row['height']), int(row['seats']), row['shape'])
+                          for row in csv.DictReader(f)]
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Error reading floor plan {path}: {str(e)}")
+            return False
+        return self.set_floor_plan(tables)
+
+    def data_version(self) -> int:
+        """SQLite's ``data_version`` of this thread's connection
+
+        It changes whenever another connection, in this process or another
+        terminal, commits to the database; the connection's own commits do
+        not change it. Cheap enough to poll.
+        """
+        with self.connection() as conn:
+            return conn.execute("PRAGMA data_version").fetchone()[0]
 
     def generate_kitchen_order_csv(self, order_id: int) -> str:
         """Generate a CSV file for kitchen orders"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        # Get order details including user
-        cursor.execute("""
-            SELECT o.table_number, o.created_at, mi.name, oi.quantity, u.name as user_name
-            FROM orders o
-            JOIN order_items oi ON o.id = oi.order_id
-            JOIN menu_items mi ON oi.menu_item_id = mi.id
-            JOIN users u ON o.user_id = u.id
-            WHERE o.id = ?
-        """, (order_id,))
-        items = cursor.fetchall()
+            # Get order details including user
+            cursor.execute("""
+                SELECT o.table_number, o.created_at, mi.name, oi.quantity, u.name as user_name
+                FROM orders o
+                JOIN order_items oi ON o.id = oi.order_id
+                JOIN menu_items mi ON oi.menu_item_id = mi.id
+                JOIN users u ON o.user_id = u.id
+                WHERE o.id = ?
+            """, (order_id,))
+            items = cursor.fetchall()
         
-        if not items:
-            return None
+            if not items:
+                return None
             
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"kitchen_order_{order_id}_{timestamp}.csv"
-        filepath = os.path.join("Kitchen_tickets", filename)
+            # Generate filename with timestamp
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"kitchen_order_{order_id}_{timestamp}.csv"
+            filepath = os.path.join("Kitchen_tickets", filename)
         
-        # Write to CSV
-        with open(filepath, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['Table Number', 'Order Time', 'Item', 'Quantity', 'Ordered By'])
-            for item in items:
-                writer.writerow(item)
+            # Write to CSV
+            with open(filepath, 'w', newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(['Table Number', 'Order Time', 'Item', 'Quantity', 'Ordered By'])
+                for item in items:
+                    writer.writerow(item)
         
-        conn.close()
-        return filepath
+            return filepath
 
     def add_transaction(self, order_id: int, payment_method: str, amount: float, tip_amount: float, user_id: int) -> bool:
         """Add a new transaction record"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO transactions (order_id, payment_method, amount, tip_amount, user_id) VALUES (?, ?, ?, ?, ?)",
-                (order_id, payment_method, amount, tip_amount, user_id)
-            )
-            conn.commit()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO transactions (order_id, payment_method, amount, tip_amount, user_id) VALUES (?, ?, ?, ?, ?)",
+                    (order_id, payment_method, amount, tip_amount, user_id)
+                )
+                rollups.apply_transaction(cursor, cursor.lastrowid)
+                conn.commit()
+            registry.counter('pos_payments', "Payments recorded").inc(method=payment_method)
             return True
         except sqlite3.Error:
             return False
 
+    def rebuild_rollups(self, start_date=None, end_date=None) -> bool:
+        """Recompute the sales rollups from raw rows
+
+        Covers the days from ``start_date`` to ``end_date`` (inclusive), or
+        the whole history when no dates are given.
+        """
+        bounds = day_range(start_date, end_date) if start_date else (None, None)
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                rollups.rebuild(cursor, *bounds)
+                touch_days(cursor, *bounds)
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Error while rebuilding rollups: {str(e)}")
+            return False
+
     def get_daily_revenue(self, date):
         """Get daily revenue summary"""
+        import pandas as pd
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            # Get transactions for the day
-            start_date = f"{date} 00:00:00"
-            end_date = f"{date} 23:59:59"
-            
-            cursor.execute("""
-                SELECT created_at, amount 
-                FROM transactions 
-                WHERE created_at BETWEEN ? AND ?
-            """, (start_date, end_date))
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT hour, SUM(revenue), SUM(transactions)
+                    FROM sales_hourly
+                    WHERE day >= ? AND day < ?
+                    GROUP BY hour
+                """, day_range(date))
+                hourly = cursor.fetchall()
             
-            transactions = cursor.fetchall()
-            
-            if not transactions:
+            if not hourly:
                 return {
                     'total_revenue': 0.0,
                     'hourly_revenue': pd.Series(),
                     'transaction_count': 0
                 }
             
-            # Convert to DataFrame
-            df = pd.DataFrame(transactions, columns=['created_at', 'amount'])
-            df['created_at'] = pd.to_datetime(df['created_at'])
-            
-            # Calculate metrics
-            total_revenue = df['amount'].sum()
-            hourly_revenue = df.groupby(df['created_at'].dt.hour)['amount'].sum()
-            
             return {
-                'total_revenue': total_revenue,
-                'hourly_revenue': hourly_revenue,
-                'transaction_count': len(transactions)
+                'total_revenue': sum(revenue for _, revenue, _ in hourly),
+                'hourly_revenue': pd.Series({hour: revenue for hour, revenue, _ in hourly}),
+                'transaction_count': sum(count for _, _, count in hourly)
             }
             
         except sqlite3.Error as e:
@@ -493,220 +862,272 @@ class Database:
                 'hourly_revenue': pd.Series(),
                 'transaction_count': 0
             }
-        finally:
-            conn.close()
-            
+
     def get_daily_transaction_count(self, date):
         """Get count of transactions for a specific day"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            start_date = f"{date} 00:00:00"
-            end_date = f"{date} 23:59:59"
-            
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM transactions 
-                WHERE created_at BETWEEN ? AND ?
-            """, (start_date, end_date))
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT COALESCE(SUM(transactions), 0)
+                    FROM sales_hourly
+                    WHERE day >= ? AND day < ?
+                """, day_range(date))
             
-            return cursor.fetchone()[0]
+                return cursor.fetchone()[0]
             
         except sqlite3.Error as e:
             print(f"Error getting transaction count: {str(e)}")
             return 0
-        finally:
-            conn.close()
-            
+
     def get_daily_guest_count(self, date):
         """Get count of unique guests for a specific day"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
+            with self.connection() as conn:
+                cursor = conn.cursor()
             
-            start_date = f"{date} 00:00:00"
-            end_date = f"{date} 23:59:59"
+                start_date, end_date = day_range(date)
             
-            cursor.execute("""
-                SELECT COUNT(DISTINCT table_number) 
-                FROM transactions 
-                WHERE created_at BETWEEN ? AND ?
-            """, (start_date, end_date))
+                cursor.execute("""
+                    SELECT COUNT(DISTINCT o.table_number) 
+                    FROM transactions t
+                    JOIN orders o ON t.order_id = o.id
+                    WHERE t.created_at >= ? AND t.created_at < ?
+                """, (start_date, end_date))
             
-            return cursor.fetchone()[0]
+                return cursor.fetchone()[0]
             
         except sqlite3.Error as e:
             print(f"Error getting guest count: {str(e)}")
             return 0
-        finally:
-            conn.close()
             
     def get_daily_summary(self, date):
-        """Get comprehensive daily summary"""
+        """Get comprehensive daily summary
+
+        All aggregation happens in SQL and each query returns at most one row
+        per hour, menu item, category or payment method; pandas is only used to
+        shape those compact results for the dashboard and PDF exports.
+        """
+        start, end = day_range(date)
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            start_date = f"{date} 00:00:00"
-            end_date = f"{date} 23:59:59"
-            
-            # Get transactions with order details
-            cursor.execute("""
-                SELECT t.created_at, t.amount, o.table_number, t.user_id,
-                       oi.menu_item_id, oi.quantity, mi.price,
-                       mi.name, mi.category
-                FROM transactions t
-                JOIN orders o ON t.order_id = o.id
-                JOIN order_items oi ON o.id = oi.order_id
-                JOIN menu_items mi ON oi.menu_item_id = mi.id
-                WHERE t.created_at BETWEEN ? AND ?
-            """, (start_date, end_date))
-            
-            transactions = cursor.fetchall()
-            
-            if not transactions:
-                return {
-                    'revenue': {
-                        'total': 0.0,
-                        'by_hour': pd.Series()
-                    },
-                    'transactions': {
-                        'count': 0,
-                        'average_order': 0.0,
-                        'hourly_distribution': pd.Series()
-                    },
-                    'menu': {
-                        'top_items': pd.DataFrame(),
-                        'category_analysis': {
-                            'revenue': pd.Series(),
-                            'quantity': pd.Series()
-                        }
-                    },
-                    'tax': {
-                        'total': 0.0,
-                        'by_category': pd.Series()
-                    }
-                }
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(transactions, columns=[
-                'created_at', 'amount', 'table_number', 'user_id',
-                'menu_item_id', 'quantity', 'price',
-                'item_name', 'category'
-            ])
-            df['created_at'] = pd.to_datetime(df['created_at'])
-            
-            # Calculate revenue metrics
-            total_revenue = df['amount'].sum()
-            hourly_revenue = df.groupby(df['created_at'].dt.hour)['amount'].sum()
-            
-            # Calculate transaction metrics
-            transaction_count = len(df['amount'].unique())
-            average_order = total_revenue / transaction_count if transaction_count > 0 else 0
-            hourly_transactions = df.groupby(df['created_at'].dt.hour)['amount'].count()
-            
-            # Calculate menu metrics
-            top_items = df.groupby('item_name').agg({
-                'quantity': 'sum',
-                'price': lambda x: (x * df.loc[x.index, 'quantity']).sum()
-            }).sort_values('quantity', ascending=False)
-            
-            category_revenue = df.groupby('category')['amount'].sum()
-            category_quantity = df.groupby('category')['quantity'].sum()
-            
-            # Calculate tax metrics
-            tax_rate = 0.21  # 21% VAT
-            total_tax = total_revenue * tax_rate
-            tax_by_category = category_revenue * tax_rate
-            
-            return {
-                'revenue': {
-                    'total': total_revenue,
-                    'by_hour': hourly_revenue
-                },
-                'transactions': {
-                    'count': transaction_count,
-                    'average_order': average_order,
-                    'hourly_distribution': hourly_transactions
-                },
-                'menu': {
-                    'top_items': top_items,
-                    'category_analysis': {
-                        'revenue': category_revenue,
-                        'quantity': category_quantity
-                    }
-                },
-                'tax': {
-                    'total': total_tax,
-                    'by_category': tax_by_category
-                }
-            }
-            
+            with self.connection() as conn:
+                return self.report_cache.get(
+                    conn, 'daily_summary', start, end,
+                    lambda: self._build_summary(self._summary_aggregates(conn, start, end))
+                )
         except sqlite3.Error as e:
             print(f"Error getting daily summary: {str(e)}")
-            return {
-                'revenue': {
-                    'total': 0.0,
-                    'by_hour': pd.Series()
-                },
-                'transactions': {
-                    'count': 0,
-                    'average_order': 0.0,
-                    'hourly_distribution': pd.Series()
-                },
-                'menu': {
-                    'top_items': pd.DataFrame(),
-                    'category_analysis': {
-                        'revenue': pd.Series(),
-                        'quantity': pd.Series()
-                    }
-                },
-                'tax': {
-                    'total': 0.0,
-                    'by_category': pd.Series()
+            return self._build_summary({'payments': [], 'items': []})
+
+    def _summary_aggregates(self, conn, start_date: str, end_date: str) -> dict:
+        """Read the rollup rows behind a summary for [start_date, end_date)
+
+        Each query is a range scan over one rollup table's primary key, so the
+        cost grows with the number of days, not with how much was sold.
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT hour, payment_method, SUM(revenue), SUM(tips), SUM(transactions)
+            FROM sales_hourly
+            WHERE day >= ? AND day < ?
+            GROUP BY hour, payment_method
+        """, (start_date, end_date))
+        payments = cursor.fetchall()
+        
+        cursor.execute("""
+            SELECT mi.name, mi.category, sold.quantity, sold.revenue, sold.tax
+            FROM (
+                SELECT menu_item_id, SUM(quantity) AS quantity, SUM(revenue) AS revenue,
+                       SUM(tax) AS tax
+                FROM sales_items
+                WHERE day >= ? AND day < ?
+                GROUP BY menu_item_id
+            ) sold
+            JOIN menu_items mi ON mi.id = sold.menu_item_id
+            ORDER BY sold.quantity DESC
+        """, (start_date, end_date))
+        items = cursor.fetchall()
+        
+        return {'payments': payments, 'items': items}
+
+    def _build_summary(self, aggregates: dict) -> dict:
+        """Shape summary aggregates into the Series/DataFrames the reports use"""
+        import pandas as pd
+        revenue_by_hour, count_by_hour = {}, {}
+        amount_by_method, tips_by_method = {}, {}
+        for hour, method, amount, tips, count in aggregates['payments']:
+            revenue_by_hour[hour] = revenue_by_hour.get(hour, 0.0) + amount
+            count_by_hour[hour] = count_by_hour.get(hour, 0) + count
+            amount_by_method[method] = amount_by_method.get(method, 0.0) + amount
+            tips_by_method[method] = tips_by_method.get(method, 0.0) + tips
+        total_revenue = float(sum(revenue_by_hour.values()))
+        transaction_count = sum(count_by_hour.values())
+        
+        items = aggregates['items']
+        revenue_by_category, quantity_by_category, tax_by_category = {}, {}, {}
+        for _, category, quantity, revenue, tax in items:
+            revenue_by_category[category] = revenue_by_category.get(category, 0.0) + revenue
+            quantity_by_category[category] = quantity_by_category.get(category, 0) + quantity
+            tax_by_category[category] = tax_by_category.get(category, 0.0) + tax
+        top_items = pd.DataFrame(
+            [(name, quantity, revenue) for name, _, quantity, revenue, _ in items],
+            columns=['item_name', 'quantity', 'price']
+        ).set_index('item_name') if items else pd.DataFrame()
+        category_revenue = pd.Series(revenue_by_category, dtype=float)
+        category_quantity = pd.Series(quantity_by_category, dtype=int)
+        category_tax = pd.Series(tax_by_category, dtype=float)
+        
+        return {
+            'revenue': {
+                'total': total_revenue,
+                'by_hour': pd.Series(revenue_by_hour, dtype=float).sort_index()
+            },
+            'transactions': {
+                'count': transaction_count,
+                'average_order': total_revenue / transaction_count if transaction_count > 0 else 0.0,
+                'hourly_distribution': pd.Series(count_by_hour, dtype=int).sort_index()
+            },
+            'menu': {
+                'top_items': top_items,
+                'category_analysis': {
+                    'revenue': category_revenue,
+                    'quantity': category_quantity
                 }
+            },
+            'payments': {
+                'by_method': pd.Series(amount_by_method, dtype=float),
+                'tips': float(sum(tips_by_method.values()))
+            },
+            'tax': {
+                'total': float(category_tax.sum()),
+                'by_category': category_tax
             }
-        finally:
-            conn.close()
+        }
+
+    def get_range_report(self, start_date, end_date, bucket: str = 'day') -> dict:
+        """Get a report for the days from start_date to end_date (inclusive)
+
+        Returns the same sections as ``get_daily_summary`` for the whole
+        range, plus ``periods``: a DataFrame indexed by period (see
+        ``PERIOD_BUCKETS``) with revenue, transactions, average_order, tips
+        and tax columns, and ``employees`` with orders, revenue and tips per
+        employee. Everything is read from the rollups, so a year costs a few
+        thousand rollup rows regardless of how much was sold.
+        """
+        import pandas as pd
+        if bucket not in PERIOD_BUCKETS:
+            raise ValueError(f"Unknown report bucket: {bucket}")
+        start, end = day_range(start_date, end_date)
+        try:
+            with self.connection() as conn:
+                report = self.report_cache.get(
+                    conn, f'range_report:{bucket}', start, end,
+                    lambda: self._range_report(*self._range_aggregates(conn, start, end, bucket))
+                )
+        except sqlite3.Error as e:
+            print(f"Error getting range report: {str(e)}")
+            report = self._range_report(
+                {'payments': [], 'items': []},
+                pd.DataFrame(columns=['revenue', 'transactions', 'tips', 'tax']),
+                pd.DataFrame(columns=['orders', 'revenue', 'tips'])
+            )
+        report.update({
+            'start': start_date,
+            'end': end_date,
+            'bucket': bucket
+        })
+        return report
+
+    def _range_aggregates(self, conn, start: str, end: str, bucket: str):
+        """Read the summary aggregates, periods and employees for [start, end)"""
+        import pandas as pd
+        period = PERIOD_BUCKETS[bucket]
+        aggregates = self._summary_aggregates(conn, start, end)
+        periods = pd.read_sql_query(f"""
+            SELECT sales.period, sales.revenue, sales.transactions, sales.tips,
+                   COALESCE(tax.tax, 0) AS tax
+            FROM (
+                SELECT {period} AS period, SUM(revenue) AS revenue,
+                       SUM(transactions) AS transactions, SUM(tips) AS tips
+                FROM sales_hourly
+                WHERE day >= ? AND day < ?
+                GROUP BY 1
+            ) sales
+            LEFT JOIN (
+                SELECT {period} AS period, SUM(tax) AS tax
+                FROM sales_items
+                WHERE day >= ? AND day < ?
+                GROUP BY 1
+            ) tax ON tax.period = sales.period
+            ORDER BY sales.period
+        """, conn, params=(start, end, start, end), index_col='period')
+        employees = pd.read_sql_query("""
+            SELECT u.name, SUM(s.orders) AS orders, SUM(s.revenue) AS revenue,
+                   SUM(s.tips) AS tips
+            FROM sales_employees s
+            JOIN users u ON u.id = s.user_id
+            WHERE s.day >= ? AND s.day < ?
+            GROUP BY u.id
+            ORDER BY revenue DESC
+        """, conn, params=(start, end), index_col='name')
+        return aggregates, periods, employees
+
+    def _range_report(self, aggregates: dict, periods, employees) -> dict:
+        periods.insert(2, 'average_order',
+                       (periods['revenue'] / periods['transactions'].where(periods['transactions'] > 0)).fillna(0.0))
+        report = self._build_summary(aggregates)
+        report.update({
+            'periods': periods,
+            'employees': employees
+        })
+        return report
 
     def get_daily_tips(self, date):
         """Get total tips for a specific date"""
-        conn = sqlite3.connect(self.db_name)
-        query = """
-            SELECT created_at, tip_amount, payment_method
-            FROM transactions
-            WHERE DATE(created_at) = ?
-        """
-        df = pd.read_sql_query(query, conn, params=(date,))
-        conn.close()
+        import pandas as pd
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT hour, payment_method, SUM(tips)
+                FROM sales_hourly
+                WHERE day >= ? AND day < ?
+                GROUP BY hour, payment_method
+            """, day_range(date))
+            rows = cursor.fetchall()
         
-        if df.empty:
+        if not rows:
             return {
                 'total_tips': 0.0,
                 'tips_by_payment': pd.Series(),
                 'tips_by_hour': pd.Series()
             }
-            
+        
+        df = pd.DataFrame(rows, columns=['hour', 'payment_method', 'tip_amount'])
         return {
             'total_tips': df['tip_amount'].sum(),
             'tips_by_payment': df.groupby('payment_method')['tip_amount'].sum(),
-            'tips_by_hour': df.groupby(df['created_at'].dt.hour)['tip_amount'].sum()
+            'tips_by_hour': df.groupby('hour')['tip_amount'].sum()
         }
 
     def get_daily_transaction_analysis(self, date):
         """Get comprehensive transaction analysis for a specific date"""
-        conn = sqlite3.connect(self.db_name)
+        start, end = day_range(date)
+        with self.connection() as conn:
+            return self.report_cache.get(conn, 'transaction_analysis', start, end,
+                                         lambda: self._transaction_analysis(conn, start, end))
+
+    def _transaction_analysis(self, conn, start: str, end: str) -> dict:
+        import pandas as pd
         query = """
             SELECT t.created_at, t.amount, t.payment_method, t.tip_amount,
                    o.table_number, u.name as server_name
             FROM transactions t
             JOIN orders o ON t.order_id = o.id
             JOIN users u ON t.user_id = u.id
-            WHERE DATE(t.created_at) = ?
+            WHERE t.created_at >= ? AND t.created_at < ?
         """
-        df = pd.read_sql_query(query, conn, params=(date,))
-        conn.close()
+        df = pd.read_sql_query(query, conn, params=(start, end),
+                               parse_dates=['created_at'])
         
         if df.empty:
             return {
@@ -716,7 +1137,7 @@ class Database:
                 'table_analysis': pd.DataFrame(),
                 'server_analysis': pd.DataFrame()
             }
-            
+        
         df['created_at'] = pd.to_datetime(df['created_at'])
         
         return {
@@ -735,59 +1156,62 @@ class Database:
 
     def get_daily_menu_analysis(self, date):
         """Get detailed menu item analysis for a specific date"""
-        conn = sqlite3.connect(self.db_name)
-        query = """
-            SELECT o.created_at, mi.name, mi.category, mi.price,
-                   oi.quantity, o.table_number
-            FROM order_items oi
-            JOIN menu_items mi ON oi.menu_item_id = mi.id
-            JOIN orders o ON oi.order_id = o.id
-            WHERE DATE(o.created_at) = ?
-        """
-        df = pd.read_sql_query(query, conn, params=(date,))
-        conn.close()
+        start, end = day_range(date)
+        with self.connection() as conn:
+            return self.report_cache.get(conn, 'menu_analysis', start, end,
+                                         lambda: self._menu_analysis(conn, start, end))
+
+    def _menu_analysis(self, conn, start: str, end: str) -> dict:
+        import pandas as pd
+        items = pd.read_sql_query("""
+            SELECT mi.name, s.quantity, s.revenue
+            FROM sales_items s
+            JOIN menu_items mi ON s.menu_item_id = mi.id
+            WHERE s.day >= ? AND s.day < ?
+        """, conn, params=(start, end))
+        categories = pd.read_sql_query("""
+            SELECT hour, category, quantity, revenue
+            FROM sales_categories
+            WHERE day >= ? AND day < ?
+        """, conn, params=(start, end))
         
-        if df.empty:
+        if items.empty:
             return {
                 'top_items': pd.DataFrame(),
                 'category_analysis': pd.DataFrame(),
                 'hourly_sales': pd.DataFrame()
             }
-            
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        df['revenue'] = df['price'] * df['quantity']
         
         return {
-            'top_items': df.groupby('name').agg({
+            'top_items': items.groupby('name').agg({
                 'quantity': 'sum',
                 'revenue': 'sum'
             }).sort_values('quantity', ascending=False).head(10),
-            
-            'category_analysis': df.groupby('category').agg({
+        
+            'category_analysis': categories.groupby('category').agg({
                 'quantity': 'sum',
                 'revenue': 'sum'
             }).sort_values('revenue', ascending=False),
-            
-            'hourly_sales': df.groupby(df['created_at'].dt.hour).agg({
+        
+            'hourly_sales': categories.groupby('hour').agg({
                 'quantity': 'sum',
                 'revenue': 'sum'
             })
         }
 
     def get_daily_tax_analysis(self, date):
-        """Get detailed tax analysis for a specific date"""
-        conn = sqlite3.connect(self.db_name)
-        query = """
-            SELECT t.created_at, t.amount, t.payment_method,
-                   mi.category, mi.price, oi.quantity
-            FROM transactions t
-            JOIN orders o ON t.order_id = o.id
-            JOIN order_items oi ON o.id = oi.order_id
-            JOIN menu_items mi ON oi.menu_item_id = mi.id
-            WHERE DATE(t.created_at) = ?
+        """Get detailed tax analysis for a specific date
+
+        Tax is computed per category when an order is paid (see ``rollups``).
         """
-        df = pd.read_sql_query(query, conn, params=(date,))
-        conn.close()
+        import pandas as pd
+        with self.connection() as conn:
+            query = """
+                SELECT hour, category, tax
+                FROM sales_categories
+                WHERE day >= ? AND day < ?
+            """
+            df = pd.read_sql_query(query, conn, params=day_range(date))
         
         if df.empty:
             return {
@@ -795,119 +1219,149 @@ class Database:
                 'tax_by_category': pd.Series(),
                 'tax_by_hour': pd.Series()
             }
-            
-        # Apply different tax rates based on category
-        df['tax_rate'] = np.where(df['category'].isin(['Drinks', 'Food']), 0.09, 0.21)
-        df['tax_amount'] = df['amount'] * df['tax_rate']
         
         return {
-            'total_tax': df['tax_amount'].sum(),
-            'tax_by_category': df.groupby('category')['tax_amount'].sum(),
-            'tax_by_hour': df.groupby(df['created_at'].dt.hour)['tax_amount'].sum()
+            'total_tax': df['tax'].sum(),
+            'tax_by_category': df.groupby('category')['tax'].sum(),
+            'tax_by_hour': df.groupby('hour')['tax'].sum()
         }
 
     def get_daily_average_order(self, date):
         """Get average order value for a specific date"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT COALESCE(AVG(amount), 0)
-            FROM transactions
-            WHERE DATE(created_at) = ?
-        """, (date,))
-        result = cursor.fetchone()[0] or 0.0
-        conn.close()
-        return result
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COALESCE(SUM(revenue) / NULLIF(SUM(transactions), 0), 0)
+                FROM sales_hourly
+                WHERE day >= ? AND day < ?
+            """, day_range(date))
+            result = cursor.fetchone()[0] or 0.0
+            return result
 
     def get_daily_average_guests(self, date):
         """Get average number of guests per table for a specific date"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT COALESCE(AVG(table_count), 0)
-            FROM (
-                SELECT table_number, COUNT(*) as table_count
-                FROM orders
-                WHERE DATE(created_at) = ?
-                GROUP BY table_number
-            )
-        """, (date,))
-        result = cursor.fetchone()[0] or 0.0
-        conn.close()
-        return result
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COALESCE(AVG(table_count), 0)
+                FROM (
+                    SELECT table_number, COUNT(*) as table_count
+                    FROM orders
+                    WHERE created_at >= ? AND created_at < ?
+                    GROUP BY table_number
+                )
+            """, day_range(date))
+            result = cursor.fetchone()[0] or 0.0
+            return result
 
     def get_daily_payment_method_total(self, date, method):
         """Get total amount for a specific payment method on a date"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT COALESCE(SUM(amount), 0)
-            FROM transactions
-            WHERE DATE(created_at) = ? AND payment_method = ?
-        """, (date, method))
-        result = cursor.fetchone()[0] or 0.0
-        conn.close()
-        return result
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COALESCE(SUM(revenue), 0)
+                FROM sales_hourly
+                WHERE day >= ? AND day < ? AND payment_method = ?
+            """, (*day_range(date), method))
+            result = cursor.fetchone()[0] or 0.0
+            return result
 
     def get_daily_tax_total(self, date):
         """Get total tax collected for a specific date"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT COALESCE(SUM(amount * 0.21), 0)
-            FROM transactions
-            WHERE DATE(created_at) = ?
-        """, (date,))
-        result = cursor.fetchone()[0] or 0.0
-        conn.close()
-        return result
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COALESCE(SUM(tax), 0)
+                FROM sales_categories
+                WHERE day >= ? AND day < ?
+            """, day_range(date))
+            result = cursor.fetchone()[0] or 0.0
+            return result
 
     def get_daily_tax_by_rate(self, date, rate):
         """Get tax collected for a specific rate on a date"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT COALESCE(SUM(amount * ?), 0)
-            FROM transactions
-            WHERE DATE(created_at) = ?
-        """, (rate/100, date))
-        result = cursor.fetchone()[0] or 0.0
-        conn.close()
-        return result
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COALESCE(SUM(revenue) * ?, 0)
+                FROM sales_hourly
+                WHERE day >= ? AND day < ?
+            """, (rate/100, *day_range(date)))
+            result = cursor.fetchone()[0] or 0.0
+            return result
 
     def get_daily_top_items(self, date, limit=5):
         """Get top selling items for a specific date"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT m.name, SUM(oi.quantity) as total_quantity, 
-                   SUM(oi.quantity * m.price) as total_revenue
-            FROM order_items oi
-            JOIN menu_items m ON oi.menu_item_id = m.id
-            JOIN orders o ON oi.order_id = o.id
-            WHERE DATE(o.created_at) = ?
-            GROUP BY m.id
-            ORDER BY total_quantity DESC
-            LIMIT ?
-        """, (date, limit))
-        result = cursor.fetchall()
-        conn.close()
-        return result
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT m.name, SUM(s.quantity) as total_quantity,
+                       SUM(s.revenue) as total_revenue
+                FROM sales_items s
+                JOIN menu_items m ON s.menu_item_id = m.id
+                WHERE s.day >= ? AND s.day < ?
+                GROUP BY m.id
+                ORDER BY total_quantity DESC
+                LIMIT ?
+            """, (*day_range(date), limit))
+            result = cursor.fetchall()
+            return result
 
     def get_daily_employee_sales(self, date):
         """Get sales statistics per employee for a specific date"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT u.name, COUNT(DISTINCT o.id) as order_count,
-                   COALESCE(SUM(t.amount), 0) as total_revenue
-            FROM users u
-            LEFT JOIN orders o ON u.id = o.user_id
-            LEFT JOIN transactions t ON o.id = t.order_id
-            WHERE DATE(o.created_at) = ?
-            GROUP BY u.id
-            ORDER BY total_revenue DESC
-        """, (date,))
-        result = cursor.fetchall()
-        conn.close()
-        return result 
\ No newline at end of file
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT u.name, SUM(s.orders) as order_count,
+                       SUM(s.revenue) as total_revenue
+                FROM sales_employees s
+                JOIN users u ON u.id = s.user_id
+                WHERE s.day >= ? AND s.day < ?
+                GROUP BY u.id
+                ORDER BY total_revenue DESC
+            """, day_range(date))
+            result = cursor.fetchall()
+            return result
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+def get_database(db_name: str = "pos_system.db") -> Database:
+    """Return the process-wide Database handle for a file, creating it once"""
+    key = os.path.abspath(db_name)
+    with _databases_lock:
+        db = _databases.get(key)
+        if db is None:
+            db = Database(db_name)
+            _databases[key] = db
+        return db
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Initialise or maintain the POS database")
+    parser.add_argument('--db', default="pos_system.db", help="database file")
+    parser.add_argument('--rebuild-rollups', action='store_true',
+                        help="recompute the sales rollups from order history")
+    parser.add_argument('--from', dest='start_date', help="first day to rebuild (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end_date', help="last day to rebuild (YYYY-MM-DD)")
+    parser.add_argument('--export-floor-plan', metavar='CSV', help="write the floor plan to a CSV file")
+    parser.add_argument('--import-floor-plan', metavar='CSV',
+                        help="replace the floor plan with the tables in a CSV file")
+    args = parser.parse_args()
+
+    db = get_database(args.db)
+    if args.rebuild_rollups:
+        if not db.rebuild_rollups(args.start_date, args.end_date):
+            raise SystemExit(1)
+        print("Sales rollups rebuilt")
+    if args.import_floor_plan:
+        if not db.import_floor_plan(args.import_floor_plan):
+            raise SystemExit(1)
+        print(f"Floor plan imported: {len(db.get_floor_plan())} tables")
+    if args.export_floor_plan:
+        db.export_floor_plan(args.export_floor_plan)
+        print(f"Floor plan written to {args.export_floor_plan}")
+    db.close()
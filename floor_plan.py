@@ -0,0 +1,240 @@
+"""Floor plan of the restaurant, drawn in a ``QGraphicsScene``.
+
+The tables come from the ``floor_tables`` table (see
+``Database.get_floor_plan``), grouped into areas such as a terrace, the bar
+or a floor of the building. Each table is one ``TableItem``:
+
+* Pens, brushes and fonts are created once and shared by all items. Before,
+  every table created them on every paint.
+* Each item is rendered into a pixmap cache. Panning, zooming and repainting
+  a neighbour reuse that pixmap, and only a table whose shown state changed
+  is painted again.
+* The scene's BSP index finds the items in the area being repainted, so
+  the repaint cost does not grow with the number of tables on the plan.
+
+``FloorPlanView`` scrolls by dragging and zooms with the mouse wheel or
+``zoom_in``/``zoom_out``. ``show_area`` fits one area into the view.
+"""
+import time
+
+from PyQt5.QtCore import QRectF, Qt, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor, QFont, QPainter, QPen
+from PyQt5.QtWidgets import QGraphicsItem, QGraphicsRectItem, QGraphicsScene, QGraphicsView
+
+STATUS_COLORS = {
+    "empty": "#4CAF50",     # Green
+    "occupied": "#f44336",  # Red
+    "reserved": "#FFC107",  # Yellow
+}
+BACKGROUND = "#1e1e1e"
+AREA_MARGIN = 40
+MIN_ZOOM = 0.2
+MAX_ZOOM = 4.0
+
+_styles = {}
+
+
+def _style():
+    """Pens, brushes and fonts shared by every table, created on first paint"""
+    if not _styles:
+        _styles.update(
+            table_pen=QPen(QColor("#3d3d3d"), 2),
+            table_brush=QBrush(QColor("#2d2d2d")),
+            status_brushes={status: QBrush(QColor(color)) for status, color in STATUS_COLORS.items()},
+            title_font=QFont("Arial", 16, QFont.Bold),
+            small_title_font=QFont("Arial", 11, QFont.Bold),
+            detail_font=QFont("Arial", 9),
+            title_color=QColor("#ffffff"),
+            detail_color=QColor("#dcddde"),
+            muted_color=QColor("#888888"),
+        )
+    return _styles
+
+
+class TableItem(QGraphicsItem):
+    """One table, repainted only when what it shows changes"""
+
+    def __init__(self, table_number, area, x, y, width, height, seats, shape):
+        super().__init__()
+        self.table_number = table_number
+        self.area = area
+        self.seats = seats
+        self.round = shape == 'round'
+        self.outline = QRectF(0, 0, width, height)
+        self.setPos(x, y)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setAcceptedMouseButtons(Qt.LeftButton)
+        self.status = "empty"  # empty, occupied, reserved
+        self.items = 0
+        self.total = 0.0
+        self.opened_at = None  # time.time() when the open order was created
+        self.shown = None  # what was last painted, to skip unchanged repaints
+
+    def set_state(self, state):
+        """Show the table's open order from ``Database.get_floor_state``, or None"""
+        if state is None:
+            self.status, self.items, self.total, self.opened_at = "empty", 0, 0.0, None
+        else:
+            _, _, self.items, self.total, elapsed = state
+            self.status = "occupied"
+            self.opened_at = time.time() - elapsed
+        self.refresh()
+
+    def minutes_open(self):
+        if self.opened_at is None:
+            return None
+        return max(0, int((time.time() - self.opened_at) // 60))
+
+    def refresh(self):
+        """Repaint if anything shown changed, including the minutes open"""
+        shown = (self.status, self.items, round(self.total, 2), self.minutes_open())
+        if shown != self.shown:
+            self.shown = shown
+            self.update()
+
+    def boundingRect(self):
+        return self.outline.adjusted(-1, -1, 1, 1)  # half the outline pen
+
+    def paint(self, painter, option, widget=None):
+        style = _style()
+        rect = self.outline
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Draw table
+        painter.setPen(style['table_pen'])
+        painter.setBrush(style['table_brush'])
+        if self.round:
+            painter.drawEllipse(rect)
+        else:
+            painter.drawRoundedRect(rect, 10, 10)
+
+        # Draw status indicator
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(style['status_brushes'][self.status])
+        painter.drawEllipse(QRectF(rect.width() * 0.15 - 5, rect.height() * 0.15 - 5, 10, 10))
+
+        # Table number, and below it the open order or the seats
+        large = rect.width() >= 90
+        painter.setPen(style['title_color'])
+        painter.setFont(style['title_font'] if large else style['small_title_font'])
+        painter.drawText(rect.adjusted(0, 0, 0, -rect.height() * 0.25), Qt.AlignCenter,
+                         f"Table {self.table_number}" if large else str(self.table_number))
+        painter.setFont(style['detail_font'])
+        lower = rect.adjusted(0, rect.height() * 0.5, 0, 0)
+        if self.opened_at is not None:
+            painter.setPen(style['detail_color'])
+            painter.drawText(lower, Qt.AlignHCenter | Qt.AlignTop, f"€{self.total:.2f}")
+            painter.setPen(style['muted_color'])
+            painter.drawText(lower.adjusted(0, 16, 0, 0), Qt.AlignHCenter | Qt.AlignTop,
+                             f"{self.items} items · {self.minutes_open()} min")
+        else:
+            painter.setPen(style['muted_color'])
+            painter.drawText(lower, Qt.AlignHCenter | Qt.AlignTop, f"{self.seats} seats")
+
+    def mousePressEvent(self, event):
+        event.accept()  # so the release comes here instead of starting a drag
+
+    def mouseReleaseEvent(self, event):
+        if self.outline.contains(event.pos()):
+            self.scene().table_clicked.emit(self.table_number)
+
+
+class FloorPlanScene(QGraphicsScene):
+    """All tables of the floor plan, with a labelled outline per area"""
+    table_clicked = pyqtSignal(int)  # table number
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.plan = None
+        self.tables = {}  # table number -> TableItem
+        self.areas = {}   # area name -> its rectangle in scene coordinates
+
+    def set_plan(self, plan) -> bool:
+        """Build the items for ``Database.get_floor_plan`` rows
+
+        Returns False, keeping the existing items and their state, when the
+        plan did not change.
+        """
+        plan = [tuple(row) for row in plan]
+        if plan == self.plan:
+            return False
+        self.plan = plan
+        self.clear()
+        self.tables = {}
+        self.areas = {}
+        for row in plan:
+            item = TableItem(*row)
+            self.addItem(item)
+            self.tables[item.table_number] = item
+            rect = item.sceneBoundingRect()
+            self.areas[item.area] = self.areas[item.area].united(rect) if item.area in self.areas else rect
+
+        pen = QPen(QColor("#3d3d3d"), 1, Qt.DashLine)
+        for name, rect in self.areas.items():
+            rect = rect.adjusted(-AREA_MARGIN / 2, -AREA_MARGIN, AREA_MARGIN / 2, AREA_MARGIN / 2)
+            self.areas[name] = rect
+            outline = QGraphicsRectItem(rect)
+            outline.setPen(pen)
+            outline.setZValue(-1)
+            label = self.addSimpleText(name, QFont("Arial", 12))
+            label.setBrush(QColor("#888888"))
+            label.setPos(rect.left() + 8, rect.top() + 8)
+            label.setZValue(-1)
+            self.addItem(outline)
+        self.setSceneRect(self.itemsBoundingRect().adjusted(-AREA_MARGIN, -AREA_MARGIN, AREA_MARGIN, AREA_MARGIN))
+        return True
+
+
+class FloorPlanView(QGraphicsView):
+    """Scrolls by dragging and zooms around the mouse with the wheel"""
+
+    def __init__(self, scene, parent=None):
+        super().__init__(scene, parent)
+        self.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        # Repaint only the rectangles of changed items
+        self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
+        self.setBackgroundBrush(QColor(BACKGROUND))
+        self.setCacheMode(QGraphicsView.CacheBackground)
+        self.setFrameShape(QGraphicsView.NoFrame)
+        self.fitted = None  # (area,) kept in view on resizes until the user zooms
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.fitted is not None:
+            self.show_area(*self.fitted)
+
+    def zoom(self) -> float:
+        return self.transform().m11()
+
+    def zoom_by(self, factor: float):
+        factor = max(MIN_ZOOM, min(MAX_ZOOM, self.zoom() * factor)) / self.zoom()
+        self.scale(factor, factor)
+
+    def zoom_in(self):
+        self.fitted = None
+        self.zoom_by(1.25)
+
+    def zoom_out(self):
+        self.fitted = None
+        self.zoom_by(0.8)
+
+    def wheelEvent(self, event):
+        self.fitted = None
+        self.zoom_by(1.0015 ** event.angleDelta().y())
+
+    def show_area(self, name=None):
+        """Fit one area, or the whole plan when ``name`` is None, into the view"""
+        rect = self.scene().areas.get(name) if name else self.scene().sceneRect()
+        if rect is None:
+            return
+        self.fitted = (name,)
+        self.fitInView(rect, Qt.KeepAspectRatio)
+        if self.zoom() > 1.0:
+            # Never blow small plans up beyond their real size
+            self.resetTransform()
+            self.centerOn(rect.center())
+        elif self.zoom() < MIN_ZOOM:
+            self.zoom_by(1.0)
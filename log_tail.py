@@ -0,0 +1,198 @@
+"""Follow a log file the way ``tail -f`` does.
+
+``LogTail`` remembers how far it has read a log file, and each ``poll`` reads
+only what was appended since. The most recent lines are kept in a bounded
+ring buffer. When ``logger`` rotates the file (moving it to
+``<name>.1.gz``), the tail first reads the lines it had not seen yet from the
+rotated segment and then starts over on the new file. When the file is
+truncated, the tail starts over from its beginning.
+
+Older history is paged in from disk on demand with ``read_before``, and
+continues into the rotated segments. Positions are ``(generation, offset)``
+pairs: ``generation`` counts the rotations seen, so a position stays valid
+when the file it points into is rotated.
+"""
+import gzip
+import io
+import os
+from collections import deque
+
+BLOCK_SIZE = 64 * 1024
+HEAD_SIZE = 256
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode('utf-8', errors='replace').rstrip('\r')
+
+
+def _lines_before(f, end: int, count: int):
+    """Read up to ``count`` complete lines of ``f`` that end before byte ``end``
+
+    ``end`` must be at the start of a line. Returns the raw lines, oldest
+    first, and the offset at which the first of them starts.
+    """
+    start, chunk = end, b''
+    while start > 0 and chunk.count(b'\n') <= count:
+        step = min(BLOCK_SIZE, start)
+        start -= step
+        f.seek(start)
+        chunk = f.read(step) + chunk
+    lines = chunk.split(b'\n')[:-1]
+    if start > 0:
+        lines = lines[1:]  # the first one started before the chunk
+    lines = lines[-count:] if count else []
+    return lines, end - sum(len(line) + 1 for line in lines)
+
+
+def _last_line_end(f, size: int) -> int:
+    """Offset just past the last newline before ``size``, or 0"""
+    position = size
+    while position > 0:
+        step = min(BLOCK_SIZE, position)
+        f.seek(position - step)
+        newline = f.read(step).rfind(b'\n')
+        if newline >= 0:
+            return position - step + newline + 1
+        position -= step
+    return 0
+
+
+class LogTail:
+    """The latest lines of one log file, read incrementally"""
+
+    def __init__(self, path: str, maxlen: int = 2000):
+        self.path = path
+        self.lines = deque(maxlen=maxlen)  # (generation, offset, text)
+        self.generation = 0  # rotations seen since the tail was opened
+        self._offset = None  # bytes of the current file read; None until the first poll
+        self._inode = None
+        self._partial = b''  # start of a line whose newline is not written yet
+        self._head = None  # first bytes of the file, to recognise it after rotation
+        self._segment = None  # (path, mtime, data) of the last rotated segment read
+
+    @property
+    def start(self):
+        """Position of the oldest buffered line, for paging further back"""
+        if self.lines:
+            generation, offset, _ = self.lines[0]
+            return generation, offset
+        return self.generation, (self._offset or 0) - len(self._partial)
+
+    def poll(self):
+        """Read what was appended since the last poll
+
+        Returns the new lines and whether the buffer was rebuilt rather than
+        appended to: on the first poll, after a truncation, or when more new
+        lines arrived than the buffer holds. In that case the whole buffer
+        is returned.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return [], False
+        if self._offset is None:
+            self._open_at_end(stat)
+            return [text for _, _, text in self.lines], True
+
+        reset = False
+        new = []
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            rotated = self._read_rotated()
+            if rotated is not None:
+                # The file we were reading is now segment 1
+                self.generation += 1
+                new = rotated
+            else:
+                # Truncated or replaced: there is nothing more to read from it
+                self.lines.clear()
+                reset = True
+            self._inode, self._offset, self._partial, self._head = stat.st_ino, 0, b'', None
+        if stat.st_size > self._offset:
+            with open(self.path, 'rb') as f:
+                if self._head is None or len(self._head) < HEAD_SIZE:
+                    self._head = f.read(HEAD_SIZE)
+                f.seek(self._offset)
+                new += self._consume(f.read(), self.generation)
+
+        if len(new) >= self.lines.maxlen:
+            reset = True
+        self.lines.extend(new)
+        if reset:
+            return [text for _, _, text in self.lines], True
+        return [text for _, _, text in new], False
+
+    def read_before(self, position, count: int):
+        """Read up to ``count`` lines before ``position``, oldest first
+
+        Continues into the rotated segments. Returns the lines and the
+        position of the first of them, to page further back from.
+        """
+        generation, offset = position
+        lines = []
+        while len(lines) < count and generation <= self.generation:
+            segment = self.generation - generation
+            if segment == 0:
+                with open(self.path, 'rb') as f:
+                    found, offset = _lines_before(f, offset, count - len(lines))
+            else:
+                data = self._segment_data(segment)
+                if data is None:
+                    break
+                if offset is None:
+                    offset = len(data)
+                found, offset = _lines_before(io.BytesIO(data), offset, count - len(lines))
+            lines = [_decode(line) for line in found] + lines
+            if len(lines) < count:
+                generation, offset = generation - 1, None
+        return lines, (generation, offset)
+
+    def _open_at_end(self, stat):
+        """Fill the buffer with the last lines of the file"""
+        with open(self.path, 'rb') as f:
+            self._head = f.read(HEAD_SIZE)
+            end = _last_line_end(f, stat.st_size)
+            lines, offset = _lines_before(f, end, self.lines.maxlen)
+        for raw in lines:
+            self.lines.append((self.generation, offset, _decode(raw)))
+            offset += len(raw) + 1
+        self._inode = stat.st_ino
+        self._offset = end
+        self._partial = b''
+
+    def _read_rotated(self):
+        """Lines of our file written after the last poll, if it was rotated
+
+        Returns None when segment 1 is not the file we were reading, i.e.
+        the file was truncated or replaced rather than rotated.
+        """
+        data = self._segment_data(1)
+        if data is None or not self._head or not data.startswith(self._head) or len(data) < self._offset:
+            return None
+        lines = self._consume(data[self._offset:], self.generation)
+        if self._partial:
+            # Rotation closes the file, so a partial line is all there will be
+            lines.append((self.generation, self._offset - len(self._partial), _decode(self._partial)))
+        return lines
+
+    def _consume(self, data: bytes, generation: int):
+        """Split newly read bytes into complete lines, keeping the rest for later"""
+        line_start = self._offset - len(self._partial)
+        self._offset += len(data)
+        *complete, self._partial = (self._partial + data).split(b'\n')
+        lines = []
+        for raw in complete:
+            lines.append((generation, line_start, _decode(raw)))
+            line_start += len(raw) + 1
+        return lines
+
+    def _segment_data(self, segment: int):
+        """Decompressed contents of rotated segment ``segment``, or None"""
+        path = f"{self.path}.{segment}.gz"
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if self._segment is None or self._segment[:2] != (path, mtime):
+                with gzip.open(path, 'rb') as f:
+                    self._segment = (path, mtime, f.read())
+        except (OSError, EOFError):
+            return None
+        return self._segment[2]
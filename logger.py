@@ -1,10 +1,64 @@
+import atexit
+import gzip
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
 from datetime import datetime
 import json
 import traceback
 import sys
 
+LOG_DIR = "logs"
+
+# Per channel: size at which its log file is rotated, and how many rotated
+# (gzipped) segments are kept. Audit and security history is kept longest.
+LOG_ROTATION = {
+    'system': (5 * 1024 * 1024, 5),
+    'audit': (5 * 1024 * 1024, 20),
+    'security': (5 * 1024 * 1024, 20),
+    'error': (5 * 1024 * 1024, 10),
+    'performance': (5 * 1024 * 1024, 5),
+    'slow_queries': (5 * 1024 * 1024, 5),
+}
+
+
+def _gzip_name(name):
+    return name + '.gz'
+
+
+def _gzip_rotate(source, dest):
+    """Compress a full log file into its rotated segment"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records as they are; the listener thread formats them
+
+    The stock handler formats and copies every record in the caller. Records
+    here carry no arguments or exception objects (``log_error`` passes the
+    stack trace as text), so they can be handed over unchanged.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _ChannelHandler(logging.Handler):
+    """Hands each record from the queue to the file handler of its channel"""
+
+    def __init__(self, handlers):
+        super().__init__()
+        self.handlers = handlers
+
+    def handle(self, record):
+        self.handlers[record.name].handle(record)
+        return True
+
+
 class POSLogger:
     _instance = None
 
@@ -16,7 +70,7 @@ class POSLogger:
 
     def _initialize_logger(self):
         # Create logs directory if it doesn't exist
-        os.makedirs("logs", exist_ok=True)
+        os.makedirs(LOG_DIR, exist_ok=True)
 
         # Create formatters
         system_formatter = logging.Formatter(
@@ -34,43 +88,54 @@ class POSLogger:
         performance_formatter = logging.Formatter(
             '%(asctime)s - %(levelname)s - Operation: %(operation)s - Duration: %(duration)s - Details: %(details)s'
         )
+        slow_query_formatter = logging.Formatter(
+            '%(asctime)s - %(levelname)s - Duration: %(duration)s - Rows: %(rows)s - Parameters: %(shape)s\n'
+            '%(statement)s\nQuery Plan:\n%(plan)s'
+        )
 
-        # Create handlers
-        system_handler = logging.FileHandler('logs/system.log')
-        system_handler.setFormatter(system_formatter)
-
-        audit_handler = logging.FileHandler('logs/audit.log')
-        audit_handler.setFormatter(audit_formatter)
-
-        security_handler = logging.FileHandler('logs/security.log')
-        security_handler.setFormatter(security_formatter)
-
-        error_handler = logging.FileHandler('logs/error.log')
-        error_handler.setFormatter(error_formatter)
-
-        performance_handler = logging.FileHandler('logs/performance.log')
-        performance_handler.setFormatter(performance_formatter)
-
-        # Create loggers
-        self.system_logger = logging.getLogger('system')
-        self.system_logger.setLevel(logging.INFO)
-        self.system_logger.addHandler(system_handler)
+        formatters = {
+            'system': system_formatter,
+            'audit': audit_formatter,
+            'security': security_formatter,
+            'error': error_formatter,
+            'performance': performance_formatter,
+            'slow_queries': slow_query_formatter,
+        }
 
-        self.audit_logger = logging.getLogger('audit')
-        self.audit_logger.setLevel(logging.INFO)
-        self.audit_logger.addHandler(audit_handler)
+        # Callers only put records on a queue; one listener thread formats them
+        # and does the file I/O, so a log call never waits for the disk
+        self.file_handlers = {}
+        self._queue = queue.Queue()
+        for channel, formatter in formatters.items():
+            max_bytes, backups = LOG_ROTATION[channel]
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(LOG_DIR, f'{channel}.log'), maxBytes=max_bytes, backupCount=backups, delay=True
+            )
+            handler.namer = _gzip_name
+            handler.rotator = _gzip_rotate
+            handler.setFormatter(formatter)
+            self.file_handlers[channel] = handler
+            channel_logger = logging.getLogger(channel)
+            channel_logger.setLevel(logging.ERROR if channel == 'error' else logging.INFO)
+            channel_logger.addHandler(_QueueHandler(self._queue))
+            setattr(self, f'{channel}_logger', channel_logger)
 
-        self.security_logger = logging.getLogger('security')
-        self.security_logger.setLevel(logging.INFO)
-        self.security_logger.addHandler(security_handler)
+        self._listener = logging.handlers.QueueListener(self._queue, _ChannelHandler(self.file_handlers))
+        self._listener.start()
+        atexit.register(self.close)
 
-        self.error_logger = logging.getLogger('error')
-        self.error_logger.setLevel(logging.ERROR)
-        self.error_logger.addHandler(error_handler)
+    def flush(self):
+        """Block until every queued record has been written"""
+        if self._listener is not None:
+            self._queue.join()
 
-        self.performance_logger = logging.getLogger('performance')
-        self.performance_logger.setLevel(logging.INFO)
-        self.performance_logger.addHandler(performance_handler)
+    def close(self):
+        """Write the queued records and stop the listener thread"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            for handler in self.file_handlers.values():
+                handler.close()
 
     def log_info(self, message: str):
         """Log general system information"""
@@ -149,6 +214,19 @@ class POSLogger:
             }
         )
 
+    def log_slow_query(self, statement: str, duration: float, rows: int, shape: str, plan: str = ""):
+        """Log an SQL statement that ran over the profiler's threshold"""
+        self.slow_queries_logger.warning(
+            "",
+            extra={
+                'statement': statement,
+                'duration': f"{duration * 1000:.1f}ms",
+                'rows': rows,
+                'shape': shape,
+                'plan': plan or "    (not explained)"
+            }
+        )
+
     def log_database_operation(self, operation: str, table: str, details: str = ""):
         """Log database operations"""
         self.system_logger.info(
@@ -7,10 +7,10 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                             QFrame)
 from PyQt5.QtCore import Qt, QSize, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon, QPixmap
-from database import Database
+from database import get_database
 from tablemanager import RestaurantView
-from admin_dashboard import AdminDashboard
 from logger import pos_logger
+from report_worker import JobQueue
 import re
 
 class PinDialog(QDialog):
@@ -108,14 +108,37 @@ class UserBox(QFrame):
 
 class LoginScreen(QMainWindow):
     login_successful = pyqtSignal(tuple)  # Signal to emit user data on successful login
+    _shared = None
     
     def __init__(self):
         super().__init__()
-        self.db = Database()
+        self.db = get_database()
         self.current_user = None
+        self.users = None  # users the boxes were built for
+        # PIN hashing takes 100 ms or more, so it runs off the GUI thread;
+        # queued, so a login never replaces a pending add_user or vice versa
+        self.pin_runner = JobQueue(self)
+        self.pin_runner.ready.connect(self.pin_job_finished)
+        self.pin_runner.failed.connect(self.pin_job_failed)
+        self.pin_runner.busy_changed.connect(self.set_busy)
         self.setup_ui()
         self.showMaximized()  # Show maximized by default
         
+    @classmethod
+    def shared(cls):
+        """Show the terminal's login screen, built on first use
+
+        On later logouts the screen is shown again as it was; the user
+        boxes are only rebuilt when users were added or removed.
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        else:
+            cls._shared.current_user = None
+            cls._shared.add_user_boxes()
+            cls._shared.showMaximized()
+        return cls._shared
+
     def setup_ui(self):
         self.setWindowTitle("POS System - Login")
         self.setMinimumSize(800, 600)
@@ -162,9 +185,16 @@ class LoginScreen(QMainWindow):
         self.user_grid.setAlignment(Qt.AlignCenter)
         
         # Add user boxes
+        self.users = None
         self.add_user_boxes()
         
         layout.addLayout(self.user_grid)
+
+        # Shown while a PIN is being checked
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet("color: #888888;")
+        layout.addWidget(self.status_label)
         
         # Admin controls
         admin_controls = QHBoxLayout()
@@ -176,6 +206,11 @@ class LoginScreen(QMainWindow):
         layout.addLayout(admin_controls)
         
     def add_user_boxes(self):
+        users = [user[:3] for user in self.db.get_all_users()]
+        if users == self.users:
+            return
+        self.users = users
+
         # Clear existing boxes
         while self.user_grid.count():
             item = self.user_grid.takeAt(0)
@@ -183,13 +218,24 @@ class LoginScreen(QMainWindow):
                 item.widget().deleteLater()
         
         # Add new boxes
-        users = self.db.get_all_users()
         for i, user in enumerate(users):
             box = UserBox(user, self)
             box.mousePressEvent = lambda e, u=user: self.user_selected(u)
             self.user_grid.addWidget(box, i // 4, i % 4)
             
+    def set_busy(self, busy):
+        """Block further logins while a PIN is being checked"""
+        for i in range(self.user_grid.count()):
+            widget = self.user_grid.itemAt(i).widget()
+            if widget:
+                widget.setEnabled(not busy)
+        self.add_user_btn.setEnabled(not busy)
+        if not busy:
+            self.status_label.setText("")
+
     def user_selected(self, user_data):
+        if self.pin_runner.busy:
+            return
         dialog = PinDialog(self)
         if dialog.exec_() == QDialog.Accepted:
             pin = dialog.get_pin()
@@ -198,25 +244,48 @@ class LoginScreen(QMainWindow):
                 pos_logger.log_failed_login(user_data[1], "127.0.0.1")  # Log failed attempt
                 return
                 
-            user = self.db.verify_user(user_data[1], pin)
-            if user:
-                pos_logger.log_audit(user[1], "login", "Successful login")
-                self.current_user = user
-                if user[2] == "admin":
-                    self.show_user_management()
-                else:
-                    self.show_restaurant_view()
+            self.check_pin(user_data, pin)
+
+    def check_pin(self, user_data, pin):
+        """Verify the PIN in the background; login_checked gets the outcome"""
+        self.status_label.setText(f"Checking PIN for {user_data[1]}...")
+        self.pin_runner.submit(('login', user_data), self.db.verify_user, user_data[1], pin)
+
+    def pin_job_finished(self, key, result):
+        if key[0] == 'login':
+            self.login_checked(key[1], result)
+        else:
+            self.user_added(*key[1:], result)
+
+    def pin_job_failed(self, key, message):
+        if key[0] == 'login':
+            pos_logger.log_error(f"PIN check failed: {message}")
+            QMessageBox.warning(self, "Error", "Could not check the PIN, please try again")
+        else:
+            pos_logger.log_error(f"Adding user {key[1]} failed: {message}")
+            QMessageBox.warning(self, "Error", f"Failed to add user {key[1]}, please try again")
+
+    def login_checked(self, user_data, user):
+        if user:
+            pos_logger.log_audit(user[1], "login", "Successful login")
+            self.current_user = user
+            if user[2] == "admin":
+                self.show_user_management()
             else:
-                QMessageBox.warning(self, "Error", "Invalid PIN")
-                pos_logger.log_failed_login(user_data[1], "127.0.0.1")  # Log failed attempt
+                self.show_restaurant_view()
+        else:
+            QMessageBox.warning(self, "Error", "Invalid PIN")
+            pos_logger.log_failed_login(user_data[1], "127.0.0.1")  # Log failed attempt
                 
     def show_user_management(self):
+        from admin_dashboard import AdminDashboard
         self.admin_dashboard = AdminDashboard(self.current_user)
         self.admin_dashboard.show()
         self.close()
         
     def show_restaurant_view(self):
-        self.restaurant_view = RestaurantView(self.current_user)
+        # The floor is kept between logins; only the acting user changes
+        self.restaurant_view = RestaurantView.for_user(self.current_user)
         self.restaurant_view.show()
         self.close()
         
@@ -288,13 +357,17 @@ class LoginScreen(QMainWindow):
                 QMessageBox.warning(self, "Error", "Username can only contain letters, numbers, and underscores")
                 return
             
-            # Add user to database
-            if self.db.add_user(username, role, pin):
-                QMessageBox.information(self, "Success", "User added successfully")
-                pos_logger.log_audit(current_user[1], "add_user", f"Added new user: {username}")
-                self.setup_ui()  # Refresh the UI
-            else:
-                QMessageBox.warning(self, "Error", "Failed to add user. Username might already exist.")
+            # Add user to database; hashing the PIN runs off the GUI thread
+            self.status_label.setText(f"Adding {username}...")
+            self.pin_runner.submit(('add_user', username, current_user), self.db.add_user, username, role, pin)
+
+    def user_added(self, username, current_user, added):
+        if added:
+            QMessageBox.information(self, "Success", "User added successfully")
+            pos_logger.log_audit(current_user[1], "add_user", f"Added new user: {username}")
+            self.setup_ui()  # Refresh the UI
+        else:
+            QMessageBox.warning(self, "Error", "Failed to add user. Username might already exist.")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -1,8 +1,11 @@
 from PyQt5.QtWidgets import QApplication
 from login import LoginScreen
 from tablemanager import RestaurantView
-from admin_dashboard import AdminDashboard
-from logger import pos_logger
+from database import get_database
+from order_buffer import flush_all
+from logger import LOG_DIR, pos_logger
+from metrics import registry
+import os
 import sys
 
 class POSSystem:
@@ -13,7 +16,7 @@ class POSSystem:
         
     def show_login(self):
         """Show the login screen"""
-        self.login_screen = LoginScreen()
+        self.login_screen = LoginScreen.shared()
         self.login_screen.login_successful.connect(self.handle_login)
         self.login_screen.show()
         
@@ -27,13 +30,15 @@ class POSSystem:
         )
         
         if role == 'admin':
-            # Show admin dashboard for admin users
+            # Show admin dashboard for admin users; imported here because it
+            # pulls in pandas, matplotlib and ReportLab, which staff never need
+            from admin_dashboard import AdminDashboard
             self.admin_dashboard = AdminDashboard(user_data)
             self.admin_dashboard.show()
             pos_logger.log_info(f"Admin dashboard opened for user: {user_name}")
         else:
             # Show restaurant view for staff users
-            self.restaurant_view = RestaurantView(user_data)
+            self.restaurant_view = RestaurantView.for_user(user_data)
             self.restaurant_view.show()
             pos_logger.log_info(f"Restaurant view opened for user: {user_name}")
         
@@ -42,8 +47,23 @@ class POSSystem:
     
     def run(self):
         pos_logger.log_info("POS System started")
+        self.app.aboutToQuit.connect(self.shutdown)
         return self.app.exec_()
 
+    def shutdown(self):
+        """Write buffered order taps, checkpoint the WAL, close connections and save metrics on exit"""
+        flush_all()
+        get_database().close()
+        try:
+            # This terminal's latencies and counters, for after the shift
+            registry.write_openmetrics(os.path.join(LOG_DIR, "metrics.prom"))
+            profiler = get_database().connections.profiler
+            if profiler is not None:
+                profiler.write_summary(os.path.join(LOG_DIR, "sql_profile.txt"))
+        except OSError as e:
+            pos_logger.log_error(f"Failed to write metrics: {str(e)}")
+        pos_logger.log_info("POS System stopped")
+
 if __name__ == '__main__':
     try:
         pos = POSSystem()
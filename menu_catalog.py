@@ -0,0 +1,68 @@
+"""Process-wide, in-memory cache of the menu.
+
+The menu changes rarely, but the order screens read it on every table tap.
+``MenuCatalog`` keeps the ``menu_items`` rows in memory, indexed by id and by
+category. Triggers on ``menu_items`` bump a counter in the ``menu_version``
+table (migration 4), so a catalog notices edits made by any connection or
+terminal with a single primary-key lookup and reloads only then.
+"""
+import os
+import threading
+
+
+class MenuCatalog:
+    """The menu of one database file, reloaded when its version changes"""
+    _catalogs = {}
+    _catalogs_lock = threading.Lock()
+
+    def __init__(self):
+        self.version = None
+        self.items = {}        # id -> (id, name, category, price, description)
+        self.categories = {}   # category -> [items], in menu order
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_database(cls, db_name: str) -> "MenuCatalog":
+        """Return the process-wide catalog for a database file"""
+        key = os.path.abspath(db_name)
+        with cls._catalogs_lock:
+            catalog = cls._catalogs.get(key)
+            if catalog is None:
+                catalog = cls()
+                cls._catalogs[key] = catalog
+            return catalog
+
+    def refresh(self, conn) -> "MenuCatalog":
+        """Reload the menu if it changed since the last load, then return self"""
+        version = conn.execute("SELECT version FROM menu_version WHERE id = 1").fetchone()[0]
+        if version == self.version:
+            return self
+        with self._lock:
+            if version != self.version:
+                rows = conn.execute(
+                    "SELECT id, name, category, price, description FROM menu_items ORDER BY id"
+                ).fetchall()
+                categories = {}
+                for row in rows:
+                    categories.setdefault(row[2], []).append(row)
+                self.items = {row[0]: row for row in rows}
+                self.categories = categories
+                self.version = version
+        return self
+
+    def invalidate(self):
+        """Force a reload on the next refresh"""
+        self.version = None
+
+    def price(self, menu_item_id: int) -> float:
+        """Return the current price of a menu item"""
+        return self.items[menu_item_id][3]
+
+    def total(self, lines) -> float:
+        """Return the total of ``(menu_item_id, quantity)`` order lines
+
+        Lines for items not on the menu are ignored, as they are in
+        ``Database.get_order_items``.
+        """
+        items = self.items
+        return sum(items[item_id][3] * quantity for item_id, quantity in lines if item_id in items)
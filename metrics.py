@@ -0,0 +1,279 @@
+"""In-process metrics: counters, gauges and latency histograms.
+
+``registry`` is the process-wide registry. Metrics are created on first use
+and identified by name; a metric's samples are further split by labels::
+
+    registry.counter('pos_payments', "Payments recorded").inc(method='cash')
+
+    @timed('pos_ui_handler_seconds', handler='add_to_order')
+    def add_to_order(self, item, quantity): ...
+
+    with timed('pos_ui_handler_seconds', handler='confirm_order'):
+        ...
+
+Histograms count observations in fixed buckets (``LATENCY_BUCKETS``, in
+seconds). Percentiles are interpolated within the bucket they fall in, so
+they are as precise as the buckets are narrow. ``openmetrics()`` renders
+everything in the OpenMetrics text format for other tools to scrape or
+archive.
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Timed calls at least this slow are also written to the performance log
+SLOW_CALL_SECONDS = 0.5
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """A count that only goes up, e.g. payments recorded"""
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str = ''):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """(labels, value) of every label set"""
+        with self._lock:
+            return list(self._values.items())
+
+    def _openmetrics(self):
+        return [f"{self.name}_total{_format_labels(key)} {value}" for key, value in self.samples()]
+
+
+class Gauge:
+    """A value that goes up and down, or is read from a function when collected"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str = ''):
+        self.name = name
+        self.help = help
+        self._values = {}  # label key -> value or function returning it
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, func, **labels):
+        """Report ``func()`` as the value, evaluated each time metrics are read"""
+        with self._lock:
+            self._values[_label_key(labels)] = func
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [(key, value() if callable(value) else value) for key, value in values]
+
+    def _openmetrics(self):
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self.samples()]
+
+
+class Histogram:
+    """Observations counted in buckets, with their sum, per label set"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str = '', buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series = {}  # label key -> [bucket counts (+Inf last), count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        self._observe(_label_key(labels), value)
+
+    def _observe(self, key, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def samples(self):
+        """(labels, bucket counts, count, sum) of every label set"""
+        with self._lock:
+            return [(key, list(counts), count, total) for key, (counts, count, total) in self._series.items()]
+
+    def quantile(self, q: float, counts) -> float:
+        """Estimate the ``q`` quantile from one label set's bucket counts"""
+        rank = q * sum(counts)
+        if rank <= 0:
+            return 0.0
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]  # beyond the last bound; report that bound
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def _openmetrics(self):
+        lines = []
+        for key, counts, count, total in self.samples():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+        return lines
+
+
+class MetricsRegistry:
+    """All metrics of the process, by name"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str = '') -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str = '') -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str = '', buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets)
+
+    def metrics(self):
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+    def openmetrics(self) -> str:
+        """Every metric in the OpenMetrics text exposition format"""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.extend(metric._openmetrics())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, path: str):
+        """Write ``openmetrics()`` to a file, replacing it in one step"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w') as f:
+            f.write(self.openmetrics())
+        os.replace(temporary, path)
+
+    def _get(self, cls, name, help, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is a {metric.kind}, not a {cls.kind}")
+            return metric
+
+
+registry = MetricsRegistry()
+registry.histogram('pos_db_call_seconds', "Duration of Database method calls")
+registry.histogram('pos_ui_handler_seconds', "Time spent in UI handlers, not counting dialogs waiting for the user")
+
+
+class timed:
+    """Record the duration of a block or of every call to a function
+
+    Used as a context manager or as a decorator. Durations go into the
+    ``name`` histogram with ``labels``; calls that raise are also counted
+    in ``<name without _seconds>_errors``.
+
+    A decorated function takes ``*args``, so PyQt passes it every argument
+    of a signal. Connect it through a lambda when the signal carries
+    arguments the function does not take, e.g. ``clicked(bool)``.
+    """
+
+    def __init__(self, name: str, **labels):
+        self.name = name
+        self.labels = labels
+        self.histogram = registry.histogram(name)
+        self._key = _label_key(labels)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record(time.perf_counter() - self._start, exc_type is not None)
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                self.record(time.perf_counter() - start, True)
+                raise
+            self.record(time.perf_counter() - start, False)
+            return result
+        return wrapper
+
+    def record(self, elapsed: float, failed: bool):
+        self.histogram._observe(self._key, elapsed)
+        if failed:
+            registry.counter(self.name.replace('_seconds', '') + '_errors').inc(**self.labels)
+        if elapsed >= SLOW_CALL_SECONDS:
+            from logger import pos_logger
+            pos_logger.log_performance(" ".join([self.name, *map(str, self.labels.values())]), elapsed)
+
+
+def instrumented(name: str, label: str = 'method', exclude=()):
+    """Class decorator timing every public method into the ``name`` histogram
+
+    Each method is labelled with its name under ``label``.
+    """
+    def decorate(cls):
+        for attribute, value in list(vars(cls).items()):
+            if attribute.startswith('_') or attribute in exclude or not inspect.isfunction(value):
+                continue
+            setattr(cls, attribute, timed(name, **{label: attribute})(value))
+        return cls
+    return decorate
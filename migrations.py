@@ -0,0 +1,216 @@
+"""Versioned schema migrations for the POS database.
+
+``Database.init_db`` creates the base tables; everything added afterwards
+lives here as an ordered list of upgrade steps. Each step is a
+``(version, description, steps)`` tuple where ``steps`` is a list of SQL
+statements or callables taking a cursor. Applied versions are recorded in
+the ``schema_version`` table, so every step runs exactly once per database.
+"""
+import sqlite3
+
+import rollups
+
+MIGRATIONS = [
+    (1, "Index hot query paths", [
+        # get_active_order_for_table: equality on table/status, newest first
+        """CREATE INDEX IF NOT EXISTS idx_orders_table_status_created
+           ON orders (table_number, status, created_at)""",
+        # get_order_items and the report joins: covers the whole line
+        """CREATE INDEX IF NOT EXISTS idx_order_items_order
+           ON order_items (order_id, menu_item_id, quantity)""",
+        # Daily report range scans; covers the daily summary passes
+        """CREATE INDEX IF NOT EXISTS idx_transactions_created_covering
+           ON transactions (created_at, order_id, payment_method, amount, tip_amount)""",
+        # Order deletion and transaction lookups per order
+        """CREATE INDEX IF NOT EXISTS idx_transactions_order
+           ON transactions (order_id)""",
+    ]),
+    (2, "Index order creation time for per-day item reports", [
+        """CREATE INDEX IF NOT EXISTS idx_orders_created
+           ON orders (created_at)""",
+    ]),
+    (3, "Add pre-aggregated sales rollups", [
+        """CREATE TABLE IF NOT EXISTS sales_hourly (
+               day TEXT NOT NULL,
+               hour INTEGER NOT NULL,
+               payment_method TEXT NOT NULL,
+               revenue REAL NOT NULL DEFAULT 0,
+               tips REAL NOT NULL DEFAULT 0,
+               transactions INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (day, hour, payment_method)
+           ) WITHOUT ROWID""",
+        # Per day only: the largest rollup, read for long periods
+        """CREATE TABLE IF NOT EXISTS sales_items (
+               day TEXT NOT NULL,
+               menu_item_id INTEGER NOT NULL,
+               quantity INTEGER NOT NULL DEFAULT 0,
+               revenue REAL NOT NULL DEFAULT 0,
+               tax REAL NOT NULL DEFAULT 0,
+               PRIMARY KEY (day, menu_item_id)
+           ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS sales_categories (
+               day TEXT NOT NULL,
+               hour INTEGER NOT NULL,
+               category TEXT NOT NULL,
+               quantity INTEGER NOT NULL DEFAULT 0,
+               revenue REAL NOT NULL DEFAULT 0,
+               tax REAL NOT NULL DEFAULT 0,
+               PRIMARY KEY (day, hour, category)
+           ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS sales_employees (
+               day TEXT NOT NULL,
+               user_id INTEGER NOT NULL,
+               orders INTEGER NOT NULL DEFAULT 0,
+               revenue REAL NOT NULL DEFAULT 0,
+               tips REAL NOT NULL DEFAULT 0,
+               PRIMARY KEY (day, user_id)
+           ) WITHOUT ROWID""",
+        # Backfill from existing history
+        rollups.rebuild,
+    ]),
+    (4, "Version the menu for the in-memory menu catalog", [
+        """CREATE TABLE IF NOT EXISTS menu_version (
+               id INTEGER PRIMARY KEY CHECK (id = 1),
+               version INTEGER NOT NULL
+           )""",
+        "INSERT OR IGNORE INTO menu_version (id, version) VALUES (1, 1)",
+        """CREATE TRIGGER IF NOT EXISTS menu_items_insert_version AFTER INSERT ON menu_items
+           BEGIN UPDATE menu_version SET version = version + 1 WHERE id = 1; END""",
+        """CREATE TRIGGER IF NOT EXISTS menu_items_update_version AFTER UPDATE ON menu_items
+           BEGIN UPDATE menu_version SET version = version + 1 WHERE id = 1; END""",
+        """CREATE TRIGGER IF NOT EXISTS menu_items_delete_version AFTER DELETE ON menu_items
+           BEGIN UPDATE menu_version SET version = version + 1 WHERE id = 1; END""",
+    ]),
+    (5, "One order line per menu item", [
+        # Fold repeated taps recorded as separate rows into the first row
+        """UPDATE order_items
+           SET quantity = (SELECT SUM(dup.quantity) FROM order_items dup
+                           WHERE dup.order_id = order_items.order_id
+                             AND dup.menu_item_id = order_items.menu_item_id)
+           WHERE id IN (SELECT MIN(id) FROM order_items
+                        GROUP BY order_id, menu_item_id HAVING COUNT(*) > 1)""",
+        """DELETE FROM order_items
+           WHERE id NOT IN (SELECT MIN(id) FROM order_items GROUP BY order_id, menu_item_id)""",
+        # Lets add_items_to_order upsert; replaces the non-unique line index
+        """CREATE UNIQUE INDEX IF NOT EXISTS idx_order_items_line
+           ON order_items (order_id, menu_item_id)""",
+        "DROP INDEX IF EXISTS idx_order_items_order",
+    ]),
+    (6, "Cache computed reports, invalidated per day", [
+        # Bumped whenever something a report of that day reads changes
+        """CREATE TABLE IF NOT EXISTS report_days (
+               day TEXT PRIMARY KEY,
+               generation INTEGER NOT NULL
+           ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS report_cache (
+               kind TEXT NOT NULL,
+               start_day TEXT NOT NULL,
+               end_day TEXT NOT NULL,
+               schema_version INTEGER NOT NULL,
+               generation INTEGER NOT NULL,
+               menu_version INTEGER NOT NULL,
+               payload BLOB NOT NULL,
+               created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+               PRIMARY KEY (kind, start_day, end_day, schema_version)
+           )""",
+        """CREATE TRIGGER IF NOT EXISTS transactions_insert_report_day AFTER INSERT ON transactions
+           BEGIN
+               INSERT INTO report_days (day, generation) VALUES (date(NEW.created_at), 1)
+               ON CONFLICT (day) DO UPDATE SET generation = generation + 1;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS transactions_update_report_day AFTER UPDATE ON transactions
+           BEGIN
+               INSERT INTO report_days (day, generation) VALUES (date(OLD.created_at), 1)
+               ON CONFLICT (day) DO UPDATE SET generation = generation + 1;
+               INSERT INTO report_days (day, generation) VALUES (date(NEW.created_at), 1)
+               ON CONFLICT (day) DO UPDATE SET generation = generation + 1;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS transactions_delete_report_day AFTER DELETE ON transactions
+           BEGIN
+               INSERT INTO report_days (day, generation) VALUES (date(OLD.created_at), 1)
+               ON CONFLICT (day) DO UPDATE SET generation = generation + 1;
+           END""",
+        # Paying an order adds its lines to the rollups of the day it was paid
+        """CREATE TRIGGER IF NOT EXISTS orders_status_report_day AFTER UPDATE OF status ON orders
+           WHEN NEW.status IS NOT OLD.status
+           BEGIN
+               INSERT INTO report_days (day, generation) VALUES (date(NEW.created_at), 1)
+               ON CONFLICT (day) DO UPDATE SET generation = generation + 1;
+               INSERT INTO report_days (day, generation)
+               VALUES (date(""" + rollups.paid_at('NEW.id', 'NEW.created_at') + """), 1)
+               ON CONFLICT (day) DO UPDATE SET generation = generation + 1;
+           END""",
+    ]),
+    (7, "Store the PIN hash parameters per user", [
+        # Every PIN so far was hashed with PBKDF2-SHA256 at 100,000 iterations;
+        # users move to the current parameters when they next log in
+        "ALTER TABLE users ADD COLUMN hash_algorithm TEXT NOT NULL DEFAULT 'pbkdf2_sha256'",
+        "ALTER TABLE users ADD COLUMN hash_iterations INTEGER NOT NULL DEFAULT 100000",
+    ]),
+    (8, "Index open orders for the floor state", [
+        # get_floor_state: every pending or confirmed order, without reading
+        # the paid history
+        """CREATE INDEX IF NOT EXISTS idx_orders_status_table
+           ON orders (status, table_number, created_at)""",
+    ]),
+    (9, "Store the floor plan", [
+        """CREATE TABLE IF NOT EXISTS floor_tables (
+               table_number INTEGER PRIMARY KEY,
+               area TEXT NOT NULL DEFAULT 'Main',
+               x REAL NOT NULL,
+               y REAL NOT NULL,
+               width REAL NOT NULL DEFAULT 100 CHECK(width > 0),
+               height REAL NOT NULL DEFAULT 100 CHECK(height > 0),
+               seats INTEGER NOT NULL DEFAULT 4,
+               shape TEXT NOT NULL DEFAULT 'rect' CHECK(shape IN ('rect', 'round'))
+           )""",
+        # The ten tables the floor used to hard-code: 1-4 by the window,
+        # 5-6 in the centre, 7-10 along the bar
+        """INSERT OR IGNORE INTO floor_tables (table_number, x, y) VALUES
+               (1, 0, 0), (2, 150, 0), (3, 300, 0), (4, 450, 0),
+               (5, 150, 150), (6, 300, 150),
+               (7, 0, 300), (8, 150, 300), (9, 300, 300), (10, 450, 300)""",
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Return the highest migration version applied to the database"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply all pending migrations in order and return the new version"""
+    version = current_version(conn)
+    for target, description, steps in MIGRATIONS:
+        if target <= version:
+            continue
+        # Each migration commits or rolls back as a whole
+        conn.execute("BEGIN")
+        try:
+            cursor = conn.cursor()
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (target, description)
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        version = target
+    return version
@@ -0,0 +1,71 @@
+"""Write-behind buffer for order line entry.
+
+Tapping a menu button should not cost a commit. ``OrderEntryBuffer`` keeps
+the open order's lines in memory, merges repeated taps into per-item
+quantity deltas and writes them with ``Database.add_items_to_order`` in a
+single transaction when flushed. The order screen flushes on a short
+debounce and before anything that reads the order back (confirm, pay, exit).
+
+A flush is all-or-nothing: if it fails the deltas are kept and retried on
+the next flush. Buffers still holding taps are flushed when the interpreter
+exits.
+"""
+import atexit
+import weakref
+
+_buffers = weakref.WeakSet()
+
+
+class OrderEntryBuffer:
+    """The lines of one open order, with taps not yet written to the database"""
+
+    def __init__(self, db):
+        self.db = db
+        self.order_id = None
+        self.lines = {}     # menu_item_id -> quantity, including pending taps
+        self.pending = {}   # menu_item_id -> quantity not yet written
+        _buffers.add(self)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.pending)
+
+    def load(self, order_id) -> bool:
+        """Flush the current order and switch to ``order_id`` (or none)
+
+        Returns False when the flush fails; the buffer then stays on the
+        current order with its pending taps, so they are not lost.
+        """
+        if not self.flush():
+            return False
+        self.order_id = order_id
+        self.lines = dict(self.db.get_order_lines(order_id)) if order_id else {}
+        self.pending = {}
+        return True
+
+    def add(self, menu_item_id: int, quantity: int = 1):
+        """Record a tap; nothing is written until ``flush``"""
+        self.lines[menu_item_id] = self.lines.get(menu_item_id, 0) + quantity
+        self.pending[menu_item_id] = self.pending.get(menu_item_id, 0) + quantity
+
+    def flush(self) -> bool:
+        """Write the pending deltas in one transaction; keep them on failure"""
+        if not self.pending:
+            return True
+        if not self.db.add_items_to_order(self.order_id, self.pending):
+            return False
+        self.pending = {}
+        return True
+
+    def discard(self):
+        """Forget the order and any pending taps, e.g. after deleting it"""
+        self.order_id = None
+        self.lines = {}
+        self.pending = {}
+
+
+@atexit.register
+def flush_all():
+    """Flush every live buffer; also runs when the interpreter exits"""
+    for buffer in list(_buffers):
+        buffer.flush()
@@ -0,0 +1,102 @@
+"""Qt table model for the order being entered.
+
+``OrderTableModel`` holds one row per menu item of the open order and a
+running total in integer cents. A tap changes one row: the model emits a
+single row insert or a ``dataChanged`` for that row's quantity and total
+cells, so the cost of a tap does not grow with the size of the order.
+"""
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+
+
+def to_cents(amount: float) -> int:
+    """Convert a euro amount to whole cents"""
+    return int(round(amount * 100))
+
+
+class OrderTableModel(QAbstractTableModel):
+    HEADERS = ["Item", "Quantity", "Price", "Total"]
+
+    totalChanged = pyqtSignal(int)  # new total in cents
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.catalog = None
+        self._rows = []   # [menu_item_id, name, quantity, price in cents]
+        self._row_of = {}  # menu_item_id -> row
+        self.total_cents = 0
+
+    @property
+    def total(self) -> float:
+        """Order total in euros"""
+        return self.total_cents / 100
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        _, name, quantity, price = self._rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return name
+        if column == 1:
+            return str(quantity)
+        if column == 2:
+            return f"€{price / 100:.2f}"
+        return f"€{quantity * price / 100:.2f}"
+
+    def set_lines(self, lines, catalog):
+        """Replace the order with ``(menu_item_id, quantity)`` lines
+
+        Lines for items that are not on the menu are skipped.
+        """
+        self.beginResetModel()
+        self.catalog = catalog
+        self._rows = []
+        self._row_of = {}
+        for menu_item_id, quantity in lines:
+            if menu_item_id in catalog.items:
+                self._row_of[menu_item_id] = len(self._rows)
+                self._rows.append(self._new_row(menu_item_id, quantity))
+        self.endResetModel()
+        self._set_total(sum(quantity * price for _, _, quantity, price in self._rows))
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self._row_of = {}
+        self.endResetModel()
+        self._set_total(0)
+
+    def add(self, menu_item_id: int, quantity: int = 1):
+        """Add ``quantity`` of a menu item, touching only its row"""
+        if self.catalog is None or menu_item_id not in self.catalog.items:
+            return
+        row = self._row_of.get(menu_item_id)
+        if row is None:
+            row = len(self._rows)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._row_of[menu_item_id] = row
+            self._rows.append(self._new_row(menu_item_id, quantity))
+            self.endInsertRows()
+        else:
+            self._rows[row][2] += quantity
+            self.dataChanged.emit(self.index(row, 1), self.index(row, 3), [Qt.DisplayRole])
+        self._set_total(self.total_cents + quantity * self._rows[row][3])
+
+    def _new_row(self, menu_item_id, quantity):
+        item = self.catalog.items[menu_item_id]
+        return [menu_item_id, item[1], quantity, to_cents(item[3])]
+
+    def _set_total(self, cents):
+        self.total_cents = cents
+        self.totalChanged.emit(cents)
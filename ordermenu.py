@@ -1,12 +1,18 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QLabel, QTableWidget, QTableWidgetItem, QComboBox,
+                            QLabel, QTableView, QComboBox,
                             QSpinBox, QMessageBox, QTabWidget, QWidget, QGridLayout,
                             QScrollArea)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QFont
-from database import Database
+from database import get_database
+from order_buffer import OrderEntryBuffer
+from order_model import OrderTableModel
 from paymentwindow import PaymentWindow
 from logger import pos_logger
+from metrics import timed
+
+# Taps are written to the database this long after the last one
+FLUSH_DELAY_MS = 300
 
 class MenuItemButton(QPushButton):
     def __init__(self, item_data, parent=None):
@@ -165,18 +171,67 @@ class DrinksTab(QWidget):
             self.parent.add_drink_to_order(name, price)
 
 class OrderMenu(QDialog):
+    _shared = None
+    
     def __init__(self, table_number, user_data, parent=None):
         super().__init__(parent)
         self.table_number = table_number
         self.user_data = user_data  # (id, name, role)
-        self.db = Database()
+        self.db = get_database()
         self.current_order_id = None
+        self.entry_buffer = OrderEntryBuffer(self.db)
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FLUSH_DELAY_MS)
+        self.flush_timer.timeout.connect(self.flush_order_entry)
         self.setup_ui()
-        self.showMaximized()  # Show maximized by default
+        if table_number is not None:
+            self.bind_table(table_number, user_data)
+            self.showMaximized()  # Show maximized by default
+    
+    @classmethod
+    def prepare(cls, user_data):
+        """Build the session's order dialog ahead of the first table tap"""
+        if cls._shared is None:
+            cls._shared = cls(None, user_data)
+        return cls._shared
+    
+    @classmethod
+    def for_table(cls, table_number, user_data):
+        """Return the session's order dialog, bound to a table
+        
+        The dialog with all its menu tabs is built once and re-bound on every
+        table tap instead of being rebuilt. If the taps of the order it shows
+        cannot be written, it stays on that order instead.
+        """
+        menu = cls.prepare(user_data)
+        menu.bind_table(table_number, user_data)
+        menu.showMaximized()
+        return menu
+    
+    def bind_table(self, table_number, user_data) -> bool:
+        """Point the dialog at a table: reset its state and load the open order
+
+        Returns False, leaving the dialog on its current order, when its
+        buffered taps cannot be written.
+        """
+        if not self.switch_order_entry(None):
+            return False
+        self.table_number = table_number
+        self.user_data = user_data
+        self.current_order_id = None
+        self.setWindowTitle(f"Table {self.table_number} - Order Menu")
+        self.user_info.setText(f"Order taken by: {self.user_data[1]}")
+        self.order_model.clear()
+        self.confirm_btn.setEnabled(True)
+        self.confirm_btn.setText("Bestelling Bevestigen")
+        if self.db.get_menu_catalog().version != self.menu_catalog_version:
+            self.setup_menu_tabs()
+        self.tabs.setCurrentIndex(0)
         self.load_existing_order()  # Load existing order if any
+        return True
         
     def setup_ui(self):
-        self.setWindowTitle(f"Table {self.table_number} - Order Menu")
         self.setMinimumSize(1200, 900)  # Increased minimum size
         
         # Set dark theme
@@ -212,17 +267,17 @@ class OrderMenu(QDialog):
                 color: #ffffff;
                 font-size: 16px;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #2d2d2d;
                 border: 1px solid #3d3d3d;
                 color: #ffffff;
                 gridline-color: #3d3d3d;
                 font-size: 16px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3d3d3d;
             }
             QTabWidget::pane {
@@ -253,9 +308,9 @@ class OrderMenu(QDialog):
         layout.setSpacing(20)
         
         # User info
-        user_info = QLabel(f"Order taken by: {self.user_data[1]}")
-        user_info.setFont(QFont("Arial", 16, QFont.Bold))
-        layout.addWidget(user_info)
+        self.user_info = QLabel()
+        self.user_info.setFont(QFont("Arial", 16, QFont.Bold))
+        layout.addWidget(self.user_info)
         
         # Menu tabs
         self.tabs = QTabWidget()
@@ -263,10 +318,10 @@ class OrderMenu(QDialog):
         self.setup_menu_tabs()
         layout.addWidget(self.tabs)
         
-        # Current order table
-        self.order_table = QTableWidget()
-        self.order_table.setColumnCount(4)
-        self.order_table.setHorizontalHeaderLabels(["Item", "Quantity", "Price", "Total"])
+        # Current order table; a tap updates only its own row of the model
+        self.order_model = OrderTableModel(self)
+        self.order_table = QTableView()
+        self.order_table.setModel(self.order_model)
         self.order_table.horizontalHeader().setStretchLastSection(True)
         self.order_table.verticalHeader().setDefaultSectionSize(50)
         layout.addWidget(self.order_table)
@@ -275,6 +330,7 @@ class OrderMenu(QDialog):
         self.total_label = QLabel("Total: €0.00")
         self.total_label.setFont(QFont("Arial", 20, QFont.Bold))
         layout.addWidget(self.total_label)
+        self.order_model.totalChanged.connect(self.update_total_label)
         
         # Action buttons
         buttons_layout = QHBoxLayout()
@@ -299,19 +355,19 @@ class OrderMenu(QDialog):
         layout.addLayout(buttons_layout)
         
     def setup_menu_tabs(self):
-        # Add food menu tabs
-        menu_items = self.db.get_menu_items()
-        categories = {}
+        # Drop the tabs of a previous menu version
+        while self.tabs.count():
+            tab = self.tabs.widget(0)
+            self.tabs.removeTab(0)
+            tab.deleteLater()
         
-        # Group items by category
-        for item in menu_items:
-            category = item[2]
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(item)
+        # Add food menu tabs from the cached catalog, already grouped by category
+        self.menu_catalog = self.db.get_menu_catalog()
+        # Remember the loaded version; the catalog object itself is shared
+        self.menu_catalog_version = self.menu_catalog.version
         
         # Create tabs for each category
-        for category, items in categories.items():
+        for category, items in self.menu_catalog.categories.items():
             tab = QWidget()
             layout = QGridLayout(tab)
             layout.setSpacing(15)
@@ -328,55 +384,71 @@ class OrderMenu(QDialog):
         drinks_tab = DrinksTab(self)
         self.tabs.addTab(drinks_tab, "Dranken")
     
+    @timed('pos_ui_handler_seconds', handler='add_to_order')
     def add_to_order(self, item, quantity):
         if quantity <= 0:
             return
             
         if not self.current_order_id:
+            # Write what is buffered first, so a failed write cannot strand it
+            if not self.flush_order_entry():
+                return
             self.current_order_id = self.db.create_order(self.table_number, self.user_data[0])
-            
-        if self.db.add_item_to_order(self.current_order_id, item[0], quantity):
+            self.switch_order_entry(self.current_order_id)
             self.update_order_table()
-        else:
-            QMessageBox.warning(self, "Error", "Failed to add item to order!")
+            
+        # Buffered: repeated taps are merged and written after FLUSH_DELAY_MS
+        self.entry_buffer.add(item[0], quantity)
+        self.flush_timer.start()
+        self.order_model.add(item[0], quantity)
+    
+    def flush_order_entry(self):
+        """Write buffered taps to the database; returns False if that failed"""
+        self.flush_timer.stop()
+        if self.entry_buffer.flush():
+            return True
+        QMessageBox.warning(self, "Error", "Failed to add item to order!")
+        return False
+
+    def switch_order_entry(self, order_id):
+        """Write buffered taps and point the entry buffer at ``order_id``
+
+        Returns False, staying on the current order, when the write fails.
+        """
+        self.flush_timer.stop()
+        if self.entry_buffer.load(order_id):
+            return True
+        QMessageBox.warning(self, "Error", "Failed to save the order! It stays open until it can be saved.")
+        return False
+    
+    def done(self, result):
+        # Write any buffered taps before the dialog goes away
+        self.flush_order_entry()
+        super().done(result)
     
     def update_order_table(self):
         if not self.current_order_id:
             return
             
-        items = self.db.get_order_items(self.current_order_id)
-        self.order_table.setRowCount(len(items))
-        
-        total = 0
-        for row, item in enumerate(items):
-            name, quantity, price = item
-            
-            name_item = QTableWidgetItem(name)
-            quantity_item = QTableWidgetItem(str(quantity))
-            price_item = QTableWidgetItem(f"€{price:.2f}")
-            total_item = QTableWidgetItem(f"€{quantity * price:.2f}")
-            
-            # Make items non-editable
-            for table_item in [name_item, quantity_item, price_item, total_item]:
-                table_item.setFlags(table_item.flags() & ~Qt.ItemIsEditable)
-            
-            self.order_table.setItem(row, 0, name_item)
-            self.order_table.setItem(row, 1, quantity_item)
-            self.order_table.setItem(row, 2, price_item)
-            self.order_table.setItem(row, 3, total_item)
-            
-            total += quantity * price
-        
-        self.total_label.setText(f"Total: €{total:.2f}")
+        # Full reload, e.g. when an order is opened; taps go through add_to_order
+        self.order_model.set_lines(self.entry_buffer.lines.items(), self.db.get_menu_catalog())
+    
+    def update_total_label(self, total_cents):
+        self.total_label.setText(f"Total: €{total_cents / 100:.2f}")
     
     def confirm_order(self):
         if not self.current_order_id:
             QMessageBox.warning(self, "Error", "No active order!")
             return
-            
-        if self.db.update_order_status(self.current_order_id, "confirmed"):
+        # Timed up to the result message, which waits for the user
+        with timed('pos_ui_handler_seconds', handler='confirm_order'):
+            if not self.flush_order_entry():
+                return
+            confirmed = self.db.update_order_status(self.current_order_id, "confirmed")
             # Generate kitchen order CSV
-            csv_file = self.db.generate_kitchen_order_csv(self.current_order_id)
+            csv_file = self.db.generate_kitchen_order_csv(self.current_order_id) if confirmed else None
+            
+        if confirmed:
             if csv_file:
                 QMessageBox.information(self, "Success", f"Order confirmed! Kitchen order saved to {csv_file}")
                 # Close the dialog after successful confirmation
@@ -390,31 +462,37 @@ class OrderMenu(QDialog):
         if not self.current_order_id:
             QMessageBox.warning(self, "Error", "No active order!")
             return
+        # The bill is printed from the stored order
+        if not self.flush_order_entry():
+            return
             
-        # Get total amount from the label
-        total_text = self.total_label.text()
-        total_amount = float(total_text.replace("Total: €", ""))
+        # Running total of the order, kept in cents by the model
+        total_amount = self.order_model.total
         
         # Show payment window
         payment_window = PaymentWindow(total_amount, self)
         if payment_window.exec_() == QDialog.Accepted:
-            # Save transaction details
+            # Save transaction details; timed from the accepted payment window
+            # up to the result message
             payment_result = payment_window.payment_result
-            if self.db.add_transaction(
-                self.current_order_id,
-                payment_result['method'],
-                payment_result['amount'],
-                payment_result['tip'],
-                self.user_data[0]  # Pass the user_id who processed the payment
-            ):
-                if self.db.update_order_status(self.current_order_id, "paid"):
-                    QMessageBox.information(self, "Success", "Order paid successfully!")
+            with timed('pos_ui_handler_seconds', handler='pay_order'):
+                saved = self.db.add_transaction(
+                    self.current_order_id,
+                    payment_result['method'],
+                    payment_result['amount'],
+                    payment_result['tip'],
+                    self.user_data[0]  # Pass the user_id who processed the payment
+                )
+                paid = saved and self.db.update_order_status(self.current_order_id, "paid")
+                if paid:
                     # Only clear the order after payment
                     self.current_order_id = None
-                    self.order_table.setRowCount(0)
-                    self.total_label.setText("Total: €0.00")
-                else:
-                    QMessageBox.warning(self, "Error", "Failed to update order status!")
+                    self.entry_buffer.discard()
+                    self.order_model.clear()
+            if paid:
+                QMessageBox.information(self, "Success", "Order paid successfully!")
+            elif saved:
+                QMessageBox.warning(self, "Error", "Failed to update order status!")
             else:
                 QMessageBox.warning(self, "Error", "Failed to save transaction!")
     
@@ -428,18 +506,20 @@ class OrderMenu(QDialog):
                                    QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
+            # Taps not yet written belong to the order being deleted
+            self.flush_timer.stop()
+            self.entry_buffer.discard()
             if self.db.update_order_status(self.current_order_id, "deleted"):
                 QMessageBox.information(self, "Success", "Order deleted successfully!")
                 self.current_order_id = None
-                self.order_table.setRowCount(0)
-                self.total_label.setText("Total: €0.00")
+                self.order_model.clear()
             else:
                 QMessageBox.warning(self, "Error", "Failed to delete order!")
     
     def load_existing_order(self):
         """Load existing order for the table if any"""
         existing_order_id = self.db.get_active_order_for_table(self.table_number)
-        if existing_order_id:
+        if existing_order_id and self.switch_order_entry(existing_order_id):
             self.current_order_id = existing_order_id
             self.update_order_table()
             # Disable confirm button if order is already confirmed
@@ -471,16 +551,20 @@ class OrderMenu(QDialog):
     def add_drink_to_order(self, name, price):
         """Add a drink to the current order"""
         if not self.current_order_id:
+            # Write what is buffered first, so a failed write cannot strand it
+            if not self.flush_order_entry():
+                return
             self.current_order_id = self.db.create_order(self.table_number, self.user_data[0])
+            self.switch_order_entry(self.current_order_id)
+            self.update_order_table()
         
         # Create a temporary menu item for the drink
         drink_item = (0, name, "Dranken", price, "")  # (id, name, category, price, description)
-        if self.db.add_item_to_order(self.current_order_id, 0, 1):  # Using 0 as temporary ID
-            self.update_order_table()
-            pos_logger.log_audit(
-                user=f"{self.user_data[1]} (ID: {self.user_data[0]})",
-                action="Add Drink to Order",
-                details=f"Drink: {name}, Price: €{price:.2f}"
-            )
-        else:
-            QMessageBox.warning(self, "Error", "Failed to add drink to order!") 
\ No newline at end of file
+        self.entry_buffer.add(0, 1)  # Using 0 as temporary ID
+        self.flush_timer.start()
+        self.order_model.add(0, 1)
+        pos_logger.log_audit(
+            user=f"{self.user_data[1]} (ID: {self.user_data[0]})",
+            action="Add Drink to Order",
+            details=f"Drink: {name}, Price: €{price:.2f}"
+        ) 
\ No newline at end of file
@@ -0,0 +1,235 @@
+"""Opt-in profiler for the SQL statements run through ``Database``.
+
+Set ``POS_SQL_PROFILE`` to a threshold in milliseconds (e.g.
+``POS_SQL_PROFILE=50``) before starting the POS, and every connection the
+``ConnectionManager`` opens is a ``ProfilingConnection``. Each statement is
+timed from ``execute`` until its last row is fetched, and the profiler
+collects per statement:
+
+* the number of executions, the total and slowest time,
+* the rows returned (or changed, for writes),
+* the shapes of the parameters it was run with.
+
+Statements slower than the threshold are written to the ``slow_queries``
+log along with their ``EXPLAIN QUERY PLAN``. ``summary_table()`` renders
+the statements by total time, and the POS writes it to
+``logs/sql_profile.txt`` on exit.
+
+Statements are grouped by their text with whitespace collapsed; the
+parameters are not part of the key, so each query in ``database.py`` is
+one row however often it runs.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+PROFILE_ENV = 'POS_SQL_PROFILE'
+
+# Only these are explained in the slow-query log
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+
+def _shape(parameters) -> str:
+    """How a statement was parameterised, without the values themselves"""
+    if not parameters:
+        return "no parameters"
+    if isinstance(parameters, dict):
+        return "named: " + ", ".join(sorted(parameters))
+    return f"{len(parameters)} positional"
+
+
+class StatementStats:
+    __slots__ = ('calls', 'total', 'slowest', 'rows', 'shapes')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.rows = 0
+        self.shapes = set()
+
+
+class QueryProfiler:
+    """Per-statement timings of the connections of one database"""
+
+    def __init__(self, slow_ms: float = 100.0):
+        self.slow_seconds = slow_ms / 1000
+        self.statements = {}  # normalised SQL -> StatementStats
+        self.slow_queries = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls):
+        """A profiler if ``POS_SQL_PROFILE`` is set, else None"""
+        value = os.environ.get(PROFILE_ENV, '').strip()
+        if not value:
+            return None
+        try:
+            return cls(float(value))
+        except ValueError:
+            print(f"Error: {PROFILE_ENV} must be a threshold in milliseconds, got {value!r}")
+            return None
+
+    def connect(self, *args, **kwargs) -> sqlite3.Connection:
+        """``sqlite3.connect`` returning a connection that reports to this profiler"""
+        conn = sqlite3.connect(*args, factory=ProfilingConnection, **kwargs)
+        conn.profiler = self
+        return conn
+
+    def record(self, conn, sql: str, shape: str, elapsed: float, rows: int, parameters=None):
+        statement = " ".join(sql.split())
+        with self._lock:
+            stats = self.statements.get(statement)
+            if stats is None:
+                stats = self.statements[statement] = StatementStats()
+            stats.calls += 1
+            stats.total += elapsed
+            stats.slowest = max(stats.slowest, elapsed)
+            stats.rows += max(rows, 0)
+            stats.shapes.add(shape)
+        if elapsed >= self.slow_seconds:
+            self._log_slow(conn, statement, shape, elapsed, rows, parameters)
+
+    def summary(self):
+        """(statement, stats) pairs, most total time first"""
+        with self._lock:
+            return sorted(self.statements.items(), key=lambda item: item[1].total, reverse=True)
+
+    def summary_table(self, width: int = 100) -> str:
+        lines = [f"{'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'rows':>9}  statement"]
+        for statement, stats in self.summary():
+            text = statement if len(statement) <= width else statement[:width - 3] + "..."
+            lines.append(f"{stats.calls:>7} {stats.total * 1000:>10.1f} {stats.total / stats.calls * 1000:>9.2f} "
+                         f"{stats.slowest * 1000:>9.2f} {stats.rows:>9}  {text}")
+            lines.append(f"{'':>50}  parameters: {'; '.join(sorted(stats.shapes))}")
+        return "\n".join(lines)
+
+    def write_summary(self, path: str):
+        with open(path, 'w') as f:
+            f.write(f"SQL profile, written {time.strftime('%Y-%m-%d %H:%M:%S')}, "
+                    f"{self.slow_queries} statements over {self.slow_seconds * 1000:g} ms\n\n")
+            f.write(self.summary_table(width=200) + "\n")
+
+    def _log_slow(self, conn, statement, shape, elapsed, rows, parameters):
+        with self._lock:
+            self.slow_queries += 1
+        plan = ""
+        if statement.split(None, 1)[0].upper() in EXPLAINABLE:
+            try:
+                # A plain cursor, so the EXPLAIN is not profiled itself
+                cursor = sqlite3.Cursor(conn)
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+                plan = "\n".join(f"    {row[3]}" for row in cursor.fetchall())
+            except sqlite3.Error as e:
+                plan = f"    (no plan: {str(e)})"
+        from logger import pos_logger
+        pos_logger.log_slow_query(statement, elapsed, rows, shape, plan)
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Times each statement from execute until its rows are fetched"""
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self._pending = None  # [sql, shape, elapsed, rows fetched, parameters]
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._pending = [sql, _shape(parameters), time.perf_counter() - start, 0, parameters]
+        if self.description is None:
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        seq_of_parameters = list(seq_of_parameters)
+        first = seq_of_parameters[0] if seq_of_parameters else ()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._pending = [sql, f"{len(seq_of_parameters)} x {_shape(first)}",
+                         time.perf_counter() - start, 0, first]
+        self._finish()
+        return self
+
+    def executescript(self, sql_script):
+        self._finish()
+        start = time.perf_counter()
+        super().executescript(sql_script)
+        self._pending = [sql_script, "script", time.perf_counter() - start, 0, None]
+        self._finish()
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, 0, True)
+            raise
+        self._fetched(start, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        if getattr(self, '_pending', None) is not None:
+            try:
+                self._finish()
+            except sqlite3.Error:
+                pass  # the connection was closed first
+
+    def _fetched(self, start, rows, done):
+        pending = self._pending
+        if pending is not None:
+            pending[2] += time.perf_counter() - start
+            pending[3] += rows
+            if done:
+                self._finish()
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        sql, shape, elapsed, fetched, parameters = pending
+        rows = fetched if self.description is not None else self.rowcount
+        self.connection.profiler.record(self.connection, sql, shape, elapsed, rows, parameters)
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """A connection whose statements are timed by its ``profiler``"""
+    profiler = None
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
@@ -0,0 +1,227 @@
+"""Cache of computed reports.
+
+Reports are keyed by kind (e.g. ``daily_summary``), the half-open day range
+they cover and the schema version. Whether a cached report is still valid is
+decided by two counters read at lookup time:
+
+* ``report_days.generation``: triggers (migration 6) bump it for a day
+  whenever a transaction of that day is inserted, corrected or deleted, or
+  an order's status changes. Its sum over the report's days only grows, so
+  any change to any of those days makes the cached report stale.
+* ``menu_version``: reports show menu item names and categories.
+
+Reports are held pickled in an in-memory LRU, so callers never share (and
+can freely modify) the objects they get back. Reports covering only days
+before today are also written to the ``report_cache`` table, so they
+survive restarts and are shared between terminals. That table lives in the
+shared database file, so its rows are JSON (see ``dumps``/``loads``), never
+pickles: loading a row cannot run code, whoever wrote it.
+"""
+import json
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import migrations
+from metrics import registry
+
+
+class ReportCache:
+    """Computed reports of one database file, checked against its day counters"""
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.enabled = True  # False computes every report, e.g. to time it
+        self._entries = OrderedDict()  # (kind, start, end) -> (stamp, payload)
+        self._lock = threading.Lock()
+        self.hits = 0        # served from memory
+        self.disk_hits = 0   # served from the report_cache table
+        self.misses = 0      # computed
+
+    @classmethod
+    def for_database(cls, db_name: str) -> "ReportCache":
+        """Return the process-wide report cache for a database file"""
+        key = os.path.abspath(db_name)
+        with cls._caches_lock:
+            cache = cls._caches.get(key)
+            if cache is None:
+                cache = cls()
+                cls._caches[key] = cache
+                database = os.path.basename(key)
+                registry.gauge('pos_report_cache_hit_ratio', "Share of report lookups served from the cache"
+                               ).set_function(lambda: cache.stats()['hit_rate'], db=database)
+                registry.gauge('pos_report_cache_entries', "Reports held in memory"
+                               ).set_function(lambda: cache.stats()['entries'], db=database)
+            return cache
+
+    def get(self, conn, kind: str, start: str, end: str, compute):
+        """Return the report for the days [start, end), computing it if needed
+
+        ``compute()`` builds the report; it runs only when no valid cached
+        copy exists. Database errors raised by it are not cached.
+        """
+        if not self.enabled:
+            return compute()
+        key = (kind, start, end)
+        stamp = self._stamp(conn, start, end)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pickle.loads(entry[1])
+
+        closed = end <= datetime.now(timezone.utc).date().isoformat()
+        if closed:
+            row = conn.execute("""
+                SELECT generation, menu_version, payload FROM report_cache
+                WHERE kind = ? AND start_day = ? AND end_day = ? AND schema_version = ?
+            """, (kind, start, end, migrations.SCHEMA_VERSION)).fetchone()
+            # Rows from before the switch to JSON are BLOB pickles; recompute those
+            if row is not None and (row[0], row[1]) == stamp and isinstance(row[2], str):
+                report = loads(row[2])
+                self._remember(key, stamp, pickle.dumps(report, protocol=pickle.HIGHEST_PROTOCOL))
+                with self._lock:
+                    self.disk_hits += 1
+                return report
+
+        report = compute()
+        self._remember(key, stamp, pickle.dumps(report, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self.misses += 1
+        if closed:
+            self._store(conn, key, stamp, dumps(report))
+        return report
+
+    def stats(self) -> dict:
+        """Hit and miss counters since the process started"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+            }
+
+    def clear(self):
+        """Drop the in-memory reports; the day counters keep the disk copies honest"""
+        with self._lock:
+            self._entries.clear()
+
+    def _stamp(self, conn, start: str, end: str):
+        return conn.execute("""
+            SELECT (SELECT COALESCE(SUM(generation), 0) FROM report_days WHERE day >= ? AND day < ?),
+                   (SELECT version FROM menu_version WHERE id = 1)
+        """, (start, end)).fetchone()
+
+    def _remember(self, key, stamp, payload):
+        with self._lock:
+            self._entries[key] = (stamp, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _store(self, conn, key, stamp, payload):
+        try:
+            conn.execute("""
+                INSERT OR REPLACE INTO report_cache
+                    (kind, start_day, end_day, schema_version, generation, menu_version, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (*key, migrations.SCHEMA_VERSION, *stamp, payload))
+            conn.commit()
+        except sqlite3.Error as e:
+            # Only a lost cache entry; the report itself is fine
+            conn.rollback()
+            print(f"Error storing cached report: {str(e)}")
+
+
+def dumps(report) -> str:
+    """Serialize a report to JSON, tagging DataFrames, Series and timestamps"""
+    return json.dumps(_encode(report), separators=(',', ':'))
+
+
+def loads(payload: str):
+    """Rebuild a report serialized by ``dumps``"""
+    return json.loads(payload, object_hook=_decode)
+
+
+def _encode(value):
+    import numpy as np
+    import pandas as pd
+    if isinstance(value, dict):
+        return {str(k): _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, pd.DataFrame):
+        return {'__frame__': {
+            'index': _encode_index(value.index),
+            'columns': _encode_index(value.columns),
+            'dtypes': [str(dtype) for dtype in value.dtypes],
+            'data': [[_encode(v) for v in row] for row in value.itertuples(index=False, name=None)],
+        }}
+    if isinstance(value, pd.Series):
+        return {'__series__': {
+            'index': _encode_index(value.index),
+            'name': _encode(value.name),
+            'dtype': str(value.dtype),
+            'data': [_encode(v) for v in value.tolist()],
+        }}
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return {'__timestamp__': value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError(f"Cannot cache a report containing {type(value).__name__}")
+
+
+def _encode_index(index):
+    return {
+        'names': [_encode(name) for name in index.names],
+        'dtype': str(index.dtype),
+        'labels': [_encode(label) for label in index.tolist()],
+    }
+
+
+def _decode(obj):
+    import pandas as pd
+    if '__frame__' in obj:
+        frame = obj['__frame__']
+        columns = _decode_index(frame['columns'])
+        df = pd.DataFrame(frame['data'] or None, index=_decode_index(frame['index']), columns=columns)
+        return df.astype(dict(zip(columns, frame['dtypes']))) if len(columns) else df
+    if '__series__' in obj:
+        series = obj['__series__']
+        return pd.Series(series['data'], index=_decode_index(series['index']),
+                         name=series['name'], dtype=series['dtype'])
+    if '__timestamp__' in obj:
+        return pd.Timestamp(obj['__timestamp__'])
+    return obj
+
+
+def _decode_index(index):
+    import pandas as pd
+    if len(index['names']) > 1:
+        levels = list(zip(*index['labels'])) or [[]] * len(index['names'])
+        return pd.MultiIndex.from_arrays(levels, names=index['names'])
+    return pd.Index(index['labels'], dtype=index['dtype'], name=index['names'][0])
+
+
+def touch_days(cursor, start_day=None, end_day=None):
+    """Invalidate cached reports for [start_day, end_day), or for all days
+
+    For changes the triggers do not see, such as a rollup rebuild.
+    """
+    where, params = ("WHERE day >= ? AND day < ?", (start_day, end_day)) if start_day else ("", ())
+    cursor.execute(f"UPDATE report_days SET generation = generation + 1 {where}", params)
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO report_days (day, generation)
+        SELECT DISTINCT day, 1 FROM sales_hourly {where}
+    """, params)
@@ -0,0 +1,449 @@
+"""PDF exports of the daily and accounting (boekhouding) reports.
+
+``build_daily_report_pdf`` and ``build_accounting_pdf`` turn a
+``Database.get_daily_summary`` result into a ReportLab PDF; they do not
+depend on Qt, so they can run in worker processes.
+
+``BatchExport`` exports every day of a date range across a process pool,
+one PDF per day, and writes a CSV manifest listing each day's file and
+totals. Days are independent, so a month-end export scales with the
+number of cores. The dashboard polls ``BatchExport.poll`` from a timer for
+progress; ``export_range`` is the blocking form for scripts::
+
+    python report_export.py --from 2025-01-01 --to 2025-01-31
+"""
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+
+# kind -> (output directory, file name prefix)
+EXPORT_KINDS = {
+    'daily': ("Reports", "daily_report"),
+    'boekhouding': ("Boekhouding", "boekhouding"),
+}
+
+
+def report_path(kind: str, day, directory: str = None) -> str:
+    """Return the PDF path for one day's report, creating its directory"""
+    default_directory, prefix = EXPORT_KINDS[kind]
+    directory = directory or default_directory
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{prefix}_{day}.pdf")
+
+
+def build_daily_report_pdf(summary: dict, selected_date, filepath: str):
+    """Write the daily sales report PDF for a summary"""
+    # Create PDF document
+    doc = SimpleDocTemplate(filepath, pagesize=letter)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    # Title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30
+    )
+    elements.append(Paragraph(f"Daily Sales Report - {selected_date}", title_style))
+    elements.append(Spacer(1, 20))
+
+    # Revenue Summary
+    elements.append(Paragraph("Revenue Summary", styles['Heading2']))
+    revenue_data = [
+        ["Total Revenue", f"€{summary['revenue']['total']:.2f}"],
+        ["Average Order", f"€{summary['transactions']['average_order']:.2f}"],
+        ["Total Transactions", str(summary['transactions']['count'])]
+    ]
+    revenue_table = Table(revenue_data, colWidths=[3*inch, 2*inch])
+    revenue_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(revenue_table)
+    elements.append(Spacer(1, 20))
+
+    # Revenue by Hour Chart
+    if not summary['revenue']['by_hour'].empty:
+        elements.append(Paragraph("Revenue by Hour", styles['Heading2']))
+        drawing = Drawing(400, 200)
+        bc = VerticalBarChart()
+        bc.x = 50
+        bc.y = 50
+        bc.height = 125
+        bc.width = 300
+        bc.data = [summary['revenue']['by_hour'].values.tolist()]
+        bc.categoryAxis.categoryNames = [f"{h:02d}:00" for h in summary['revenue']['by_hour'].index]
+        bc.valueAxis.valueMin = 0
+        bc.valueAxis.valueMax = summary['revenue']['by_hour'].max() * 1.1
+        drawing.add(bc)
+        elements.append(drawing)
+        elements.append(Spacer(1, 20))
+
+    # Menu Analysis
+    elements.append(Paragraph("Top Selling Items", styles['Heading2']))
+    if not summary['menu']['top_items'].empty:
+        menu_data = [["Item", "Quantity", "Revenue"]]
+        for name, data in summary['menu']['top_items'].iterrows():
+            menu_data.append([
+                name,
+                str(int(data['quantity'])),
+                f"€{data['price']:.2f}"
+            ])
+        menu_table = Table(menu_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
+        menu_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        elements.append(menu_table)
+        elements.append(Spacer(1, 20))
+
+    # Category Analysis
+    elements.append(Paragraph("Revenue by Category", styles['Heading2']))
+    if not summary['menu']['category_analysis']['revenue'].empty:
+        category_data = [["Category", "Revenue", "Quantity"]]
+        for category, revenue in summary['menu']['category_analysis']['revenue'].items():
+            quantity = summary['menu']['category_analysis']['quantity'][category]
+            category_data.append([
+                category,
+                f"€{revenue:.2f}",
+                str(int(quantity))
+            ])
+        category_table = Table(category_data, colWidths=[2*inch, 2*inch, 2*inch])
+        category_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        elements.append(category_table)
+        elements.append(Spacer(1, 20))
+
+    # Tax Analysis
+    elements.append(Paragraph("Tax Analysis", styles['Heading2']))
+    tax_data = [
+        ["Total Tax", f"€{summary['tax']['total']:.2f}"]
+    ]
+    if not summary['tax']['by_category'].empty:
+        tax_data.append(["Tax by Category", ""])
+        for category, tax in summary['tax']['by_category'].items():
+            tax_data.append([category, f"€{tax:.2f}"])
+
+    tax_table = Table(tax_data, colWidths=[3*inch, 2*inch])
+    tax_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(tax_table)
+
+    # Build PDF
+    doc.build(elements)
+
+
+def build_accounting_pdf(summary: dict, selected_date, filepath: str):
+    """Write the accounting (boekhouding) PDF for a summary"""
+    # Create PDF document
+    doc = SimpleDocTemplate(filepath, pagesize=letter)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    # Title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30
+    )
+    elements.append(Paragraph(f"Dagelijkse Boekhouding - {selected_date}", title_style))
+    elements.append(Spacer(1, 20))
+
+    # Revenue Summary
+    elements.append(Paragraph("Omzet Overzicht", styles['Heading2']))
+    revenue_data = [
+        ["Totaal Omzet", f"€{summary['revenue']['total']:.2f}"],
+        ["Gemiddelde Bestelling", f"€{summary['transactions']['average_order']:.2f}"],
+        ["Totaal Transacties", str(summary['transactions']['count'])]
+    ]
+    revenue_table = Table(revenue_data, colWidths=[3*inch, 2*inch])
+    revenue_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(revenue_table)
+    elements.append(Spacer(1, 20))
+
+    # Payment Methods
+    elements.append(Paragraph("Betaalmethoden", styles['Heading2']))
+    method_labels = {"pin": "PIN", "cash": "Contant", "split": "Gesplitst"}
+    payment_data = [
+        [method_labels.get(method, method), f"€{amount:.2f}"]
+        for method, amount in summary['payments']['by_method'].items()
+    ] or [["Geen betalingen", "€0.00"]]
+    payment_table = Table(payment_data, colWidths=[3*inch, 2*inch])
+    payment_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(payment_table)
+    elements.append(Spacer(1, 20))
+
+    # Tax Analysis
+    elements.append(Paragraph("BTW Analyse", styles['Heading2']))
+    tax_data = [
+        ["Totaal BTW", f"€{summary['tax']['total']:.2f}"]
+    ]
+    if not summary['tax']['by_category'].empty:
+        tax_data.append(["BTW per Categorie", ""])
+        for category, tax in summary['tax']['by_category'].items():
+            tax_data.append([category, f"€{tax:.2f}"])
+
+    tax_table = Table(tax_data, colWidths=[3*inch, 2*inch])
+    tax_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(tax_table)
+    elements.append(Spacer(1, 20))
+
+    # Category Analysis
+    elements.append(Paragraph("Omzet per Categorie", styles['Heading2']))
+    if not summary['menu']['category_analysis']['revenue'].empty:
+        category_data = [["Categorie", "Omzet", "Aantal"]]
+        for category, revenue in summary['menu']['category_analysis']['revenue'].items():
+            quantity = summary['menu']['category_analysis']['quantity'][category]
+            category_data.append([
+                category,
+                f"€{revenue:.2f}",
+                str(int(quantity))
+            ])
+        category_table = Table(category_data, colWidths=[2*inch, 2*inch, 2*inch])
+        category_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        elements.append(category_table)
+
+    # Build PDF
+    doc.build(elements)
+
+
+BUILDERS = {
+    'daily': build_daily_report_pdf,
+    'boekhouding': build_accounting_pdf,
+}
+
+
+def export_day(db_name: str, kind: str, day: str, directory: str) -> dict:
+    """Export one day's report; runs in a worker process
+
+    Returns the manifest row for the day.
+    """
+    from database import get_database
+
+    summary = get_database(db_name).get_daily_summary(day)
+    filepath = report_path(kind, day, directory)
+    BUILDERS[kind](summary, day, filepath)
+    return {
+        'day': day,
+        'file': os.path.basename(filepath),
+        'revenue': round(summary['revenue']['total'], 2),
+        'transactions': summary['transactions']['count'],
+        'tips': round(summary['payments']['tips'], 2),
+        'tax': round(summary['tax']['total'], 2),
+        'error': '',
+    }
+
+
+class BatchExport:
+    """Exports the days from start_date to end_date (inclusive) in a process pool"""
+
+    def __init__(self, db_name: str, kind: str, start_date, end_date,
+                 directory: str = None, workers: int = None):
+        if kind not in EXPORT_KINDS:
+            raise ValueError(f"Unknown export kind: {kind}")
+        start = datetime.strptime(str(start_date)[:10], "%Y-%m-%d").date()
+        end = datetime.strptime(str(end_date)[:10], "%Y-%m-%d").date()
+        self.db_name = os.path.abspath(db_name)
+        self.kind = kind
+        self.start_date, self.end_date = start, end
+        self.directory = os.path.abspath(directory or EXPORT_KINDS[kind][0])
+        self.days = [(start + timedelta(days=offset)).isoformat()
+                     for offset in range((end - start).days + 1)]
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self.days) or 1))
+        self.executor = None
+        self.futures = {}    # future -> day
+        self.results = []    # manifest rows, once finished
+        self.cancelled = []  # days dropped by cancel(), once finished
+        self.manifest = None
+
+    @property
+    def total(self) -> int:
+        return len(self.days)
+
+    def start(self):
+        """Submit every day to the pool; returns immediately"""
+        os.makedirs(self.directory, exist_ok=True)
+        # Spawned workers start clean instead of inheriting a forked Qt application
+        self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        self.futures = {
+            self.executor.submit(export_day, self.db_name, self.kind, day, self.directory): day
+            for day in self.days
+        }
+
+    def poll(self) -> int:
+        """Return how many days are finished or cancelled, without blocking"""
+        return sum(future.done() for future in self.futures)
+
+    def cancel(self):
+        """Drop the days not started yet; days being exported still finish
+
+        Returns immediately. Keep calling ``poll`` and call ``finish`` once it
+        reaches ``total``, so ``finish`` does not wait on the GUI thread.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def finish(self) -> str:
+        """Wait for the remaining days, write the manifest and return its path
+
+        Days dropped by ``cancel`` are left out of the manifest and listed in
+        ``cancelled``; they did not fail.
+        """
+        rows, cancelled = [], []
+        for future, day in self.futures.items():
+            if future.cancelled():
+                cancelled.append(day)
+                continue
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                rows.append({'day': day, 'file': '', 'revenue': 0.0, 'transactions': 0,
+                             'tips': 0.0, 'tax': 0.0, 'error': str(e) or type(e).__name__})
+        self.executor.shutdown()
+        rows.sort(key=lambda row: row['day'])
+        self.results = rows
+        self.cancelled = sorted(cancelled)
+
+        _, prefix = EXPORT_KINDS[self.kind]
+        manifest = os.path.join(self.directory,
+                                f"{prefix}_{self.start_date}_{self.end_date}_manifest.csv")
+        fields = ['day', 'file', 'revenue', 'transactions', 'tips', 'tax', 'error']
+        self.manifest = manifest
+        with open(manifest, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+            writer.writerow({
+                'day': 'total',
+                'file': f"{sum(1 for row in rows if row['file'])} files",
+                'revenue': round(sum(row['revenue'] for row in rows), 2),
+                'transactions': sum(row['transactions'] for row in rows),
+                'tips': round(sum(row['tips'] for row in rows), 2),
+                'tax': round(sum(row['tax'] for row in rows), 2),
+                'error': f"{sum(1 for row in rows if row['error'])} failed",
+            })
+        return manifest
+
+    @property
+    def failures(self) -> list:
+        return [row for row in self.results if row['error']]
+
+
+def export_range(db_name: str, kind: str, start_date, end_date, directory: str = None,
+                 workers: int = None, progress=None) -> BatchExport:
+    """Export a date range and wait for it; ``progress(done, total)`` is called per day"""
+    batch = BatchExport(db_name, kind, start_date, end_date, directory, workers)
+    batch.start()
+    for done, _ in enumerate(as_completed(batch.futures), 1):
+        if progress:
+            progress(done, batch.total)
+    batch.finish()
+    return batch
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export one PDF per day for a date range")
+    parser.add_argument('--db', default="pos_system.db", help="database file")
+    parser.add_argument('--kind', choices=sorted(EXPORT_KINDS), default='boekhouding')
+    parser.add_argument('--from', dest='start_date', required=True, help="first day (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end_date', help="last day (YYYY-MM-DD), defaults to --from")
+    parser.add_argument('--workers', type=int, help="worker processes, defaults to the CPU count")
+    args = parser.parse_args()
+
+    batch = export_range(args.db, args.kind, args.start_date, args.end_date or args.start_date,
+                         workers=args.workers,
+                         progress=lambda done, total: print(f"\r{done}/{total}", end="", flush=True))
+    print(f"\nManifest written to {batch.manifest}")
+    if batch.failures:
+        raise SystemExit(1)
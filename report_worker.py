@@ -0,0 +1,175 @@
+"""Run report queries off the Qt GUI thread.
+
+``ReportRunner`` computes a report in a ``QThreadPool`` worker and hands the
+result back to the GUI thread through a queued signal. It keeps at most one
+job in flight and one waiting: a new request replaces the waiting one, so
+scrolling through dates computes the first and the last date instead of
+every date in between. A result that is no longer the latest request is
+dropped instead of being shown.
+
+``JobQueue`` is for work that must not be lost, such as adding a user: it
+runs every request, one at a time in the order submitted, and reports each
+one's outcome.
+
+Only the computation moves off the GUI thread; the result is still applied
+to widgets (and charts drawn) on the GUI thread.
+"""
+from collections import deque
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class _JobSignals(QObject):
+    finished = pyqtSignal(int, object)  # ticket, result
+    failed = pyqtSignal(int, str)       # ticket, error message
+
+
+class ReportJob(QRunnable):
+    """Call ``func(*args)`` on a pool thread and signal the outcome"""
+
+    def __init__(self, ticket, func, args):
+        super().__init__()
+        self.ticket = ticket
+        self.func = func
+        self.args = args
+        self.signals = _JobSignals()
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.ticket, str(e))
+        else:
+            self.signals.finished.emit(self.ticket, result)
+
+
+class ReportRunner(QObject):
+    """Computes the latest requested report in the background"""
+    ready = pyqtSignal(object, object)  # key, result
+    failed = pyqtSignal(object, str)    # key, error message
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._ticket = 0       # ticket of the latest request
+        self._running = None   # (ticket, key) of the job in the pool
+        self._pending = None   # (ticket, key, func, args) waiting for it
+
+    @property
+    def busy(self) -> bool:
+        return self._running is not None or self._pending is not None
+
+    def submit(self, key, func, *args):
+        """Request ``func(*args)``; supersedes any earlier request
+
+        ``key`` identifies the request (e.g. the selected date) and is passed
+        back with the result.
+        """
+        was_busy = self.busy
+        self._ticket += 1
+        self._pending = (self._ticket, key, func, args)
+        if self._running is None:
+            self._start_pending()
+        if not was_busy:
+            self.busy_changed.emit(True)
+
+    def cancel(self):
+        """Forget the waiting request and drop the result of the running one"""
+        self._ticket += 1
+        self._pending = None
+        if self._running is None:
+            self.busy_changed.emit(False)
+
+    def wait(self, msecs=-1) -> bool:
+        """Block until the pool is idle, e.g. before shutting down"""
+        return self.pool.waitForDone(msecs)
+
+    def _start_pending(self):
+        ticket, key, func, args = self._pending
+        self._pending = None
+        self._running = (ticket, key)
+        job = ReportJob(ticket, func, args)
+        job.signals.finished.connect(self._job_finished)
+        job.signals.failed.connect(self._job_failed)
+        self.pool.start(job)
+
+    def _job_finished(self, ticket, result):
+        _, key = self._running
+        self._running = None
+        if ticket == self._ticket:
+            self.ready.emit(key, result)
+        self._start_next()
+
+    def _job_failed(self, ticket, message):
+        _, key = self._running
+        self._running = None
+        if ticket == self._ticket:
+            self.failed.emit(key, message)
+        self._start_next()
+
+    def _start_next(self):
+        if self._pending is not None:
+            self._start_pending()
+        elif self._running is None:
+            self.busy_changed.emit(False)
+
+
+class JobQueue(QObject):
+    """Runs every submitted request in the background, one at a time"""
+    ready = pyqtSignal(object, object)  # key, result
+    failed = pyqtSignal(object, str)    # key, error message
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._ticket = 0
+        self._running = None   # (ticket, key) of the job in the pool
+        self._queue = deque()  # (ticket, key, func, args) waiting for it
+
+    @property
+    def busy(self) -> bool:
+        return self._running is not None or bool(self._queue)
+
+    def submit(self, key, func, *args):
+        """Queue ``func(*args)`` behind the earlier requests
+
+        Every request gets exactly one ``ready`` or ``failed`` with its
+        ``key``; none replaces another.
+        """
+        was_busy = self.busy
+        self._ticket += 1
+        self._queue.append((self._ticket, key, func, args))
+        if self._running is None:
+            self._start_next()
+        if not was_busy:
+            self.busy_changed.emit(True)
+
+    def wait(self, msecs=-1) -> bool:
+        """Block until the pool is idle, e.g. before shutting down"""
+        return self.pool.waitForDone(msecs)
+
+    def _start_next(self):
+        ticket, key, func, args = self._queue.popleft()
+        self._running = (ticket, key)
+        job = ReportJob(ticket, func, args)
+        job.signals.finished.connect(self._job_finished)
+        job.signals.failed.connect(self._job_failed)
+        self.pool.start(job)
+
+    def _job_finished(self, ticket, result):
+        self._done(self.ready, result)
+
+    def _job_failed(self, ticket, message):
+        self._done(self.failed, message)
+
+    def _done(self, signal, outcome):
+        _, key = self._running
+        self._running = None
+        # Start the next job first: the slot may open a dialog and wait in it
+        if self._queue:
+            self._start_next()
+        signal.emit(key, outcome)
+        if not self.busy:
+            self.busy_changed.emit(False)
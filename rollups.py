@@ -0,0 +1,176 @@
+"""Pre-aggregated sales rollups.
+
+The ``sales_*`` tables keep per-day totals so reports never have to scan raw
+order lines:
+
+* ``sales_hourly``      revenue, tips and transaction count per hour and
+                        payment method
+* ``sales_items``       quantity, revenue and tax per menu item
+* ``sales_categories``  quantity, revenue and tax per hour and menu category
+* ``sales_employees``   orders, revenue and tips per employee
+
+Item rows are kept per day only: they are the largest table and range
+reports read them for long periods.
+
+They are updated incrementally inside the same database transaction as the
+payment that changes them (``Database.add_transaction`` and
+``Database.update_order_status(..., 'paid')``) and can be rebuilt from the
+raw tables with ``python database.py --rebuild-rollups``. Day and hour are
+those of the payment, not of when the order was opened.
+"""
+
+TAX_RATE = 0.21  # 21% VAT
+REDUCED_TAX_RATE = 0.09
+REDUCED_TAX_CATEGORIES = ('Drinks', 'Food')
+
+ROLLUP_TABLES = ('sales_hourly', 'sales_items', 'sales_categories', 'sales_employees')
+
+# Tax on a category's revenue, parameterised by the rates above
+_TAX_EXPR = "CASE WHEN mi.category IN (?, ?) THEN ? ELSE ? END"
+_TAX_PARAMS = (*REDUCED_TAX_CATEGORIES, REDUCED_TAX_RATE, TAX_RATE)
+
+
+def paid_at(order_id: str, created_at: str) -> str:
+    """SQL for when an order was paid: its latest transaction, or its opening
+
+    ``order_id`` and ``created_at`` are SQL for the order's columns. The
+    incremental updates, ``rebuild`` and the report_days trigger all use it,
+    so they put an order without transactions on the same day.
+    """
+    return f"COALESCE((SELECT MAX(created_at) FROM transactions WHERE order_id = {order_id}), {created_at})"
+
+
+# Day/hour the order with id ? was paid
+_PAID_AT = f"""
+    SELECT date(ts) AS day, CAST(strftime('%H', ts) AS INTEGER) AS hour
+    FROM (SELECT {paid_at('o.id', 'o.created_at')} AS ts FROM orders o WHERE o.id = ?)
+"""
+
+
+def apply_transaction(cursor, transaction_id: int, sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) one transaction's contribution"""
+    cursor.execute("""
+        INSERT INTO sales_hourly (day, hour, payment_method, revenue, tips, transactions)
+        SELECT date(created_at), CAST(strftime('%H', created_at) AS INTEGER), payment_method,
+               ? * amount, ? * tip_amount, ?
+        FROM transactions
+        WHERE id = ?
+        ON CONFLICT (day, hour, payment_method) DO UPDATE SET
+            revenue = revenue + excluded.revenue,
+            tips = tips + excluded.tips,
+            transactions = transactions + excluded.transactions
+    """, (sign, sign, sign, transaction_id))
+    cursor.execute("""
+        INSERT INTO sales_employees (day, user_id, orders, revenue, tips)
+        SELECT date(t.created_at), o.user_id, ?, ? * t.amount, ? * t.tip_amount
+        FROM transactions t
+        JOIN orders o ON o.id = t.order_id
+        WHERE t.id = ?
+        ON CONFLICT (day, user_id) DO UPDATE SET
+            orders = orders + excluded.orders,
+            revenue = revenue + excluded.revenue,
+            tips = tips + excluded.tips
+    """, (sign, sign, sign, transaction_id))
+    if sign < 0:
+        day = "(SELECT date(created_at) FROM transactions WHERE id = ?)"
+        cursor.execute(f"DELETE FROM sales_hourly WHERE day = {day} AND transactions <= 0",
+                       (transaction_id,))
+        cursor.execute(f"DELETE FROM sales_employees WHERE day = {day} AND orders <= 0",
+                       (transaction_id,))
+
+
+def apply_order_lines(cursor, order_id: int, sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) a paid order's lines"""
+    cursor.execute(f"""
+        INSERT INTO sales_items (day, menu_item_id, quantity, revenue, tax)
+        SELECT paid.day, oi.menu_item_id,
+               ? * SUM(oi.quantity), ? * SUM(oi.quantity * mi.price),
+               ? * SUM(oi.quantity * mi.price * {_TAX_EXPR})
+        FROM order_items oi
+        JOIN menu_items mi ON mi.id = oi.menu_item_id
+        JOIN ({_PAID_AT}) paid
+        WHERE oi.order_id = ?
+        GROUP BY oi.menu_item_id
+        ON CONFLICT (day, menu_item_id) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            revenue = revenue + excluded.revenue,
+            tax = tax + excluded.tax
+    """, (sign, sign, sign, *_TAX_PARAMS, order_id, order_id))
+    cursor.execute(f"""
+        INSERT INTO sales_categories (day, hour, category, quantity, revenue, tax)
+        SELECT paid.day, paid.hour, mi.category,
+               ? * SUM(oi.quantity), ? * SUM(oi.quantity * mi.price),
+               ? * SUM(oi.quantity * mi.price * {_TAX_EXPR})
+        FROM order_items oi
+        JOIN menu_items mi ON mi.id = oi.menu_item_id
+        JOIN ({_PAID_AT}) paid
+        WHERE oi.order_id = ?
+        GROUP BY mi.category
+        ON CONFLICT (day, hour, category) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            revenue = revenue + excluded.revenue,
+            tax = tax + excluded.tax
+    """, (sign, sign, sign, *_TAX_PARAMS, order_id, order_id))
+    if sign < 0:
+        day = f"(SELECT day FROM ({_PAID_AT}))"
+        cursor.execute(f"DELETE FROM sales_items WHERE day = {day} AND quantity <= 0", (order_id,))
+        cursor.execute(f"DELETE FROM sales_categories WHERE day = {day} AND quantity <= 0", (order_id,))
+
+
+def rebuild(cursor, start_day: str = None, end_day: str = None):
+    """Recompute the rollups from raw rows for days in [start_day, end_day)
+
+    Without bounds the whole history is rebuilt.
+    """
+    start_day = start_day or '0000-01-01'
+    end_day = end_day or '9999-12-31'
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table} WHERE day >= ? AND day < ?", (start_day, end_day))
+
+    cursor.execute("""
+        INSERT INTO sales_hourly (day, hour, payment_method, revenue, tips, transactions)
+        SELECT date(created_at), CAST(strftime('%H', created_at) AS INTEGER), payment_method,
+               SUM(amount), SUM(tip_amount), COUNT(*)
+        FROM transactions
+        WHERE created_at >= ? AND created_at < ?
+        GROUP BY 1, 2, 3
+    """, (start_day, end_day))
+    cursor.execute("""
+        INSERT INTO sales_employees (day, user_id, orders, revenue, tips)
+        SELECT date(t.created_at), o.user_id, COUNT(*), SUM(t.amount), SUM(t.tip_amount)
+        FROM transactions t
+        JOIN orders o ON o.id = t.order_id
+        WHERE t.created_at >= ? AND t.created_at < ?
+        GROUP BY 1, 2
+    """, (start_day, end_day))
+
+    paid_orders = f"""
+        WITH paid AS (
+            SELECT order_id, ts FROM (
+                SELECT o.id AS order_id, {paid_at('o.id', 'o.created_at')} AS ts
+                FROM orders o
+                WHERE o.status = 'paid'
+            )
+            WHERE ts >= ? AND ts < ?
+        )
+    """
+    cursor.execute(paid_orders + f"""
+        INSERT INTO sales_items (day, menu_item_id, quantity, revenue, tax)
+        SELECT date(paid.ts), oi.menu_item_id,
+               SUM(oi.quantity), SUM(oi.quantity * mi.price),
+               SUM(oi.quantity * mi.price * {_TAX_EXPR})
+        FROM paid
+        JOIN order_items oi ON oi.order_id = paid.order_id
+        JOIN menu_items mi ON mi.id = oi.menu_item_id
+        GROUP BY 1, 2
+    """, (start_day, end_day, *_TAX_PARAMS))
+    cursor.execute(paid_orders + f"""
+        INSERT INTO sales_categories (day, hour, category, quantity, revenue, tax)
+        SELECT date(paid.ts), CAST(strftime('%H', paid.ts) AS INTEGER), mi.category,
+               SUM(oi.quantity), SUM(oi.quantity * mi.price),
+               SUM(oi.quantity * mi.price * {_TAX_EXPR})
+        FROM paid
+        JOIN order_items oi ON oi.order_id = paid.order_id
+        JOIN menu_items mi ON mi.id = oi.menu_item_id
+        GROUP BY 1, 2, 3
+    """, (start_day, end_day, *_TAX_PARAMS))
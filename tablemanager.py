@@ -1,80 +1,54 @@
 import sys
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                            QHBoxLayout, QPushButton, QLabel, QFrame, QGridLayout, QMessageBox)
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QFont, QColor, QPainter, QPen, QBrush
+                            QHBoxLayout, QPushButton, QLabel, QFrame, QComboBox, QMessageBox)
+from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtGui import QFont
 from ordermenu import OrderMenu
-from database import Database
+from database import get_database
+from floor_plan import STATUS_COLORS, FloorPlanScene, FloorPlanView
 from logger import POSLogger
 
 
 
 logger = POSLogger()
 
-class TableWidget(QFrame):
-    def __init__(self, table_number, user_data, parent=None):
-        super().__init__(parent)
-        self.table_number = table_number
-        self.user_data = user_data
-        self.status = "empty"  # empty, occupied, reserved
-        self.setup_ui()
-        
-    def setup_ui(self):
-        self.setStyleSheet("""
-            TableWidget {
-                background-color: #2d2d2d;
-                border: 2px solid #3d3d3d;
-                border-radius: 10px;
-            }
-            TableWidget:hover {
-                border: 2px solid #4d4d4d;
-            }
-        """)
-        
-        self.setFixedSize(120, 120)
-        self.setCursor(Qt.PointingHandCursor)
-        
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        # Draw table
-        painter.setPen(QPen(QColor("#3d3d3d"), 2))
-        painter.setBrush(QBrush(QColor("#2d2d2d")))
-        painter.drawRoundedRect(10, 10, 100, 100, 10, 10)
-        
-        # Draw table number
-        painter.setPen(QColor("#ffffff"))
-        painter.setFont(QFont("Arial", 16, QFont.Bold))
-        painter.drawText(self.rect(), Qt.AlignCenter, f"Table {self.table_number}")
-        
-        # Draw status indicator
-        status_color = {
-            "empty": "#4CAF50",    # Green
-            "occupied": "#f44336",  # Red
-            "reserved": "#FFC107"   # Yellow
-        }
-        painter.setBrush(QBrush(QColor(status_color[self.status])))
-        painter.setPen(Qt.NoPen)
-        painter.drawEllipse(15, 15, 10, 10)
-        
-    def mousePressEvent(self, event):
-        # Show order menu
-        menu = OrderMenu(self.table_number, self.user_data, self)
-        if menu.exec_() == OrderMenu.Accepted:
-            # Update table status based on order status
-            if menu.current_order_id:
-                self.status = "occupied"
-            else:
-                self.status = "empty"
-            self.update()
-
 class RestaurantView(QMainWindow):
+    _shared = None
+    POLL_MS = 2000  # how often to look for orders changed on other terminals
+
     def __init__(self, user_data):
         super().__init__()
         self.user_data = user_data
+        self.db = get_database()
+        self.tables = []
+        self.data_version = None
+        self.floor_timer = QTimer(self)
+        self.floor_timer.timeout.connect(self.poll_floor)
         self.setup_ui()
+        self.set_user(user_data)
         self.showMaximized()  # Show maximized by default
+        # Build the order dialog once the floor is on screen
+        QTimer.singleShot(0, lambda: OrderMenu.prepare(self.user_data))
+
+    @classmethod
+    def for_user(cls, user_data):
+        """Return the terminal's floor window, switched to ``user_data``
+
+        The floor and its tables are built on the first login and kept
+        between logins; switching users only changes who is acting.
+        """
+        if cls._shared is None:
+            cls._shared = cls(user_data)
+        else:
+            cls._shared.set_user(user_data)
+            cls._shared.showMaximized()
+        return cls._shared
+
+    def set_user(self, user_data):
+        """Make ``user_data`` the acting user of the floor and its tables"""
+        self.user_data = user_data
+        self.user_info.setText(f"Logged in as: {self.user_data[1]} ({self.user_data[2]})")
+        self.admin_btn.setVisible(self.user_data[2] == 'admin')
         
     def setup_ui(self):
         self.setWindowTitle("Restaurant View")
@@ -116,29 +90,28 @@ class RestaurantView(QMainWindow):
         top_bar = QHBoxLayout()
         
         # User info
-        user_info = QLabel(f"Logged in as: {self.user_data[1]} ({self.user_data[2]})")
-        user_info.setFont(QFont("Arial", 12))
-        top_bar.addWidget(user_info)
+        self.user_info = QLabel()
+        self.user_info.setFont(QFont("Arial", 12))
+        top_bar.addWidget(self.user_info)
         
-        # Add admin controls if user is admin
-        if self.user_data[2] == 'admin':
-            admin_btn = QPushButton("Admin Dashboard")
-            admin_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #5865f2;
-                    border: none;
-                    border-radius: 5px;
-                    color: #ffffff;
-                    text-align: center;
-                    padding: 10px;
-                    font-size: 14px;
-                }
-                QPushButton:hover {
-                    background-color: #4752c4;
-                }
-            """)
-            admin_btn.clicked.connect(self.switch_to_admin_dashboard)
-            top_bar.addWidget(admin_btn)
+        # Admin controls, shown while an admin is logged in
+        self.admin_btn = QPushButton("Admin Dashboard")
+        self.admin_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #5865f2;
+                border: none;
+                border-radius: 5px;
+                color: #ffffff;
+                text-align: center;
+                padding: 10px;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background-color: #4752c4;
+            }
+        """)
+        self.admin_btn.clicked.connect(self.switch_to_admin_dashboard)
+        top_bar.addWidget(self.admin_btn)
         
         # Logout button
         logout_btn = QPushButton("Logout")
@@ -172,7 +145,7 @@ class RestaurantView(QMainWindow):
         legend_layout = QHBoxLayout(legend)
         legend_layout.setAlignment(Qt.AlignCenter)
         
-        for status, color in [("Empty", "#4CAF50"), ("Occupied", "#f44336"), ("Reserved", "#FFC107")]:
+        for status, color in STATUS_COLORS.items():
             status_widget = QWidget()
             status_layout = QHBoxLayout(status_widget)
             
@@ -180,7 +153,7 @@ class RestaurantView(QMainWindow):
             indicator.setFixedSize(15, 15)
             indicator.setStyleSheet(f"background-color: {color}; border-radius: 7px;")
             
-            label = QLabel(status)
+            label = QLabel(status.capitalize())
             label.setStyleSheet("color: #ffffff;")
             
             status_layout.addWidget(indicator)
@@ -189,28 +162,80 @@ class RestaurantView(QMainWindow):
         
         layout.addWidget(legend)
         
-        # Tables layout
-        tables_container = QWidget()
-        tables_layout = QGridLayout(tables_container)
-        tables_layout.setSpacing(30)
-        
-        # Create tables in a restaurant-like arrangement
-        # Tables 1-4: Window side
-        for i in range(4):
-            table = TableWidget(i + 1, self.user_data)
-            tables_layout.addWidget(table, 0, i)
-            
-        # Tables 5-6: Center
-        for i in range(2):
-            table = TableWidget(i + 5, self.user_data)
-            tables_layout.addWidget(table, 1, i + 1)
-            
-        # Tables 7-10: Bar side
-        for i in range(4):
-            table = TableWidget(i + 7, self.user_data)
-            tables_layout.addWidget(table, 2, i)
-        
-        layout.addWidget(tables_container)
+        # Tables, as laid out in the floor plan stored in the database
+        self.floor_scene = FloorPlanScene(self)
+        # Queued, so the order dialog opens after the click has been handled
+        self.floor_scene.table_clicked.connect(self.open_table, Qt.QueuedConnection)
+        self.floor_view = FloorPlanView(self.floor_scene)
+
+        # Floor plan controls: jump to an area, zoom for touch screens
+        plan_controls = QHBoxLayout()
+        self.area_selector = QComboBox()
+        self.area_selector.setFont(QFont("Arial", 12))
+        self.area_selector.activated.connect(self.show_selected_area)
+        plan_controls.addWidget(self.area_selector)
+        plan_controls.addStretch()
+        zoom_out_btn = QPushButton("Zoom -")
+        zoom_out_btn.clicked.connect(self.floor_view.zoom_out)
+        plan_controls.addWidget(zoom_out_btn)
+        zoom_in_btn = QPushButton("Zoom +")
+        zoom_in_btn.clicked.connect(self.floor_view.zoom_in)
+        plan_controls.addWidget(zoom_in_btn)
+        layout.addLayout(plan_controls)
+
+        layout.addWidget(self.floor_view, 1)
+        self.load_floor_plan()
+
+    def load_floor_plan(self):
+        """(Re)build the tables when the stored floor plan changed"""
+        if not self.floor_scene.set_plan(self.db.get_floor_plan()):
+            return
+        self.tables = list(self.floor_scene.tables.values())
+        self.area_selector.clear()
+        self.area_selector.addItem("All areas", None)
+        for area in sorted(self.floor_scene.areas):
+            self.area_selector.addItem(area, area)
+        self.floor_view.show_area()
+
+    def show_selected_area(self):
+        self.floor_view.show_area(self.area_selector.currentData())
+
+    def open_table(self, table_number):
+        """Show the session's order menu, re-bound to this table"""
+        menu = OrderMenu.for_table(table_number, self.user_data)
+        menu.exec_()
+        # The dialog's own commits do not change the data version, so reload
+        self.refresh_floor()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.load_floor_plan()
+        self.refresh_floor()
+        self.floor_timer.start(self.POLL_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.floor_timer.stop()
+
+    def refresh_floor(self):
+        """Load the state of every table at once; only changed tables repaint"""
+        # Read the version first, so a commit during the query is seen next poll
+        self.data_version = self.db.data_version()
+        state = self.db.get_floor_state()
+        for table in self.tables:
+            table.set_state(state.get(table.table_number))
+
+    def poll_floor(self):
+        """Reload the floor when another connection committed since the last load
+
+        Commits on this terminal's own connection do not change the data
+        version; ``open_table`` reloads the floor when its dialog closes.
+        """
+        if self.db.data_version() != self.data_version:
+            self.refresh_floor()
+        else:
+            for table in self.tables:
+                table.refresh()
 
     def switch_to_admin_dashboard(self):
         """Switch back to admin dashboard"""
@@ -220,10 +245,7 @@ class RestaurantView(QMainWindow):
         self.close()
     
     def logout(self):
-        """Handle logout"""
-        from login import LoginScreen
-        self.login_screen = LoginScreen()
-        self.login_screen.show()
+        """Handle logout; the floor stays built for the next user"""
         self.close()
     
     def closeEvent(self, event):
@@ -231,8 +253,7 @@ class RestaurantView(QMainWindow):
         # If closing restaurant view, show login screen
         if not hasattr(self, 'admin_dashboard') or not self.admin_dashboard.isVisible():
             from login import LoginScreen
-            self.login_screen = LoginScreen()
-            self.login_screen.show()
+            self.login_screen = LoginScreen.shared()
         event.accept()
 
 if __name__ == '__main__':